@@ -17,31 +17,345 @@ import os
 import sys
 import json
 import re
-import urllib.request
+import hashlib
+import time
+import random
+import urllib.error
 import urllib.parse
+import http.client
+import threading
+import io
+from contextlib import contextmanager
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 import subprocess
 
-# Fix encoding for Windows console
-if sys.platform == 'win32':
-    import codecs
-    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
-    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+# Optional faster JSON encoder/decoder, used by dumps_json() and loads_json()
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Print UTF-8 on every console (the Windows default code page can't encode
+# app names). CI runs with -u so the log streams live, but unbuffered stdout
+# writes the text and the newline of every print separately; line buffering
+# keeps the log live with one write per line. stdout can be missing or
+# replaced (pythonw, test harnesses), so only reconfigure a real text stream
+if hasattr(sys.stdout, 'reconfigure'):
+    sys.stdout.reconfigure(encoding='utf-8', errors='strict', line_buffering=True, write_through=False)
+if hasattr(sys.stderr, 'reconfigure'):
+    sys.stderr.reconfigure(encoding='utf-8', errors='strict')
 
 # Configuration
 REPO_FILE = 'apps.json'
 TWEAKS_LIST_FILE = 'tweaks_list.json'
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY', '')
 OPENROUTER_MODEL = os.getenv('OPENROUTER_MODEL', 'openai/gpt-4o-mini')
+OPENROUTER_API_URL = 'https://openrouter.ai/api/v1/chat/completions'
+OPENROUTER_MAX_ATTEMPTS = 4
+# Seconds to wait for a TCP/TLS connection before giving up (separate from the read timeout)
+CONNECT_TIMEOUT = 5
+# Estimated prompt tokens of filenames per AI asset-check request. Each filename can be
+# echoed back in the response, so this stays well under the response limit below.
+AI_BATCH_TOKEN_BUDGET = int(os.getenv('AI_BATCH_TOKEN_BUDGET', '1200'))
+# Upper bound on response tokens per AI asset-check request (scaled by batch size)
+AI_BATCH_MAX_OUTPUT_TOKENS = int(os.getenv('AI_BATCH_MAX_OUTPUT_TOKENS', '4000'))
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN', '')
 RELEASE_TAG = 'latest'
-
-# Cache for AI duplicate detection
+MAX_CONCURRENT_DELETES = int(os.getenv('MAX_CONCURRENT_DELETES', '8'))
+# Number of AI asset-check batches sent to OpenRouter at the same time
+MAX_CONCURRENT_AI_REQUESTS = int(os.getenv('MAX_CONCURRENT_AI_REQUESTS', '4'))
+
+# Precompiled patterns (compiled once at import instead of per call)
+_REMOTE_RE = re.compile(r'[:/]([^/]+)/([^/]+?)(\.git)?$')
+_BASE_URL_RE = re.compile(r'(https?://[^/]+)')
+_BASE_TWEAK_RE = re.compile(r'^(.+?)\s*\(([^)]+)\)$')
+_VERSION_SPLIT_RE = re.compile(r'[.-]')
+_MARKDOWN_JSON_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Filename patterns for local (non-AI) duplicate grouping
+# Version tokens like "v405.1.0", "v2_19", "15.0.16" (at least two components)
+_ASSET_VERSION_RE = re.compile(r'(?<![A-Za-z0-9])v?(\d+(?:[._]\d+)+)(?![A-Za-z0-9])', re.IGNORECASE)
+_ASSET_SEPARATOR_RE = re.compile(r'[\s_\-]+')
+
+# Cache for AI duplicate detection (persisted between runs)
+AI_DUPLICATE_CACHE_FILE = 'ai_duplicate_cache.json'
+# Prompt version per kind of AI judgment (see ai_cache_key). Bump a kind's
+# version when its prompt changes so stale judgments are not reused
+AI_CACHE_PROMPT_VERSIONS = {
+    'assets_batch': 'v1',
+}
+# Cached judgments older than this are discarded and re-asked
+AI_CACHE_TTL_DAYS = int(os.getenv('AI_CACHE_TTL_DAYS', '7'))
 _ai_duplicate_cache = {}
+# Guards _ai_duplicate_cache while AI batches run in worker threads
+_ai_cache_lock = threading.Lock()
+
+# Keep-alive connections to the GitHub and OpenRouter APIs, keyed by (scheme, host)
+# One set per thread - http.client connections are not thread-safe
+_api_local = threading.local()
+# Release ID of RELEASE_TAG, cached by get_release_assets()
+_release_id = None
+
+
+# System prompt for check_all_release_assets_with_ai(). Kept as a module constant so the
+# prefix is byte-identical on every request and can be served from the provider's prompt cache.
+ASSET_DUPLICATE_SYSTEM_PROMPT = (
+    "You are an iOS IPA filename analyzer. Given a list of IPA filenames, identify groups of duplicates.\n"
+    "The list is sorted alphabetically - its order is not significant.\n\n"
+    "A duplicate group is:\n"
+    "- Same base app name (ignore case, spacing, underscores, dashes)\n"
+    "- Same modifiers (Pro, Unlocked, Patched, etc.) - these are NOT version differences\n"
+    "- Same EXACT tweak name (can appear anywhere in filename as a standalone word)\n"
+    "- Different version numbers (v1.0, v2.0, v2.19, v2.20, v2.21, etc.)\n\n"
+    "TWEAK IDENTIFICATION:\n"
+    "- Tweaks can appear ANYWHERE in the filename as standalone words\n"
+    "- Examples: 'Instagram v405.1.0 BHInsta v1.2 Patched.ipa' → tweak is 'BHInsta'\n"
+    "- Examples: 'Instagram v405.1.0 Theta v4.0 Patched.ipa' → tweak is 'Theta'\n"
+    "- Match tweak names from the KNOWN TWEAKS list below\n"
+    "- BHInsta and Theta are DIFFERENT tweaks - NEVER group them together!\n\n"
+    "VERSION EXTRACTION RULES:\n"
+    "- Version can be anywhere in the filename: 'App v2.19.ipa', 'App_v2_19.ipa', 'App 2.19.ipa'\n"
+    "- Common patterns: v2.19, v2_19, 2.19, 404.0, 42.3.0\n"
+    "- Version format: major.minor.patch (e.g., 2.21 > 2.20 > 2.19)\n"
+    "- App version vs Tweak version: 'Instagram v405.1.0 BHInsta v1.2' has both - compare app versions\n"
+    "- IGNORE words like 'Pro', 'Unlocked', 'Patched', 'Premium', 'blatant' - these are modifiers, not versions\n\n"
+    "EXAMPLES:\n"
+    "✅ DUPLICATES:\n"
+    "- 'Instagram v405.1.0 BHInsta v1.2 blatant Patched.ipa' and 'Instagram v404.0.0 BHInsta v1.2 blatant Patched.ipa'\n"
+    "  → Same app (Instagram), SAME tweak (BHInsta), different app versions (405.1.0 vs 404.0.0)\n"
+    "  → KEEP v405.1.0, DELETE v404.0.0\n"
+    "- 'Instagram v405.1.0 Theta v4.0 blatant Patched.ipa' and 'Instagram v404.0.0 Theta v3.9 blatant Patched.ipa'\n"
+    "  → Same app (Instagram), SAME tweak (Theta), different app versions (405.1.0 vs 404.0.0)\n"
+    "  → KEEP v405.1.0, DELETE v404.0.0\n"
+    "- 'Coconote - AI Note Taker v2.19 Pro Unlocked blatant Patched.ipa'\n"
+    "  'Coconote - AI Note Taker v2.20 Pro Unlocked blatant Patched.ipa'\n"
+    "  'Coconote - AI Note Taker v2.21 Pro Unlocked blatant Patched.ipa'\n"
+    "  → Same app, same modifiers, no tweaks, different versions (2.19, 2.20, 2.21)\n"
+    "  → KEEP v2.21, DELETE v2.19 and v2.20\n\n"
+    "❌ NOT DUPLICATES:\n"
+    "- 'Instagram v405.1.0 BHInsta v1.2 blatant Patched.ipa' and 'Instagram v405.1.0 Theta v4.0 blatant Patched.ipa'\n"
+    "  → DIFFERENT tweaks (BHInsta vs Theta) - NEVER treat different tweaks as duplicates!\n"
+    "  → Even though they have the same app version, they are DIFFERENT files!\n"
+    "- 'Instagram v405.1.0 BHInsta v1.2.ipa' and 'Instagram v404.0.0 Theta v4.0.ipa'\n"
+    "  → DIFFERENT tweaks - even if BHInsta has newer version, they are NOT duplicates!\n"
+    "- 'YouTube.ipa' and 'YouTube Music.ipa'\n"
+    "  → Different apps (YouTube vs YouTube Music)\n\n"
+    "CRITICAL RULES:\n"
+    "- ONLY group files as duplicates if they have the EXACT SAME tweak name (or both have NO tweak)\n"
+    "- Different tweaks are NEVER EVER duplicates, even if one has a newer version number\n"
+    "- BHInsta, Theta, TikTokLRD, VibeTok, etc. are all DIFFERENT tweaks - keep them separate!\n"
+    "- Focus on VERSION NUMBERS WITHIN the same tweak only\n"
+    "- Ignore modifiers like Pro, Unlocked, Patched, Premium, blatant - these are NOT versions!\n"
+    "- If filenames are identical except for version numbers AND have the same tweak, they are duplicates\n"
+    "- Keep the file with the HIGHEST app version number within each tweak group\n\n"
+    "Respond with ONLY a JSON object with a 'groups' array:\n"
+    "{\n"
+    '  "groups": [\n'
+    "    {\n"
+    '      "app_name": "App Name",\n'
+    '      "tweak_name": "Tweak Name or null",\n'
+    '      "keep": "filename with newest version",\n'
+    '      "delete": ["older filename 1", "older filename 2"],\n'
+    '      "reason": "brief explanation with versions"\n'
+    "    }\n"
+    "  ]\n"
+    "}\n\n"
+    "If no duplicates found, return: {\"groups\": []}"
+)
+
+
+def dumps_json(data):
+    """
+    Serialize data as indented UTF-8 JSON bytes.
+
+    Uses orjson when it is installed (much faster on large apps.json files),
+    otherwise falls back to the stdlib encoder with the same layout.
+    """
+    if orjson is None:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+
+def loads_json(raw):
+    """Parse JSON from bytes or str, using orjson when it is installed"""
+    if orjson is None:
+        return json.loads(raw)
+    return orjson.loads(raw)
+
+
+def load_json(path):
+    """Load a JSON file, using orjson when it is installed"""
+    with open(path, 'rb') as f:
+        return loads_json(f.read())
+
+
+def write_json_atomic(path, data):
+    """
+    Write data as JSON to path, skipping the write if the content is unchanged.
+
+    The file is written to a temporary sibling, fsynced and moved into place
+    with os.replace, so a crash never leaves a truncated JSON file behind.
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    new_bytes = dumps_json(data)
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == new_bytes:
+                return False
+    except FileNotFoundError:
+        pass
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(new_bytes)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return True
+
+
+def encode_payload(payload):
+    """Serialize an API request payload as compact UTF-8 JSON (no whitespace, no \\u escapes)"""
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+@contextmanager
+def open_openrouter(payload, timeout):
+    """
+    POST a chat completion request to OpenRouter, retrying transient failures.
+
+    The request goes over the same per-thread keep-alive connections as the
+    GitHub API calls, so consecutive batches skip the TCP/TLS handshake.
+    HTTP 429/5xx responses, connection errors and timeouts are retried up to
+    OPENROUTER_MAX_ATTEMPTS times with exponential backoff and jitter. A
+    Retry-After header, when present, takes precedence over the backoff.
+
+    Yields:
+        The open HTTP response (use open_openrouter() as a context manager)
+    """
+    headers = {
+        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "https://github.com/FTRepo/FTRepo",
+        "X-Title": "FTRepo Duplicate Cleaner"
+    }
+    data = encode_payload(payload)
+
+    for attempt in range(1, OPENROUTER_MAX_ATTEMPTS + 1):
+        delay = min(20, 2 ** (attempt - 1)) + random.uniform(0, 1)
+        try:
+            response = _send_request('POST', OPENROUTER_API_URL, headers, body=data, timeout=timeout)
+        except (http.client.HTTPException, OSError) as e:
+            if attempt == OPENROUTER_MAX_ATTEMPTS:
+                raise
+            error = str(e) or type(e).__name__
+        else:
+            if 200 <= response.status < 300:
+                break
+            # Drain the error body so the connection can be reused
+            body = response.read()
+            if (response.status != 429 and response.status < 500) or attempt == OPENROUTER_MAX_ATTEMPTS:
+                raise urllib.error.HTTPError(OPENROUTER_API_URL, response.status, response.reason,
+                                             response.headers, io.BytesIO(body))
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                delay = min(60, int(retry_after))
+            error = f"HTTP {response.status}"
+
+        print(f"  [AI] Request failed ({error}), retrying in {delay:.1f}s "
+              f"(attempt {attempt + 1}/{OPENROUTER_MAX_ATTEMPTS})")
+        time.sleep(delay)
+
+    try:
+        yield response
+    finally:
+        # A stream abandoned early (see read_streamed_completion) leaves unread
+        # data on the socket, so that connection can't be reused
+        if not response.isclosed():
+            _drop_connection(OPENROUTER_API_URL)
+
+
+def ai_cache_key(kind, names):
+    """
+    Build an order-independent cache key for an AI judgment.
+
+    Args:
+        kind: Kind of judgment, a key of AI_CACHE_PROMPT_VERSIONS
+        names: Names the judgment was made for; order does not matter
+
+    Returns:
+        str key combining the kind with a SHA-256 digest of the names,
+        model and the kind's prompt version
+    """
+    digest = hashlib.sha256(
+        json.dumps([AI_CACHE_PROMPT_VERSIONS[kind], OPENROUTER_MODEL, sorted(names)]).encode('utf-8')
+    ).hexdigest()
+    return f"{kind}:{digest}"
+
+
+def ai_cache_get(key):
+    """Return the cached judgment for key, or None if missing or expired"""
+    with _ai_cache_lock:
+        entry = _ai_duplicate_cache.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry['created_at'] > AI_CACHE_TTL_DAYS * 86400:
+            del _ai_duplicate_cache[key]
+            return None
+        return entry['result']
+
+
+def ai_cache_put(key, result):
+    """Store a judgment in the AI cache with the current timestamp"""
+    with _ai_cache_lock:
+        _ai_duplicate_cache[key] = {'result': result, 'created_at': int(time.time())}
+
+
+def load_ai_duplicate_cache():
+    """Load AI duplicate detection cache from disk, dropping expired entries"""
+    global _ai_duplicate_cache
+    if os.path.exists(AI_DUPLICATE_CACHE_FILE):
+        try:
+            cache = load_json(AI_DUPLICATE_CACHE_FILE)
+            # Entries from older cache formats lack a timestamp and are dropped
+            cutoff = time.time() - AI_CACHE_TTL_DAYS * 86400
+            _ai_duplicate_cache = {
+                key: entry for key, entry in cache.items()
+                if isinstance(entry, dict) and entry.get('created_at', 0) > cutoff
+            }
+            expired = len(cache) - len(_ai_duplicate_cache)
+            print(f"[AI CACHE] Loaded {len(_ai_duplicate_cache)} cached AI duplicate judgments"
+                  + (f" ({expired} expired)" if expired else ""))
+        except Exception as e:
+            print(f"[AI CACHE] Failed to load cache: {e}")
+            _ai_duplicate_cache = {}
+
+
+def save_ai_duplicate_cache():
+    """Save AI duplicate detection cache to disk"""
+    try:
+        if write_json_atomic(AI_DUPLICATE_CACHE_FILE, _ai_duplicate_cache):
+            print(f"[AI CACHE] Saved {len(_ai_duplicate_cache)} AI duplicate judgments to cache")
+        else:
+            print(f"[AI CACHE] Cache unchanged, skipping write")
+    except Exception as e:
+        print(f"[AI CACHE] Failed to save cache: {e}")
 
 
 def load_tweaks_list():
-    """Load the list of known tweaks from tweaks_list.json"""
+    """
+    Load the list of known tweaks from tweaks_list.json.
+
+    Returns:
+        tuple of tweak names - immutable, so the per-tuple caches behind
+        is_tweak_in_list() and extract_tweak_from_filename() are built once
+    """
     if not os.path.exists(TWEAKS_LIST_FILE):
         print(f"[WARNING] {TWEAKS_LIST_FILE} not found, creating default list...")
         default_tweaks = {
@@ -54,21 +368,32 @@ def load_tweaks_list():
         }
         with open(TWEAKS_LIST_FILE, 'w', encoding='utf-8') as f:
             json.dump(default_tweaks, f, indent=2)
-        return default_tweaks['tweaks']
+        return tuple(default_tweaks['tweaks'])
 
     try:
-        with open(TWEAKS_LIST_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            tweaks = data.get('tweaks', [])
-            print(f"[TWEAKS] Loaded {len(tweaks)} known tweaks from {TWEAKS_LIST_FILE}")
-            return tweaks
+        data = load_json(TWEAKS_LIST_FILE)
+        tweaks = tuple(data.get('tweaks', []))
+        print(f"[TWEAKS] Loaded {len(tweaks)} known tweaks from {TWEAKS_LIST_FILE}")
+        return tweaks
     except Exception as e:
         print(f"[ERROR] Failed to load {TWEAKS_LIST_FILE}: {e}")
-        return []
+        return ()
+
+
+def is_committed_in_git(path):
+    """Return True if path is tracked by git and has no uncommitted changes"""
+    try:
+        tracked = subprocess.run(['git', 'ls-files', '--error-unmatch', path],
+                                 capture_output=True).returncode == 0
+        return tracked and subprocess.run(['git', 'diff', '--quiet', 'HEAD', '--', path],
+                                          capture_output=True).returncode == 0
+    except OSError:
+        return False
 
 
+@lru_cache(maxsize=1)
 def get_repo_info():
-    """Get repository owner and name from git remote"""
+    """Get repository owner and name from git remote (cached - the remote does not change mid-run)"""
     try:
         result = subprocess.run(
             ['git', 'config', '--get', 'remote.origin.url'],
@@ -79,16 +404,14 @@ def get_repo_info():
         remote_url = result.stdout.strip()
 
         # Parse git@github.com:owner/repo.git or https://github.com/owner/repo.git
-        match = re.search(r'[:/]([^/]+)/([^/]+?)(\.git)?$', remote_url)
+        match = _REMOTE_RE.search(remote_url)
         if match:
             owner = match.group(1)
             repo = match.group(2)
 
             # Extract base URL for API
-            if remote_url.startswith('https://'):
-                base_url = re.match(r'(https://[^/]+)', remote_url).group(1)
-            elif remote_url.startswith('http://'):
-                base_url = re.match(r'(http://[^/]+)', remote_url).group(1)
+            if remote_url.startswith(('https://', 'http://')):
+                base_url = _BASE_URL_RE.match(remote_url).group(1)
             else:
                 # SSH format git@host:owner/repo
                 host = remote_url.split('@')[1].split(':')[0]
@@ -107,8 +430,137 @@ def get_repo_info():
         return None, None, None, None
 
 
+def _drop_connection(url):
+    """Close and forget this thread's keep-alive connection to url's host"""
+    parsed = urllib.parse.urlsplit(url)
+    conn = getattr(_api_local, 'connections', {}).pop((parsed.scheme, parsed.netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def _send_request(method, url, headers, body=None, timeout=30):
+    """
+    Send a request over this thread's keep-alive connection to url's host.
+
+    Args:
+        method: HTTP method
+        url: Full URL
+        headers: Request headers
+        body: Optional request body bytes
+        timeout: Socket timeout in seconds
+
+    Returns:
+        http.client.HTTPResponse - read it fully before the next request on
+        this thread, or call _drop_connection()
+    """
+    parsed = urllib.parse.urlsplit(url)
+    conn_key = (parsed.scheme, parsed.netloc)
+    path = parsed.path + (f"?{parsed.query}" if parsed.query else '')
+
+    if not hasattr(_api_local, 'connections'):
+        _api_local.connections = {}
+    connections = _api_local.connections
+
+    # Retry once on a fresh connection if the server dropped the idle one
+    for attempt in range(2):
+        conn = connections.get(conn_key)
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if parsed.scheme == 'https' else http.client.HTTPConnection
+            conn = conn_class(parsed.netloc, timeout=CONNECT_TIMEOUT)
+            connections[conn_key] = conn
+        try:
+            # Fail fast on an unreachable host, then allow the full read timeout
+            if conn.sock is None:
+                conn.connect()
+            conn.sock.settimeout(timeout)
+            conn.request(method, path, body=body, headers=headers)
+            return conn.getresponse()
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            connections.pop(conn_key, None)
+            # A timeout means the server is slow, not that the connection went stale
+            if attempt or isinstance(e, TimeoutError):
+                raise
+
+
+def _api_request(method, url, parse=None):
+    """
+    Send a request to the GitHub API over a reused keep-alive connection.
+
+    Args:
+        method: HTTP method
+        url: Full API URL
+        parse: Optional callable that consumes the response stream instead of
+               reading the whole body into memory
+
+    Returns:
+        tuple: (status_code, response body bytes or the result of parse)
+    """
+    headers = {
+        'Accept': 'application/vnd.github+json',
+        'User-Agent': 'FTRepo-Duplicate-Cleaner'
+    }
+    if GITHUB_TOKEN:
+        headers['Authorization'] = f'token {GITHUB_TOKEN}'
+
+    response = _send_request(method, url, headers)
+    try:
+        if parse:
+            return response.status, parse(response)
+        return response.status, response.read()
+    except Exception:
+        _drop_connection(url)
+        raise
+
+
+def _parse_release(response):
+    """
+    Parse a release JSON response, keeping only the fields we use.
+
+    Streams the body with ijson when it is installed, so only one asset object
+    is held in memory at a time; otherwise falls back to json.loads.
+
+    Returns:
+        dict with 'id', 'message' and 'assets' (name -> {id, size, download_url})
+    """
+    release = {'id': None, 'message': None, 'assets': {}}
+
+    try:
+        import ijson
+    except ImportError:
+        data = loads_json(response.read())
+        release['id'] = data.get('id')
+        release['message'] = data.get('message')
+        for asset in data.get('assets', []):
+            release['assets'][asset['name']] = {
+                'id': asset['id'],
+                'size': asset.get('size', 0),
+                'download_url': asset.get('browser_download_url', '')
+            }
+        return release
+
+    asset = None
+    for prefix, event, value in ijson.parse(response):
+        if prefix == 'assets.item':
+            if event == 'start_map':
+                asset = {}
+            elif event == 'end_map':
+                release['assets'][asset['name']] = {
+                    'id': asset['id'],
+                    'size': asset.get('size', 0),
+                    'download_url': asset.get('browser_download_url', '')
+                }
+        elif prefix in ('assets.item.name', 'assets.item.id', 'assets.item.size',
+                        'assets.item.browser_download_url'):
+            asset[prefix[len('assets.item.'):]] = value
+        elif prefix in ('id', 'message'):
+            release[prefix] = value
+    return release
+
+
 def get_release_assets():
     """Get list of assets in the latest release using GitHub API"""
+    global _release_id
     try:
         owner, repo, api_url, _ = get_repo_info()
         if not owner or not repo or not api_url:
@@ -118,36 +570,21 @@ def get_release_assets():
         print(f"[RELEASE] Fetching assets from '{RELEASE_TAG}' release...")
         url = f"{api_url}/repos/{owner}/{repo}/releases/tags/{RELEASE_TAG}"
 
-        result = subprocess.run(
-            ['curl', '-s', '-H', f'Authorization: token {GITHUB_TOKEN}' if GITHUB_TOKEN else '', url],
-            capture_output=True,
-            text=True,
-            check=False
-        )
+        try:
+            status, release = _api_request('GET', url, parse=_parse_release)
+        except ValueError:  # json.JSONDecodeError and ijson.JSONError are both ValueErrors
+            print(f"[WARNING] Could not parse release data")
+            return {}
 
-        if result.returncode != 0 or not result.stdout:
-            print(f"[WARNING] Could not fetch release assets")
+        if status != 200 or release['message']:  # Error response
+            print(f"[WARNING] Release '{RELEASE_TAG}' not found")
             return {}
 
-        try:
-            data = json.loads(result.stdout)
-            if 'message' in data:  # Error response
-                print(f"[WARNING] Release '{RELEASE_TAG}' not found")
-                return {}
-
-            assets = {}
-            for asset in data.get('assets', []):
-                assets[asset['name']] = {
-                    'id': asset['id'],
-                    'size': asset.get('size', 0),
-                    'download_url': asset.get('browser_download_url', '')
-                }
+        _release_id = release['id']
+        assets = release['assets']
 
-            print(f"[RELEASE] Found {len(assets)} assets in release")
-            return assets
-        except json.JSONDecodeError:
-            print(f"[WARNING] Could not parse release data")
-            return {}
+        print(f"[RELEASE] Found {len(assets)} assets in release")
+        return assets
     except Exception as e:
         print(f"[ERROR] Failed to fetch release assets: {e}")
         return {}
@@ -155,153 +592,58 @@ def get_release_assets():
 
 def delete_release_asset(asset_id, asset_name):
     """Delete an asset from the release"""
+    global _release_id
     try:
         owner, repo, api_url, _ = get_repo_info()
         if not owner or not repo or not api_url:
             print(f"[ERROR] Could not determine repository info")
             return False
 
-        # Get release ID first
-        url = f"{api_url}/repos/{owner}/{repo}/releases/tags/{RELEASE_TAG}"
-        result = subprocess.run(
-            ['curl', '-s', '-H', f'Authorization: token {GITHUB_TOKEN}' if GITHUB_TOKEN else '', url],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-
-        data = json.loads(result.stdout)
-        release_id = data.get('id')
-        if not release_id:
+        # Get release ID first (normally cached by get_release_assets)
+        if not _release_id:
+            url = f"{api_url}/repos/{owner}/{repo}/releases/tags/{RELEASE_TAG}"
+            _, release = _api_request('GET', url, parse=_parse_release)
+            _release_id = release['id']
+        if not _release_id:
             print(f"[ERROR] Could not get release ID")
             return False
 
         # Delete the asset
-        delete_url = f"{api_url}/repos/{owner}/{repo}/releases/{release_id}/assets/{asset_id}"
-        result = subprocess.run(
-            ['curl', '-s', '-X', 'DELETE',
-             '-H', f'Authorization: token {GITHUB_TOKEN}' if GITHUB_TOKEN else '',
-             delete_url],
-            capture_output=True,
-            text=True,
-            check=False
-        )
+        delete_url = f"{api_url}/repos/{owner}/{repo}/releases/{_release_id}/assets/{asset_id}"
+        status, _ = _api_request('DELETE', delete_url)
 
-        if result.returncode == 0:
+        if 200 <= status < 300:
             print(f"[DELETED] Removed from release: {asset_name}")
             return True
         else:
-            print(f"[ERROR] Failed to delete asset: {asset_name}")
+            print(f"[ERROR] Failed to delete asset: {asset_name} (HTTP {status})")
             return False
     except Exception as e:
         print(f"[ERROR] Failed to delete asset {asset_name}: {e}")
         return False
 
 
-def check_duplicate_with_ai(name1, name2):
+def delete_release_assets(deletions):
     """
-    Use OpenRouter AI to check if two app names are duplicates.
+    Delete several assets from the release in parallel.
+
+    Args:
+        deletions: List of (asset_id, asset_name) tuples
 
     Returns:
-        - 'duplicate': Both names refer to the same app
-        - 'different': Names refer to different apps
-        - 'unknown': Cannot determine
+        Number of assets successfully deleted
     """
-    if not OPENROUTER_API_KEY:
-        print(f"[WARNING] OPENROUTER_API_KEY not set, skipping AI duplicate check")
-        return 'unknown'
-
-    # Check cache first
-    cache_key = f"{name1}|{name2}"
-    reverse_cache_key = f"{name2}|{name1}"
-
-    if cache_key in _ai_duplicate_cache:
-        return _ai_duplicate_cache[cache_key]
-    if reverse_cache_key in _ai_duplicate_cache:
-        return _ai_duplicate_cache[reverse_cache_key]
-
-    try:
-        print(f"  [AI] Checking if '{name1}' and '{name2}' are duplicates...")
-
-        api_url = "https://openrouter.ai/api/v1/chat/completions"
-
-        payload = {
-            "model": OPENROUTER_MODEL,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an iOS app duplicate detection expert. Given two app names, "
-                        "determine if they refer to the SAME app or DIFFERENT apps.\n\n"
-                        "Rules:\n"
-                        "1. Names like 'Instagram' and 'Instagram (BHInstagram)' are DUPLICATES "
-                        "(one is tweaked version of the other)\n"
-                        "2. Names like 'Locket' and 'Locket (Locket Gold)' are DUPLICATES "
-                        "(Locket Gold is not a known tweak, it's likely the same app with premium features)\n"
-                        "3. Names like 'YouTube' and 'YouTube Music' are DIFFERENT apps\n"
-                        "4. Names like 'Telegram' and 'Swiftgram' are DIFFERENT apps (Swiftgram is a separate app)\n"
-                        "5. Ignore capitalization, spacing, and special characters\n"
-                        "6. Ignore suffixes like 'Pro', 'Plus', 'Premium', 'Gold', etc. - these are duplicates\n"
-                        "7. If the base app name is the same (ignoring modifiers), they are duplicates\n\n"
-                        "Respond with ONLY a JSON object:\n"
-                        "{\n"
-                        '  "result": "duplicate" or "different",\n'
-                        '  "reason": "brief explanation"\n'
-                        "}"
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": f"App 1: {name1}\nApp 2: {name2}"
-                }
-            ],
-            "temperature": 0,
-            "max_tokens": 150,
-            "response_format": {"type": "json_object"}
-        }
-
-        headers = {
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://github.com/FTRepo/FTRepo",
-            "X-Title": "FTRepo Duplicate Cleaner"
-        }
-
-        req = urllib.request.Request(
-            api_url,
-            data=json.dumps(payload).encode('utf-8'),
-            headers=headers,
-            method='POST'
-        )
-
-        with urllib.request.urlopen(req, timeout=15) as response:
-            result = json.loads(response.read().decode('utf-8'))
-
-        if 'choices' in result and len(result['choices']) > 0:
-            content = result['choices'][0]['message']['content'].strip()
-            ai_response = json.loads(content)
-
-            result_type = ai_response.get('result', 'unknown')
-            reason = ai_response.get('reason', 'No reason provided')
-
-            print(f"  [AI] Result: {result_type} - {reason}")
-
-            # Cache the result
-            _ai_duplicate_cache[cache_key] = result_type
-
-            return result_type
-        else:
-            print(f"  [AI] Unexpected response format")
-            return 'unknown'
-
-    except Exception as e:
-        print(f"  [AI] Failed to check duplicates: {e}")
-        return 'unknown'
+    if not deletions:
+        return 0
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DELETES) as executor:
+        results = list(executor.map(lambda deletion: delete_release_asset(*deletion), deletions))
+    return sum(1 for deleted in results if deleted)
 
 
+@lru_cache(maxsize=4096)
 def extract_base_name_and_tweak(app_name):
     """
-    Extract base app name and tweak name from full app name.
+    Extract base app name and tweak name from full app name (cached).
 
     Examples:
         "Instagram (BHInstagram)" -> ("Instagram", "BHInstagram")
@@ -312,7 +654,7 @@ def extract_base_name_and_tweak(app_name):
         tuple: (base_name, tweak_name or None)
     """
     # Pattern: AppName (TweakName) or AppName (Modifier)
-    match = re.search(r'^(.+?)\s*\(([^)]+)\)$', app_name)
+    match = _BASE_TWEAK_RE.search(app_name)
     if match:
         base_name = match.group(1).strip()
         tweak_name = match.group(2).strip()
@@ -321,6 +663,21 @@ def extract_base_name_and_tweak(app_name):
         return app_name, None
 
 
+@lru_cache(maxsize=8)
+def _compile_known_tweaks(known_tweaks):
+    """
+    Build a single case-insensitive alternation regex for a tuple of tweak names.
+
+    Returns:
+        tuple: (compiled pattern, dict mapping lowercased tweak -> tweak as listed)
+    """
+    pattern = re.compile(r'\b(' + '|'.join(re.escape(tweak) for tweak in known_tweaks) + r')\b', re.IGNORECASE)
+    canonical_names = {}
+    for tweak in known_tweaks:
+        canonical_names.setdefault(tweak.lower(), tweak)
+    return pattern, canonical_names
+
+
 def extract_tweak_from_filename(filename, known_tweaks):
     """
     Extract tweak name from filename by searching for known tweak names anywhere in the filename.
@@ -340,16 +697,21 @@ def extract_tweak_from_filename(filename, known_tweaks):
     if not known_tweaks:
         return None
 
-    # Search for each known tweak as a word boundary in the filename
-    for tweak in known_tweaks:
-        # Use word boundaries to avoid partial matches
-        pattern = r'\b' + re.escape(tweak) + r'\b'
-        if re.search(pattern, filename, re.IGNORECASE):
-            return tweak
+    # Search for all known tweaks at once, as whole words, in a single pass
+    pattern, canonical_names = _compile_known_tweaks(tuple(known_tweaks))
+    match = pattern.search(filename)
+    if match:
+        return canonical_names[match.group(1).lower()]
 
     return None
 
 
+@lru_cache(maxsize=8)
+def _lowercase_tweak_set(known_tweaks):
+    """Return a frozenset of lowercased tweak names for a tuple of known tweaks"""
+    return frozenset(tweak.lower() for tweak in known_tweaks)
+
+
 def is_tweak_in_list(tweak_name, known_tweaks):
     """
     Check if a tweak name is in the known tweaks list (case-insensitive).
@@ -364,36 +726,260 @@ def is_tweak_in_list(tweak_name, known_tweaks):
     if not tweak_name or not known_tweaks:
         return False
 
-    # Case-insensitive comparison
-    tweak_lower = tweak_name.lower()
-    return any(known.lower() == tweak_lower for known in known_tweaks)
+    # Case-insensitive comparison against a set lowercased once per tweak list
+    # (tuple() is a no-op for the tuple returned by load_tweaks_list())
+    return tweak_name.lower() in _lowercase_tweak_set(tuple(known_tweaks))
+
+
+@lru_cache(maxsize=None)
+def parse_version(version):
+    """
+    Parse a version string into a tuple of ints for comparison (cached).
+
+    Trailing zero components are dropped so "2.0" and "2.0.0" compare equal.
+
+    Examples:
+        "405.1.0" -> (405, 1)
+        "2-19" -> (2, 19)
+    """
+    parts = [int(x) for x in _VERSION_SPLIT_RE.split(str(version)) if x.isdecimal()]
+    while parts and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+
+def parse_asset_filename(filename):
+    """
+    Split an IPA filename into its base app name and app version.
+
+    The first version token is treated as the app version; later ones
+    (e.g. a tweak version) are ignored.
+
+    Examples:
+        "Instagram v405.1.0 Theta v4.0 blatant Patched.ipa" -> ("Instagram", "405.1.0")
+        "App_v9_1_10_Pro.ipa" -> ("App", "9.1.10")
+        "YouTube.ipa" -> ("YouTube", None)
+
+    Returns:
+        tuple: (base_name, version or None)
+    """
+    name = filename[:-4] if filename.lower().endswith('.ipa') else filename
+    match = _ASSET_VERSION_RE.search(name)
+    if not match:
+        return name.strip(), None
+    base_name = name[:match.start()].strip(' _-')
+    return base_name, match.group(1).replace('_', '.')
 
 
-def compare_versions(v1, v2):
+def local_group_duplicates(filenames, known_tweaks=None):
     """
-    Compare two version strings and return True if v1 is newer than v2.
+    Group release asset filenames that are obviously duplicates without AI.
+
+    Two files are grouped when their names are identical once version tokens
+    are removed (ignoring case, spacing, underscores and dashes) and they carry
+    the same known tweak. A group is only resolved locally if every file has a
+    parseable version and the newest version is unique; anything else is left
+    for the AI.
 
     Args:
-        v1: First version string
-        v2: Second version string
+        filenames: List of IPA filenames
+        known_tweaks: List of known tweak names
 
     Returns:
-        True if v1 > v2, False otherwise
+        tuple: (duplicate_groups, residual_filenames)
+            duplicate_groups uses the same format as check_all_release_assets_with_ai
+            residual_filenames are the files that could not be decided locally
     """
+    candidate_groups = {}
+    residual = []
+    for filename in filenames:
+        base_name, version = parse_asset_filename(filename)
+        if not base_name or not version:
+            residual.append(filename)
+            continue
+
+        name = filename[:-4] if filename.lower().endswith('.ipa') else filename
+        stripped_name = _ASSET_SEPARATOR_RE.sub(' ', _ASSET_VERSION_RE.sub(' ', name)).strip().lower()
+        tweak = extract_tweak_from_filename(filename, known_tweaks)
+        group_key = (stripped_name, tweak.lower() if tweak else '')
+        candidate_groups.setdefault(group_key, []).append((filename, base_name, version, tweak))
+
+    duplicate_groups = []
+    for members in candidate_groups.values():
+        if len(members) < 2:
+            residual.extend(member[0] for member in members)
+            continue
+
+        members_sorted = sorted(members, key=lambda member: parse_version(member[2]), reverse=True)
+        if parse_version(members_sorted[0][2]) == parse_version(members_sorted[1][2]):
+            # Newest version is not unique - let the AI decide
+            residual.extend(member[0] for member in members)
+            continue
+
+        newest = members_sorted[0]
+        older = members_sorted[1:]
+        duplicate_groups.append({
+            'app_name': newest[1],
+            'tweak_name': newest[3],
+            'keep': newest[0],
+            'delete': [member[0] for member in older],
+            'reason': f"Local match: v{newest[2]} supersedes " + ', '.join(f"v{member[2]}" for member in older)
+        })
+
+    return duplicate_groups, residual
+
+
+def group_related_filenames(filenames, known_tweaks=None):
+    """
+    Group filenames by normalized (base app name, tweak).
+
+    Only files in the same group can be duplicates of each other, so this is
+    used to keep related files together when batching them for the AI.
+
+    Args:
+        filenames: List of IPA filenames
+        known_tweaks: List of known tweak names
+
+    Returns:
+        dict mapping (normalized_base_name, lowercased tweak or '') -> list of filenames
+    """
+    groups = {}
+    for filename in filenames:
+        base_name, _ = parse_asset_filename(filename)
+        normalized_base = _ASSET_SEPARATOR_RE.sub(' ', base_name).strip().lower()
+        tweak = extract_tweak_from_filename(filename, known_tweaks)
+        groups.setdefault((normalized_base, tweak.lower() if tweak else ''), []).append(filename)
+    return groups
+
+
+def estimate_filename_tokens(filename):
+    """Rough token count of one numbered filename line in the AI prompt (~4 chars per token)"""
+    return len(filename) // 4 + 2
+
+
+def pack_filename_groups(groups, token_budget):
+    """
+    Pack groups of related filenames into chunks of at most token_budget estimated tokens.
+
+    Uses first-fit-decreasing so a group is never split across chunks unless
+    it exceeds token_budget on its own.
+
+    Args:
+        groups: Iterable of filename lists
+        token_budget: Maximum estimated prompt tokens per chunk
+
+    Returns:
+        List of chunks (lists of filenames)
+    """
+    # Split oversized groups into pieces that fit; pieces are packed like any other group
+    pieces = []
+    for group in groups:
+        piece, piece_tokens = [], 0
+        for filename in group:
+            tokens = estimate_filename_tokens(filename)
+            if piece and piece_tokens + tokens > token_budget:
+                pieces.append((piece_tokens, piece))
+                piece, piece_tokens = [], 0
+            piece.append(filename)
+            piece_tokens += tokens
+        if piece:
+            pieces.append((piece_tokens, piece))
+
+    chunks = []  # [tokens, filenames] pairs
+    for piece_tokens, piece in sorted(pieces, key=lambda item: item[0], reverse=True):
+        for chunk in chunks:
+            if chunk[0] + piece_tokens <= token_budget:
+                chunk[0] += piece_tokens
+                chunk[1].extend(piece)
+                break
+        else:
+            chunks.append([piece_tokens, list(piece)])
+    return [filenames for _, filenames in chunks]
+
+
+def read_streamed_completion(response):
+    """
+    Read a streamed (server-sent events) OpenRouter chat completion.
+
+    Content deltas are accumulated as they arrive, and reading stops as soon
+    as the accumulated content is a complete JSON document, without waiting
+    for the rest of the stream. If the connection times out mid-stream, the
+    content received so far is returned so the caller can try to recover it.
+
+    Returns:
+        dict shaped like a non-streamed completion:
+        {'choices': [{'message': {'content': str}, 'finish_reason': str|None}]}
+    """
+    content_parts = []
+    finish_reason = None
     try:
-        # Extract numeric parts from version strings
-        v1_parts = [int(x) for x in re.split(r'[.-]', str(v1)) if x.isdigit()]
-        v2_parts = [int(x) for x in re.split(r'[.-]', str(v2)) if x.isdigit()]
+        for raw_line in response:
+            line = raw_line.decode('utf-8').strip()
+            # Skip blank separators and SSE comments (": OPENROUTER PROCESSING")
+            if not line.startswith('data:'):
+                continue
+            data = line[len('data:'):].strip()
+            if data == '[DONE]':
+                break
+
+            chunk = loads_json(data)
+            if 'error' in chunk:
+                raise RuntimeError(chunk['error'].get('message', chunk['error']))
+            if not chunk.get('choices'):
+                continue
 
-        # Pad with zeros to make them equal length
-        max_len = max(len(v1_parts), len(v2_parts))
-        v1_parts.extend([0] * (max_len - len(v1_parts)))
-        v2_parts.extend([0] * (max_len - len(v2_parts)))
+            choice = chunk['choices'][0]
+            delta = choice.get('delta', {}).get('content')
+            if delta:
+                content_parts.append(delta)
+                # Stop early once the JSON object is complete
+                if delta.rstrip().endswith('}'):
+                    try:
+                        json.loads(''.join(content_parts))
+                        break
+                    except json.JSONDecodeError:
+                        pass
+            if choice.get('finish_reason'):
+                finish_reason = choice['finish_reason']
+                break
+    except TimeoutError:
+        if not content_parts:
+            raise
+        print(f"  [WARNING] AI stream timed out, using the partial response")
+
+    return {'choices': [{'message': {'content': ''.join(content_parts)}, 'finish_reason': finish_reason}]}
+
+
+@lru_cache(maxsize=8)
+def _build_system_prompt(known_tweaks):
+    """
+    Build the system message content for the AI asset check (cached per tweak list).
 
-        return v1_parts > v2_parts
-    except:
-        # Fallback to string comparison
-        return str(v1) > str(v2)
+    Every chunk reuses the same object, so the request prefix is byte-identical
+    and eligible for the provider's prompt cache.
+
+    Args:
+        known_tweaks: Tuple of known tweak names
+
+    Returns:
+        List of text content parts for the system message
+    """
+    if known_tweaks:
+        tweaks_text = f"KNOWN TWEAK NAMES (These are DISTINCT tweaks - NEVER treat them as duplicates):\n{', '.join(known_tweaks)}"
+    else:
+        tweaks_text = "KNOWN TWEAK NAMES: none provided"
+
+    return [
+        {
+            "type": "text",
+            "text": ASSET_DUPLICATE_SYSTEM_PROMPT,
+            "cache_control": {"type": "ephemeral"}
+        },
+        {
+            "type": "text",
+            "text": tweaks_text
+        }
+    ]
 
 
 def check_all_release_assets_with_ai(filenames, known_tweaks=None):
@@ -415,109 +1001,63 @@ def check_all_release_assets_with_ai(filenames, known_tweaks=None):
         print(f"[WARNING] OPENROUTER_API_KEY not set, skipping AI asset check")
         return []
 
+    # Deduplicate and sort so no filename is sent twice and chunks/cache keys are canonical
+    filenames = sorted(set(filenames))
+
     if len(filenames) < 2:
         print(f"[INFO] Not enough files to compare")
         return []
 
     # If we have too many files, process in chunks to avoid token limits
-    CHUNK_SIZE = 50  # Process 50 files at a time
-    if len(filenames) > CHUNK_SIZE:
-        print(f"  [INFO] Processing {len(filenames)} files in chunks of {CHUNK_SIZE}")
+    if sum(estimate_filename_tokens(filename) for filename in filenames) > AI_BATCH_TOKEN_BUDGET:
+        # Keep related files (same base app and tweak) in the same chunk so
+        # duplicates are never split across requests
+        chunks = pack_filename_groups(group_related_filenames(filenames, known_tweaks).values(), AI_BATCH_TOKEN_BUDGET)
+        print(f"  [INFO] Processing {len(filenames)} files in {len(chunks)} chunks of up to ~{AI_BATCH_TOKEN_BUDGET} tokens")
+
+        def process_chunk(indexed_chunk):
+            chunk_idx, chunk = indexed_chunk
+            print(f"  [CHUNK {chunk_idx}/{len(chunks)}] Processing {len(chunk)} files")
+            return _check_asset_batch_with_ai(sorted(chunk), known_tweaks)
+
+        # Chunks are independent requests, so send several at once; map() keeps
+        # the results in chunk order
+        indexed_chunks = [(i, chunk) for i, chunk in enumerate(chunks, 1) if len(chunk) >= 2]
         all_duplicate_groups = []
-        for i in range(0, len(filenames), CHUNK_SIZE):
-            chunk = filenames[i:i + CHUNK_SIZE]
-            print(f"  [CHUNK] Processing files {i+1}-{min(i+CHUNK_SIZE, len(filenames))}")
-            chunk_groups = check_all_release_assets_with_ai(chunk, known_tweaks)
-            all_duplicate_groups.extend(chunk_groups)
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_AI_REQUESTS) as executor:
+            for chunk_groups in executor.map(process_chunk, indexed_chunks):
+                all_duplicate_groups.extend(chunk_groups)
         return all_duplicate_groups
 
+    return _check_asset_batch_with_ai(filenames, known_tweaks)
+
+
+def _check_asset_batch_with_ai(filenames, known_tweaks=None):
+    """
+    Send one batch of IPA filenames to OpenRouter and return its duplicate groups.
+
+    Callers are expected to have checked OPENROUTER_API_KEY and to pass a sorted,
+    deduplicated batch small enough for a single request.
+    """
     # Check cache first
-    cache_key = f"assets_batch:{hash(tuple(sorted(filenames)))}"
-    if cache_key in _ai_duplicate_cache:
+    cache_key = ai_cache_key('assets_batch', filenames)
+    cached = ai_cache_get(cache_key)
+    if cached is not None:
         print(f"  [AI CACHE] Using cached batch result")
-        return _ai_duplicate_cache[cache_key]
+        return cached
 
     try:
         print(f"  [AI] Analyzing {len(filenames)} IPA files for duplicates...")
 
-        api_url = "https://openrouter.ai/api/v1/chat/completions"
-
         # Build the filenames list for the prompt
         filenames_text = "\n".join([f"{i+1}. {name}" for i, name in enumerate(filenames)])
 
-        # Build known tweaks text for the prompt
-        tweaks_text = ""
-        if known_tweaks:
-            tweaks_text = f"\n\nKNOWN TWEAK NAMES (These are DISTINCT tweaks - NEVER treat them as duplicates):\n{', '.join(known_tweaks)}\n\n"
-
         payload = {
             "model": OPENROUTER_MODEL,
             "messages": [
                 {
                     "role": "system",
-                    "content": (
-                        "You are an iOS IPA filename analyzer. Given a list of IPA filenames, identify groups of duplicates.\n\n"
-                        "A duplicate group is:\n"
-                        "- Same base app name (ignore case, spacing, underscores, dashes)\n"
-                        "- Same modifiers (Pro, Unlocked, Patched, etc.) - these are NOT version differences\n"
-                        "- Same EXACT tweak name (can appear anywhere in filename as a standalone word)\n"
-                        "- Different version numbers (v1.0, v2.0, v2.19, v2.20, v2.21, etc.)\n\n"
-                        f"{tweaks_text}"
-                        "TWEAK IDENTIFICATION:\n"
-                        "- Tweaks can appear ANYWHERE in the filename as standalone words\n"
-                        "- Examples: 'Instagram v405.1.0 BHInsta v1.2 Patched.ipa' → tweak is 'BHInsta'\n"
-                        "- Examples: 'Instagram v405.1.0 Theta v4.0 Patched.ipa' → tweak is 'Theta'\n"
-                        "- Match tweak names from the KNOWN TWEAKS list above\n"
-                        "- BHInsta and Theta are DIFFERENT tweaks - NEVER group them together!\n\n"
-                        "VERSION EXTRACTION RULES:\n"
-                        "- Version can be anywhere in the filename: 'App v2.19.ipa', 'App_v2_19.ipa', 'App 2.19.ipa'\n"
-                        "- Common patterns: v2.19, v2_19, 2.19, 404.0, 42.3.0\n"
-                        "- Version format: major.minor.patch (e.g., 2.21 > 2.20 > 2.19)\n"
-                        "- App version vs Tweak version: 'Instagram v405.1.0 BHInsta v1.2' has both - compare app versions\n"
-                        "- IGNORE words like 'Pro', 'Unlocked', 'Patched', 'Premium', 'blatant' - these are modifiers, not versions\n\n"
-                        "EXAMPLES:\n"
-                        "✅ DUPLICATES:\n"
-                        "- 'Instagram v405.1.0 BHInsta v1.2 blatant Patched.ipa' and 'Instagram v404.0.0 BHInsta v1.2 blatant Patched.ipa'\n"
-                        "  → Same app (Instagram), SAME tweak (BHInsta), different app versions (405.1.0 vs 404.0.0)\n"
-                        "  → KEEP v405.1.0, DELETE v404.0.0\n"
-                        "- 'Instagram v405.1.0 Theta v4.0 blatant Patched.ipa' and 'Instagram v404.0.0 Theta v3.9 blatant Patched.ipa'\n"
-                        "  → Same app (Instagram), SAME tweak (Theta), different app versions (405.1.0 vs 404.0.0)\n"
-                        "  → KEEP v405.1.0, DELETE v404.0.0\n"
-                        "- 'Coconote - AI Note Taker v2.19 Pro Unlocked blatant Patched.ipa'\n"
-                        "  'Coconote - AI Note Taker v2.20 Pro Unlocked blatant Patched.ipa'\n"
-                        "  'Coconote - AI Note Taker v2.21 Pro Unlocked blatant Patched.ipa'\n"
-                        "  → Same app, same modifiers, no tweaks, different versions (2.19, 2.20, 2.21)\n"
-                        "  → KEEP v2.21, DELETE v2.19 and v2.20\n\n"
-                        "❌ NOT DUPLICATES:\n"
-                        "- 'Instagram v405.1.0 BHInsta v1.2 blatant Patched.ipa' and 'Instagram v405.1.0 Theta v4.0 blatant Patched.ipa'\n"
-                        "  → DIFFERENT tweaks (BHInsta vs Theta) - NEVER treat different tweaks as duplicates!\n"
-                        "  → Even though they have the same app version, they are DIFFERENT files!\n"
-                        "- 'Instagram v405.1.0 BHInsta v1.2.ipa' and 'Instagram v404.0.0 Theta v4.0.ipa'\n"
-                        "  → DIFFERENT tweaks - even if BHInsta has newer version, they are NOT duplicates!\n"
-                        "- 'YouTube.ipa' and 'YouTube Music.ipa'\n"
-                        "  → Different apps (YouTube vs YouTube Music)\n\n"
-                        "CRITICAL RULES:\n"
-                        "- ONLY group files as duplicates if they have the EXACT SAME tweak name (or both have NO tweak)\n"
-                        "- Different tweaks are NEVER EVER duplicates, even if one has a newer version number\n"
-                        "- BHInsta, Theta, TikTokLRD, VibeTok, etc. are all DIFFERENT tweaks - keep them separate!\n"
-                        "- Focus on VERSION NUMBERS WITHIN the same tweak only\n"
-                        "- Ignore modifiers like Pro, Unlocked, Patched, Premium, blatant - these are NOT versions!\n"
-                        "- If filenames are identical except for version numbers AND have the same tweak, they are duplicates\n"
-                        "- Keep the file with the HIGHEST app version number within each tweak group\n\n"
-                        "Respond with ONLY a JSON object with a 'groups' array:\n"
-                        "{\n"
-                        '  "groups": [\n'
-                        "    {\n"
-                        '      "app_name": "App Name",\n'
-                        '      "tweak_name": "Tweak Name or null",\n'
-                        '      "keep": "filename with newest version",\n'
-                        '      "delete": ["older filename 1", "older filename 2"],\n'
-                        '      "reason": "brief explanation with versions"\n'
-                        "    }\n"
-                        "  ]\n"
-                        "}\n\n"
-                        "If no duplicates found, return: {\"groups\": []}"
-                    )
+                    "content": _build_system_prompt(tuple(known_tweaks or ()))
                 },
                 {
                     "role": "user",
@@ -525,26 +1065,15 @@ def check_all_release_assets_with_ai(filenames, known_tweaks=None):
                 }
             ],
             "temperature": 0,
-            "max_tokens": 2000,
-            "response_format": {"type": "json_object"}
+            # Each file is echoed back once in the groups, plus reasons - scale
+            # with the batch so large batches aren't truncated
+            "max_tokens": min(AI_BATCH_MAX_OUTPUT_TOKENS, 200 + 50 * len(filenames)),
+            "response_format": {"type": "json_object"},
+            "stream": True
         }
 
-        headers = {
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://github.com/FTRepo/FTRepo",
-            "X-Title": "FTRepo Duplicate Cleaner"
-        }
-
-        req = urllib.request.Request(
-            api_url,
-            data=json.dumps(payload).encode('utf-8'),
-            headers=headers,
-            method='POST'
-        )
-
-        with urllib.request.urlopen(req, timeout=60) as response:  # Increased timeout for large batches
-            result = json.loads(response.read().decode('utf-8'))
+        with open_openrouter(payload, timeout=60) as response:  # Increased timeout for large batches
+            result = read_streamed_completion(response)
 
         if 'choices' in result and len(result['choices']) > 0:
             content = result['choices'][0]['message']['content'].strip()
@@ -565,15 +1094,14 @@ def check_all_release_assets_with_ai(filenames, known_tweaks=None):
                 print(f"  {'~' * (e.pos - start)}^")
 
                 # Try to salvage the response by extracting JSON from markdown code blocks
-                import re
-                json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', content, re.DOTALL)
+                json_match = _MARKDOWN_JSON_RE.search(content)
                 if json_match:
                     print(f"  [RECOVERY] Found JSON in markdown code block, trying again...")
                     content = json_match.group(1).strip()
                     ai_response = json.loads(content)
                 else:
                     # Last resort: try to find any JSON object in the content
-                    json_match = re.search(r'\{.*\}', content, re.DOTALL)
+                    json_match = _JSON_OBJECT_RE.search(content)
                     if json_match:
                         print(f"  [RECOVERY] Found JSON object, trying again...")
                         content = json_match.group(0).strip()
@@ -591,9 +1119,9 @@ def check_all_release_assets_with_ai(filenames, known_tweaks=None):
                 duplicate_groups = ai_response
 
             # Check if response was truncated
-            if result.get('usage', {}).get('completion_tokens', 0) >= 2000:
+            if result['choices'][0].get('finish_reason') == 'length':
                 print(f"  [WARNING] AI response may have been truncated (hit max_tokens)")
-                print(f"  [INFO] Consider reducing CHUNK_SIZE or increasing max_tokens")
+                print(f"  [INFO] Consider reducing AI_BATCH_TOKEN_BUDGET or increasing AI_BATCH_MAX_OUTPUT_TOKENS")
 
             print(f"  [AI] Found {len(duplicate_groups)} duplicate group(s)")
 
@@ -635,7 +1163,7 @@ def check_all_release_assets_with_ai(filenames, known_tweaks=None):
                 duplicate_groups = validated_groups
 
             # Cache the result
-            _ai_duplicate_cache[cache_key] = duplicate_groups
+            ai_cache_put(cache_key, duplicate_groups)
 
             return duplicate_groups
         else:
@@ -643,145 +1171,14 @@ def check_all_release_assets_with_ai(filenames, known_tweaks=None):
             return []
 
     except Exception as e:
-        print(f"  [AI] Failed to analyze assets: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"  [AI] Failed to analyze assets: {type(e).__name__}: {e}")
+        # Full tracebacks only on request - they flood the CI log on flaky networks
+        if os.getenv('DEBUG'):
+            import traceback
+            traceback.print_exc()
         return []
 
 
-def check_release_assets_with_ai(filename1, filename2):
-    """
-    Use OpenRouter AI to check if two IPA filenames are duplicates (same app, different versions).
-
-    Args:
-        filename1: First filename
-        filename2: Second filename
-
-    Returns:
-        dict with:
-            - 'duplicate': bool - True if same app, different versions
-            - 'newer_file': str - Which file has the newer version (filename1 or filename2)
-            - 'reason': str - Explanation
-    """
-    if not OPENROUTER_API_KEY:
-        print(f"[WARNING] OPENROUTER_API_KEY not set, skipping AI asset check")
-        return {'duplicate': False, 'newer_file': None, 'reason': 'No API key'}
-
-    # Check cache first
-    cache_key = f"assets:{filename1}|{filename2}"
-    reverse_cache_key = f"assets:{filename2}|{filename1}"
-
-    if cache_key in _ai_duplicate_cache:
-        return _ai_duplicate_cache[cache_key]
-    if reverse_cache_key in _ai_duplicate_cache:
-        # Reverse the result
-        cached = _ai_duplicate_cache[reverse_cache_key]
-        if cached['duplicate']:
-            return {
-                'duplicate': True,
-                'newer_file': filename1 if cached['newer_file'] == filename2 else filename2,
-                'reason': cached['reason']
-            }
-        return cached
-
-    try:
-        print(f"  [AI] Comparing release assets: '{filename1}' vs '{filename2}'")
-
-        api_url = "https://openrouter.ai/api/v1/chat/completions"
-
-        payload = {
-            "model": OPENROUTER_MODEL,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an iOS IPA filename analyzer. Given two IPA filenames, determine:\n"
-                        "1. Are they the SAME app (possibly with different versions)?\n"
-                        "2. If yes, which version is NEWER?\n\n"
-                        "Rules:\n"
-                        "- Extract app name, version, and tweak name from filenames\n"
-                        "- Compare app names (ignore case, spacing, underscores)\n"
-                        "- If app names match, compare versions (e.g., v42.3.0 > v42.0.0)\n"
-                        "- Consider tweaks: 'Instagram (BHInstagram) v404.0' and 'Instagram (Theta) v404.0' are DIFFERENT\n"
-                        "- Consider tweaks: 'Instagram (BHInstagram) v404.0' and 'Instagram (BHInstagram) v402.0' are SAME (different versions)\n\n"
-                        "Respond with ONLY a JSON object:\n"
-                        "{\n"
-                        '  "same_app": true or false,\n'
-                        '  "newer_file": "file1" or "file2" (only if same_app is true),\n'
-                        '  "app_name": "extracted app name",\n'
-                        '  "version1": "extracted version from file1",\n'
-                        '  "version2": "extracted version from file2",\n'
-                        '  "tweak1": "extracted tweak from file1 or null",\n'
-                        '  "tweak2": "extracted tweak from file2 or null",\n'
-                        '  "reason": "brief explanation"\n'
-                        "}"
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": f"File 1: {filename1}\nFile 2: {filename2}"
-                }
-            ],
-            "temperature": 0,
-            "max_tokens": 300,
-            "response_format": {"type": "json_object"}
-        }
-
-        headers = {
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://github.com/FTRepo/FTRepo",
-            "X-Title": "FTRepo Duplicate Cleaner"
-        }
-
-        req = urllib.request.Request(
-            api_url,
-            data=json.dumps(payload).encode('utf-8'),
-            headers=headers,
-            method='POST'
-        )
-
-        with urllib.request.urlopen(req, timeout=15) as response:
-            result = json.loads(response.read().decode('utf-8'))
-
-        if 'choices' in result and len(result['choices']) > 0:
-            content = result['choices'][0]['message']['content'].strip()
-            ai_response = json.loads(content)
-
-            same_app = ai_response.get('same_app', False)
-            newer_file_indicator = ai_response.get('newer_file', None)
-            reason = ai_response.get('reason', 'No reason provided')
-
-            # Map 'file1'/'file2' to actual filenames
-            newer_file = None
-            if same_app and newer_file_indicator:
-                if newer_file_indicator.lower() == 'file1':
-                    newer_file = filename1
-                elif newer_file_indicator.lower() == 'file2':
-                    newer_file = filename2
-
-            result_dict = {
-                'duplicate': same_app,
-                'newer_file': newer_file,
-                'reason': reason,
-                'details': ai_response
-            }
-
-            print(f"  [AI] Result: {result_dict}")
-
-            # Cache the result
-            _ai_duplicate_cache[cache_key] = result_dict
-
-            return result_dict
-        else:
-            print(f"  [AI] Unexpected response format")
-            return {'duplicate': False, 'newer_file': None, 'reason': 'Unexpected response'}
-
-    except Exception as e:
-        print(f"  [AI] Failed to compare assets: {e}")
-        return {'duplicate': False, 'newer_file': None, 'reason': f'Error: {e}'}
-
-
 def clean_duplicates():
     """Main function to clean duplicate apps from apps.json"""
     print("\n" + "=" * 60)
@@ -795,6 +1192,9 @@ def clean_duplicates():
         print("AI duplicate detection will be skipped. Set the API key for better accuracy.")
         print("Get your API key from: https://openrouter.ai/\n")
 
+    # Load AI duplicate cache from previous runs
+    load_ai_duplicate_cache()
+
     # Load tweaks list
     known_tweaks = load_tweaks_list()
     print(f"[TWEAKS] Known tweaks: {', '.join(known_tweaks)}")
@@ -805,8 +1205,7 @@ def clean_duplicates():
         return
 
     print(f"\n[LOAD] Loading {REPO_FILE}...")
-    with open(REPO_FILE, 'r', encoding='utf-8') as f:
-        repo_data = json.load(f)
+    repo_data = load_json(REPO_FILE)
 
     apps = repo_data.get('apps', [])
     print(f"[LOAD] Found {len(apps)} apps in {REPO_FILE}")
@@ -815,12 +1214,10 @@ def clean_duplicates():
     release_assets = get_release_assets()
 
     # Group apps by bundle ID to find potential duplicates
-    apps_by_bundle = {}
+    apps_by_bundle = defaultdict(list)
     for app in apps:
         bundle_id = app.get('bundleIdentifier', '')
         if bundle_id:
-            if bundle_id not in apps_by_bundle:
-                apps_by_bundle[bundle_id] = []
             apps_by_bundle[bundle_id].append(app)
 
     print(f"\n[SCAN] Scanning for duplicates...")
@@ -835,10 +1232,12 @@ def clean_duplicates():
         if len(bundle_apps) <= 1:
             continue
 
-        print(f"\n[BUNDLE] Found {len(bundle_apps)} apps with bundle ID: {bundle_id}")
+        # Collect this bundle's report and write it in one go - per-line
+        # print() calls are slow when stdout is an unbuffered CI pipe
+        log_lines = [f"\n[BUNDLE] Found {len(bundle_apps)} apps with bundle ID: {bundle_id}"]
 
         # Group by exact app name pattern (base + tweak)
-        app_groups = {}
+        app_groups = defaultdict(list)
         for app in bundle_apps:
             app_name = app.get('name', '')
             base_name, tweak_name = extract_base_name_and_tweak(app_name)
@@ -851,8 +1250,6 @@ def clean_duplicates():
             else:
                 group_key = f"{base_name}|NO_TWEAK"
 
-            if group_key not in app_groups:
-                app_groups[group_key] = []
             app_groups[group_key].append(app)
 
         # Now check each group for version duplicates
@@ -862,32 +1259,31 @@ def clean_duplicates():
                 app = apps_in_group[0]
                 app_name = app.get('name', '')
                 base_name, tweak_name = extract_base_name_and_tweak(app_name)
-                print(f"  [UNIQUE] {app_name}")
-                print(f"           Base: {base_name}, Tweak: {tweak_name or 'None'}")
+                log_lines.append(f"  [UNIQUE] {app_name}")
+                log_lines.append(f"           Base: {base_name}, Tweak: {tweak_name or 'None'}")
 
                 if tweak_name:
                     if is_tweak_in_list(tweak_name, known_tweaks):
-                        print(f"           [OK] Tweak '{tweak_name}' is in tweaks list")
+                        log_lines.append(f"           [OK] Tweak '{tweak_name}' is in tweaks list")
                     else:
-                        print(f"           [WARNING] Tweak '{tweak_name}' is NOT in tweaks list")
-                        print(f"           [INFO] Consider adding to tweaks_list.json or investigating")
+                        log_lines.append(f"           [WARNING] Tweak '{tweak_name}' is NOT in tweaks list")
+                        log_lines.append(f"           [INFO] Consider adding to tweaks_list.json or investigating")
                 continue
 
             # Multiple versions of the same app (with same tweak or no tweak)
-            print(f"  [VERSIONS] Found {len(apps_in_group)} versions of same app:")
+            log_lines.append(f"  [VERSIONS] Found {len(apps_in_group)} versions of same app:")
 
-            # Sort by version (newest first) using proper version comparison
-            from functools import cmp_to_key
+            # Sort by version (newest first) - each version is parsed once
             apps_in_group_sorted = sorted(
                 apps_in_group,
-                key=cmp_to_key(lambda a, b: 1 if compare_versions(a.get('version', '0.0.0'), b.get('version', '0.0.0')) else -1),
+                key=lambda app: parse_version(app.get('version', '0.0.0')),
                 reverse=True
             )
 
             for idx, app in enumerate(apps_in_group_sorted):
                 app_name = app.get('name', '')
                 version = app.get('version', 'unknown')
-                print(f"    [{idx+1}] {app_name} v{version}")
+                log_lines.append(f"    [{idx+1}] {app_name} v{version}")
 
             # Keep the newest, mark others for removal
             newest_app = apps_in_group_sorted[0]
@@ -897,8 +1293,8 @@ def clean_duplicates():
             newest_version = newest_app.get('version')
             newest_base, newest_tweak = extract_base_name_and_tweak(newest_name)
 
-            print(f"  [KEEP] Keeping newest: {newest_name} v{newest_version}")
-            print(f"         Tweak: {newest_tweak or 'None (stock app)'}")
+            log_lines.append(f"  [KEEP] Keeping newest: {newest_name} v{newest_version}")
+            log_lines.append(f"         Tweak: {newest_tweak or 'None (stock app)'}")
 
             for old_app in older_apps:
                 old_name = old_app.get('name', '')
@@ -908,12 +1304,12 @@ def clean_duplicates():
                 # Safety check: ensure tweaks match
                 tweak_match = (newest_tweak or '').lower() == (old_tweak or '').lower()
                 if not tweak_match:
-                    print(f"  [ERROR] Tweak mismatch detected! This should not happen.")
-                    print(f"          Newest: {newest_tweak or 'None'} vs Old: {old_tweak or 'None'}")
+                    log_lines.append(f"  [ERROR] Tweak mismatch detected! This should not happen.")
+                    log_lines.append(f"          Newest: {newest_tweak or 'None'} vs Old: {old_tweak or 'None'}")
                     continue
 
-                print(f"  [REMOVE] Removing older version: {old_name} v{old_version}")
-                print(f"           Tweak: {old_tweak or 'None (stock app)'}")
+                log_lines.append(f"  [REMOVE] Removing older version: {old_name} v{old_version}")
+                log_lines.append(f"           Tweak: {old_tweak or 'None (stock app)'}")
 
                 duplicates_found.append({
                     'name': old_name,
@@ -926,16 +1322,19 @@ def clean_duplicates():
 
                 # Mark IPA for deletion from release
                 download_url = old_app.get('downloadURL', '')
-                if download_url:
-                    filename = download_url.split('/')[-1]
-                    filename = urllib.parse.unquote(filename)
-
-                    if filename in release_assets:
-                        ipas_to_delete.append({
-                            'filename': filename,
-                            'asset_id': release_assets[filename]['id'],
-                            'app_name': old_name
-                        })
+                if not download_url:
+                    continue
+                # Release asset names are raw; the URL's last segment is percent-encoded
+                filename = urllib.parse.unquote(download_url.rsplit('/', 1)[-1])
+                asset = release_assets.get(filename)
+                if asset:
+                    ipas_to_delete.append({
+                        'filename': filename,
+                        'asset_id': asset['id'],
+                        'app_name': old_name
+                    })
+
+        print('\n'.join(log_lines))
 
     # Skip cross-bundle duplicate check for now
     # Different bundle IDs usually mean legitimately different apps
@@ -959,21 +1358,27 @@ def clean_duplicates():
         print(f"\n[ACTION] Removing {len(apps_to_remove)} duplicate app(s) from {REPO_FILE}...")
 
         # Remove duplicates from apps list
-        cleaned_apps = [app for app in apps if app not in apps_to_remove]
+        # Match by identity: apps_to_remove holds the same objects as apps, and
+        # dict equality would also drop an identical copy of the app we keep
+        remove_ids = {id(app) for app in apps_to_remove}
+        cleaned_apps = [app for app in apps if id(app) not in remove_ids]
 
         # Update repo data
         repo_data['apps'] = cleaned_apps
 
-        # Backup original file
-        backup_file = f"{REPO_FILE}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        print(f"[BACKUP] Creating backup: {backup_file}")
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump({"apps": apps}, f, indent=2, ensure_ascii=False)
+        # Backup original file - unless git already has it committed
+        if is_committed_in_git(REPO_FILE):
+            print(f"[BACKUP] {REPO_FILE} is committed in git, skipping backup")
+        else:
+            backup_file = f"{REPO_FILE}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            print(f"[BACKUP] Creating backup: {backup_file}")
+            with open(backup_file, 'wb') as f:
+                f.write(dumps_json({"apps": apps}))
 
         # Write cleaned data
         print(f"[WRITE] Saving cleaned {REPO_FILE}...")
-        with open(REPO_FILE, 'w', encoding='utf-8') as f:
-            json.dump(repo_data, f, indent=2, ensure_ascii=False)
+        if not write_json_atomic(REPO_FILE, repo_data):
+            print(f"[WRITE] {REPO_FILE} unchanged, skipping write")
 
         print(f"[SUCCESS] Removed {len(apps_to_remove)} duplicate(s)")
         print(f"[INFO] Apps remaining: {len(cleaned_apps)}")
@@ -981,11 +1386,9 @@ def clean_duplicates():
     if ipas_to_delete:
         print(f"\n[ACTION] Deleting {len(ipas_to_delete)} IPA(s) from release...")
 
-        deleted_count = 0
         for ipa in ipas_to_delete:
             print(f"  Deleting: {ipa['filename']} (for {ipa['app_name']})")
-            if delete_release_asset(ipa['asset_id'], ipa['filename']):
-                deleted_count += 1
+        deleted_count = delete_release_assets([(ipa['asset_id'], ipa['filename']) for ipa in ipas_to_delete])
 
         print(f"[SUCCESS] Deleted {deleted_count}/{len(ipas_to_delete)} IPA(s) from release")
 
@@ -1009,9 +1412,20 @@ def clean_duplicates():
         if len(ipa_assets) < 2:
             print("[INFO] Not enough IPA files to compare")
         else:
-            # Use AI to analyze ALL filenames at once (much more efficient!)
+            # Resolve structurally obvious duplicates locally first
             asset_filenames = list(ipa_assets.keys())
-            duplicate_groups = check_all_release_assets_with_ai(asset_filenames, known_tweaks)
+            duplicate_groups, residual_filenames = local_group_duplicates(asset_filenames, known_tweaks)
+            print(f"[LOCAL] Resolved {len(duplicate_groups)} duplicate group(s) without AI, "
+                  f"{len(residual_filenames)} file(s) left for AI")
+
+            # A file with no other file sharing its base name and tweak cannot be a duplicate
+            related_groups = group_related_filenames(residual_filenames, known_tweaks)
+            ai_candidates = [f for group in related_groups.values() if len(group) >= 2 for f in group]
+            print(f"[LOCAL] Dropped {len(residual_filenames) - len(ai_candidates)} file(s) with no possible duplicate")
+
+            # Use AI to analyze the remaining filenames at once (much more efficient!)
+            if len(ai_candidates) >= 2:
+                duplicate_groups.extend(check_all_release_assets_with_ai(ai_candidates, known_tweaks))
 
             if duplicate_groups:
                 print(f"\n[DUPLICATES] Found {len(duplicate_groups)} duplicate group(s)")
@@ -1053,11 +1467,11 @@ def clean_duplicates():
                 if files_to_delete:
                     print(f"\n[ACTION] Deleting {len(files_to_delete)} older IPA(s) from release...")
 
-                    deleted_count = 0
                     for file_info in files_to_delete:
                         print(f"  [DELETE] {file_info['filename']} (superseded by {file_info['kept_file']})")
-                        if delete_release_asset(file_info['asset_id'], file_info['filename']):
-                            deleted_count += 1
+                    deleted_count = delete_release_assets(
+                        [(file_info['asset_id'], file_info['filename']) for file_info in files_to_delete]
+                    )
 
                     print(f"[SUCCESS] Deleted {deleted_count}/{len(files_to_delete)} older IPA(s)")
                 else:
@@ -1065,6 +1479,9 @@ def clean_duplicates():
             else:
                 print("\n[OK] No duplicate IPAs found in release assets!")
 
+    # Save AI duplicate cache for future runs
+    save_ai_duplicate_cache()
+
     print("\n" + "=" * 60)
     print("CLEANUP COMPLETE")
     print("=" * 60)
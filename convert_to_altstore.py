@@ -9,12 +9,33 @@ import re
 import sys
 from pathlib import Path
 
+# Optional faster JSON, used by load_json_file() and dumps_json()
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Matches "Base Name (Tweak)", capturing the base name and the tweak
+_TWEAK_RE = re.compile(r'^(.+?)\s*\(([^)]+)\)\s*$')
+
+# Fields copied to the AltStore output only when present in the source
+OPTIONAL_APP_FIELDS = ('subtitle', 'tintColor', 'category', 'screenshots')
+OPTIONAL_VERSION_FIELDS = ('localizedDescription', 'minOSVersion')
+OPTIONAL_SOURCE_FIELDS = ('subtitle', 'description', 'iconURL', 'headerURL',
+                          'website', 'tintColor', 'featuredApps')
+
 
 def load_json_file(filepath):
-    """Load and parse a JSON file."""
+    """
+    Load and parse a JSON file.
+    The file is read in one call and parsed with orjson when it is installed.
+    """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        if orjson is None:
+            return json.loads(raw)
+        return orjson.loads(raw)
     except FileNotFoundError:
         print(f"Error: {filepath} not found")
         sys.exit(1)
@@ -23,23 +44,87 @@ def load_json_file(filepath):
         sys.exit(1)
 
 
-def extract_tweak_from_name(app_name, known_tweaks):
+def build_tweak_lookup(known_tweaks):
+    """
+    Map lowercase tweak names to their canonical spelling from tweaks_list.json.
+    The first spelling wins if a tweak is listed more than once.
+    """
+    tweak_lookup = {}
+    for tweak in known_tweaks:
+        tweak_lookup.setdefault(tweak.lower(), tweak)
+    return tweak_lookup
+
+
+def iter_source_apps(filepath, source_data):
+    """
+    Stream the apps of a source JSON file one at a time.
+
+    Uses ijson when it is installed, so only one app is held in memory at a
+    time; otherwise falls back to load_json_file(). The other top-level fields
+    (name, identifier, ...) are stored in source_data as they are parsed, so
+    they are complete once the iterator is exhausted.
+    """
+    try:
+        import ijson
+    except ImportError:
+        data = load_json_file(filepath)
+        source_data.update((key, value) for key, value in data.items() if key != 'apps')
+        yield from data.get('apps', [])
+        return
+
+    try:
+        with open(filepath, 'rb') as f:
+            key = None
+            builder = None
+            depth = 0
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if builder is None:
+                    if prefix == '':
+                        # Root object start/end, or the next top-level key
+                        if event == 'map_key':
+                            key = value
+                        continue
+                    if prefix == 'apps':
+                        # Start/end of the apps array itself
+                        continue
+                    builder = ijson.ObjectBuilder()
+                    depth = 0
+
+                builder.event(event, value)
+                if event in ('start_map', 'start_array'):
+                    depth += 1
+                elif event in ('end_map', 'end_array'):
+                    depth -= 1
+                if depth == 0:
+                    if key == 'apps':
+                        yield builder.value
+                    else:
+                        source_data[key] = builder.value
+                    builder = None
+    except FileNotFoundError:
+        print(f"Error: {filepath} not found")
+        sys.exit(1)
+    except ijson.JSONError as e:
+        print(f"Error parsing {filepath}: {e}")
+        sys.exit(1)
+
+
+def extract_tweak_from_name(app_name, tweak_lookup):
     """
     Extract tweak name from app name if it's in parentheses.
+    tweak_lookup is the dict returned by build_tweak_lookup().
     Returns (base_name, tweak_name) or (app_name, None) if no tweak found.
     """
-    # Pattern to match tweaks in parentheses
-    pattern = r'^(.+?)\s*\(([^)]+)\)\s*$'
-    match = re.match(pattern, app_name)
+    match = _TWEAK_RE.match(app_name)
 
     if match:
         base_name = match.group(1).strip()
         potential_tweak = match.group(2).strip()
 
         # Check if the extracted name matches a known tweak
-        for tweak in known_tweaks:
-            if tweak.lower() == potential_tweak.lower():
-                return base_name, tweak
+        tweak = tweak_lookup.get(potential_tweak.lower())
+        if tweak:
+            return base_name, tweak
 
     return app_name, None
 
@@ -59,13 +144,35 @@ def create_unique_bundle_id(original_bundle_id, tweak_name):
     return f"{original_bundle_id}.{tweak_suffix}"
 
 
-def convert_app_to_altstore_format(app, known_tweaks):
+def convert_version_to_altstore_format(version):
+    """
+    Convert a single version entry from apps.json format to AltStore format.
+    """
+    version_string = version.get('version', '')
+    altstore_version = {
+        'version': version_string,
+        'date': version.get('date', ''),
+        'size': version.get('size', 0),
+        'downloadURL': version.get('downloadURL', ''),
+        # Some sources provide buildVersion; otherwise reuse the version
+        'buildVersion': version.get('buildVersion', version_string)
+    }
+
+    # Copy optional fields if available
+    for field in OPTIONAL_VERSION_FIELDS:
+        if field in version:
+            altstore_version[field] = version[field]
+
+    return altstore_version
+
+
+def convert_app_to_altstore_format(app, tweak_lookup):
     """
     Convert a single app from apps.json format to AltStore format.
     Modifies bundle ID if the app has a known tweak.
     """
     app_name = app.get('name', '')
-    base_name, tweak_name = extract_tweak_from_name(app_name, known_tweaks)
+    base_name, tweak_name = extract_tweak_from_name(app_name, tweak_lookup)
 
     # Get original bundle ID
     original_bundle_id = app.get('bundleIdentifier', '')
@@ -74,28 +181,7 @@ def convert_app_to_altstore_format(app, known_tweaks):
     bundle_id = create_unique_bundle_id(original_bundle_id, tweak_name)
 
     # Convert versions array
-    altstore_versions = []
-    for version in app.get('versions', []):
-        altstore_version = {
-            'version': version.get('version', ''),
-            'date': version.get('date', ''),
-            'size': version.get('size', 0),
-            'downloadURL': version.get('downloadURL', '')
-        }
-
-        # Add buildVersion if available (some sources use 'buildVersion')
-        # If not available, use version as buildVersion
-        altstore_version['buildVersion'] = version.get('buildVersion', version.get('version', ''))
-
-        # Add localizedDescription if available
-        if 'localizedDescription' in version:
-            altstore_version['localizedDescription'] = version['localizedDescription']
-
-        # Add minOSVersion if available
-        if 'minOSVersion' in version:
-            altstore_version['minOSVersion'] = version['minOSVersion']
-
-        altstore_versions.append(altstore_version)
+    altstore_versions = [convert_version_to_altstore_format(version) for version in app.get('versions', ())]
 
     # Build the AltStore app object
     altstore_app = {
@@ -109,39 +195,45 @@ def convert_app_to_altstore_format(app, known_tweaks):
     }
 
     # Add optional fields if they exist
-    optional_fields = ['subtitle', 'tintColor', 'category', 'screenshots']
-    for field in optional_fields:
+    for field in OPTIONAL_APP_FIELDS:
         if field in app:
             altstore_app[field] = app[field]
 
     return altstore_app
 
 
-def convert_to_altstore(apps_data, tweaks_data):
+def build_source_fields(apps_data):
     """
-    Convert apps.json to AltStore format with unique bundle IDs.
+    Build the AltStore source fields other than 'apps' and 'news'.
     """
-    known_tweaks = tweaks_data.get('tweaks', [])
-
-    # Build AltStore source structure
     altstore_source = {
         'name': apps_data.get('name', 'FTRepo'),
         'identifier': apps_data.get('identifier', 'xyz.ftrepo'),
     }
 
     # Add optional source fields if they exist
-    optional_source_fields = ['subtitle', 'description', 'iconURL', 'headerURL',
-                              'website', 'tintColor', 'featuredApps']
-    for field in optional_source_fields:
+    for field in OPTIONAL_SOURCE_FIELDS:
         if field in apps_data:
             altstore_source[field] = apps_data[field]
 
-    # Convert apps
+    return altstore_source
+
+
+def convert_to_altstore(apps_data, tweaks_data):
+    """
+    Convert apps.json to AltStore format with unique bundle IDs.
+    apps_data['apps'] may be any iterable, such as iter_source_apps().
+    """
+    tweak_lookup = build_tweak_lookup(tweaks_data.get('tweaks', []))
+
+    # Convert apps first - when streaming, the other source fields are only
+    # known once the apps have been read
     altstore_apps = []
     for app in apps_data.get('apps', []):
-        altstore_app = convert_app_to_altstore_format(app, known_tweaks)
+        altstore_app = convert_app_to_altstore_format(app, tweak_lookup)
         altstore_apps.append(altstore_app)
 
+    altstore_source = build_source_fields(apps_data)
     altstore_source['apps'] = altstore_apps
 
     # Add news array (empty for now, can be populated if needed)
@@ -150,35 +242,74 @@ def convert_to_altstore(apps_data, tweaks_data):
     return altstore_source
 
 
+def dumps_json(data):
+    """
+    Serialize data as indented UTF-8 JSON bytes.
+    Uses orjson when it is installed; the stdlib layout is identical.
+    """
+    if orjson is None:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+
+def write_altstore(output_file, apps_data, tweaks_data):
+    """
+    Convert apps.json to AltStore format and write it to output_file.
+
+    Produces the same file as dumping convert_to_altstore(), but each app is
+    serialized as soon as it is converted, so the converted app objects are
+    never all held in memory at once.
+
+    Returns (total app count, count of apps with a tweaked bundle ID).
+    """
+    tweak_lookup = build_tweak_lookup(tweaks_data.get('tweaks', []))
+
+    app_chunks = []
+    modified_count = 0
+    for app in apps_data.get('apps', []):
+        altstore_app = convert_app_to_altstore_format(app, tweak_lookup)
+        if altstore_app['bundleIdentifier'] != app.get('bundleIdentifier', ''):
+            modified_count += 1
+        # Indent to its position inside the top-level "apps" array
+        app_chunks.append(b'    ' + dumps_json(altstore_app).replace(b'\n', b'\n    '))
+
+    # The source fields are complete once the apps have been read; serialize
+    # them around an empty "apps" array and splice the apps in
+    altstore_source = build_source_fields(apps_data)
+    altstore_source['apps'] = []
+    altstore_source['news'] = apps_data.get('news', [])
+    head, tail = dumps_json(altstore_source).split(b'\n  "apps": []', 1)
+
+    with open(output_file, 'wb') as f:
+        f.write(head)
+        if app_chunks:
+            f.write(b'\n  "apps": [\n')
+            f.write(b',\n'.join(app_chunks))
+            f.write(b'\n  ]')
+        else:
+            f.write(b'\n  "apps": []')
+        f.write(tail)
+
+    return len(app_chunks), modified_count
+
+
 def main():
     """Main conversion function."""
     # Load input files
     print("Loading apps.json...")
-    apps_data = load_json_file('apps.json')
+    apps_data = {}
+    apps_data['apps'] = iter_source_apps('apps.json', apps_data)
 
     print("Loading tweaks_list.json...")
     tweaks_data = load_json_file('tweaks_list.json')
 
-    print("Converting to AltStore format...")
-    altstore_data = convert_to_altstore(apps_data, tweaks_data)
-
-    # Write output
+    # Convert and write output
     output_file = 'altstore.json'
-    print(f"Writing to {output_file}...")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(altstore_data, f, indent=2, ensure_ascii=False)
+    print(f"Converting to AltStore format and writing to {output_file}...")
+    total_count, modified_count = write_altstore(output_file, apps_data, tweaks_data)
 
     print(f"[OK] Successfully created {output_file}")
-    print(f"  Total apps: {len(altstore_data['apps'])}")
-
-    # Count how many apps have modified bundle IDs
-    modified_count = 0
-    for app in altstore_data['apps']:
-        app_name = app['name']
-        _, tweak_name = extract_tweak_from_name(app_name, tweaks_data.get('tweaks', []))
-        if tweak_name:
-            modified_count += 1
-
+    print(f"  Total apps: {total_count}")
     print(f"  Apps with unique bundle IDs (tweaked): {modified_count}")
 
 
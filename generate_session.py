@@ -5,9 +5,15 @@ This allows you to authenticate once locally and then use the session string in
 """
 
 import os
-from telethon.sync import TelegramClient
+import asyncio
+from telethon import TelegramClient
 from telethon.sessions import StringSession
 
+async def generate_session_string(api_id, api_hash):
+    """Log in interactively on a fresh client and return its session string."""
+    async with TelegramClient(StringSession(), api_id, api_hash) as client:
+        return client.session.save()
+
 def main():
     print("Telegram Session String Generator")
     print("=" * 50)
@@ -33,25 +39,24 @@ def main():
     print()
 
     try:
-        with TelegramClient(StringSession(), api_id, api_hash) as client:
-            session_string = client.session.save()
-
-            print()
-            print("=" * 50)
-            print("Success! Your session string:")
-            print()
-            print(session_string)
-            print()
-            print("=" * 50)
-            print()
-            print("Add this to your GitHub repository secrets as:")
-            print("TELEGRAM_SESSION_STRING")
-            print()
-            print("IMPORTANT: Keep this string secure! It provides access to your account.")
-            print()
+        session_string = asyncio.run(generate_session_string(api_id, api_hash))
     except Exception as e:
         print(f"Error: {e}")
         return
 
+    print()
+    print("=" * 50)
+    print("Success! Your session string:")
+    print()
+    print(session_string)
+    print()
+    print("=" * 50)
+    print()
+    print("Add this to your GitHub repository secrets as:")
+    print("TELEGRAM_SESSION_STRING")
+    print()
+    print("IMPORTANT: Keep this string secure! It provides access to your account.")
+    print()
+
 if __name__ == '__main__':
     main()
@@ -1,18 +1,35 @@
 import os
+import sys
 import json
 import re
+import hashlib
 import asyncio
-from datetime import datetime
+import concurrent.futures
+import threading
+import time
+import random
+from datetime import datetime, timezone
+from functools import lru_cache
 from telethon import TelegramClient
-from telethon.tl.types import DocumentAttributeFilename
+from telethon.tl.types import InputMessagesFilterDocument
 import zipfile
 from pathlib import Path
 import plistlib
 import shutil
+import struct
+import http.client
 import subprocess
 from urllib.parse import quote
 import urllib.request
 import urllib.parse
+import urllib.error
+
+# orjson is optional: much faster JSON, with a stdlib fallback. Imported once
+# here so a missing orjson doesn't repeat the failed import on every call
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 API_ID = int(os.getenv('TELEGRAM_API_ID', '0'))
 API_HASH = os.getenv('TELEGRAM_API_HASH', '')
@@ -24,79 +41,324 @@ DOWNLOAD_DIR = 'downloads'
 ICONS_DIR = 'icons'
 REPO_FILE = 'apps.json'
 RELEASE_TAG = 'latest'
+# Prefix of the placeholder bundle IDs made up for apps whose real bundle ID
+# is unknown ("com.unknown.<name>"); checked with startswith()
+UNKNOWN_BUNDLE_PREFIX = 'com.unknown.'
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN', '')
 GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com')
 REPO_OWNER = os.getenv('REPO_OWNER', '')
 REPO_NAME = os.getenv('REPO_NAME', '')
 MAX_DOWNLOADS_PER_CHANNEL = int(os.getenv('MAX_DOWNLOADS_PER_CHANNEL', '5'))
-MAX_CONCURRENT_DOWNLOADS = int(os.getenv('MAX_CONCURRENT_DOWNLOADS', '3'))
+MAX_CONCURRENT_DOWNLOADS = int(os.getenv('MAX_CONCURRENT_DOWNLOADS', '8'))
 
 # OpenRouter API for AI-based bundle ID extraction
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY', '')
 OPENROUTER_MODEL = os.getenv('OPENROUTER_MODEL', 'openai/gpt-4o-mini')  # Lightweight, fast, accurate
 OPENROUTER_FALLBACK_MODEL = os.getenv('OPENROUTER_FALLBACK_MODEL', 'openai/gpt-4o')  # Stronger model for difficult cases
 
+# Maximum simultaneous requests per external service. Lookups run in worker
+# threads (asyncio.to_thread), so these are thread semaphores
+_appstore_semaphore = threading.BoundedSemaphore(int(os.getenv('MAX_CONCURRENT_APPSTORE_REQUESTS', '8')))
+_logo_semaphore = threading.BoundedSemaphore(4)
+_upload_semaphore = threading.BoundedSemaphore(int(os.getenv('MAX_CONCURRENT_UPLOADS', '4')))
+_openrouter_semaphore = threading.BoundedSemaphore(int(os.getenv('MAX_CONCURRENT_AI_REQUESTS', '4')))
+# Attempts per request when the service answers HTTP 429 (rate limited)
+RATE_LIMIT_MAX_ATTEMPTS = 4
+
+# GitHub API connections are kept alive per thread (see _github_send)
+_github_local = threading.local()
+GITHUB_CONNECT_TIMEOUT = 5
+# Upload bodies are streamed from disk in blocks of this size (http.client
+# defaults to 8 KiB, i.e. thousands of socket writes per IPA)
+GITHUB_UPLOAD_BLOCKSIZE = 1024 * 1024
+# When fewer API requests than this are left in the rate limit window, wait
+# for the window to reset instead of running into 403s
+GITHUB_RATE_LIMIT_MIN_REMAINING = int(os.getenv('GITHUB_RATE_LIMIT_MIN_REMAINING', '50'))
+GITHUB_RATE_LIMIT_MAX_WAIT = 900
+_github_rate_lock = threading.Lock()
+GITHUB_MAX_ATTEMPTS = 5
+GITHUB_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_github_pause_until = 0.0
+# Printable ASCII left unencoded in uploaded asset names
+_UPLOAD_NAME_SAFE_CHARS = ''.join(chr(c) for c in range(0x21, 0x7f) if chr(c) not in '&%#?+')
+
 # Performance optimizations
 APPSTORE_CACHE_FILE = 'appstore_cache.json'
-_appstore_cache = {}
+# "Not on the App Store" results are retried after this many seconds, since
+# apps get (re)listed
+APPSTORE_NEGATIVE_TTL = int(os.getenv('APPSTORE_NEGATIVE_TTL', str(7 * 24 * 3600)))
+# Found apps are looked up again after this many seconds, since names and
+# icons change; the old result is kept if the new lookup finds nothing
+APPSTORE_CACHE_TTL = int(os.getenv('APPSTORE_CACHE_TTL', str(30 * 24 * 3600)))
+# Lookups indexed by bundle ID (authoritative) and by lowercased app name,
+# plus Logo.dev probe results keyed by logo name (URL or None)
+_appstore_cache = {'by_bundle': {}, 'by_name': {}, 'logo': {}}
+_appstore_cache_dirty = False
+# (app name, bundle ID) lookups whose requests failed this run. They are not
+# cached on disk, so this keeps them from being retried within the run
+_appstore_failed_lookups = set()
+
+# Last release response, for conditional (If-None-Match) release lookups
+RELEASE_CACHE_FILE = 'release_cache.json'
+
+# Result of get_release(), shared by the download and upload phases of a run
+_release = None
+
+# IPA topics of forum channels, by channel ID, reused for TOPICS_CACHE_TTL
+# seconds. The default is twice the 6h workflow schedule, so the topics are
+# fetched on every other scheduled run
+TOPICS_CACHE_FILE = 'topics_cache.json'
+TOPICS_CACHE_TTL = int(os.getenv('TOPICS_CACHE_TTL', str(12 * 3600)))
+
+# Telegram source (channel, message, timestamp) of each downloaded IPA. Files
+# downloaded during the scrape are appended to the log straight away, so they
+# survive a crash; the log is folded into the JSON file at the end
+SOURCE_TRACKING_FILE = 'source_tracking.json'
+SOURCE_TRACKING_LOG = 'source_tracking.ndjson'
+
+# Parsed REPO_FILE with the (mtime, size) it was read at (see load_repo_file)
+_repo_file_cache = None
 
 # AI bundle ID cache
 AI_BUNDLE_CACHE_FILE = 'ai_bundle_cache.json'
 _ai_bundle_cache = {}
+_ai_bundle_cache_dirty = False
+
+# Metadata extractions currently running, by cache key, so concurrent
+# requests for the same message share one API call
+_ai_inflight = {}
+_ai_inflight_lock = threading.Lock()
 
 # Known tweaks list
 TWEAKS_LIST_FILE = 'tweaks_list.json'
 _known_tweaks = []
 
+# Bundle IDs of the apps already in apps.json, by lowercase base app name
+# (without the "(Tweak)" suffix). Filled by download_ipas()
+_existing_bundle_ids = {}
+
+def loads_json(data):
+    """Parse JSON from bytes or str, using orjson when it is installed"""
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+def dumps_json(data, indent=False):
+    """
+    Serialize data as UTF-8 JSON bytes, using orjson when it is installed.
+
+    Args:
+        data: Object to serialize
+        indent: Indent by two spaces, matching json.dump(indent=2, ensure_ascii=False)
+
+    Returns:
+        Encoded JSON as bytes
+    """
+    if orjson is None:
+        if indent:
+            return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+
+def write_json_atomic(path, data, indent=False):
+    """
+    Write data as JSON to path without ever leaving a partial file.
+
+    The JSON is written to a temporary sibling, fsynced and moved into place
+    with os.replace, so a run killed mid-save keeps the previous file intact.
+    The caches are only read by this script, so they are written compact;
+    indent=True is for files people read, like REPO_FILE.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(dumps_json(data, indent=indent))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
 def load_appstore_cache():
     """Load App Store lookup cache from disk"""
     global _appstore_cache
     if os.path.exists(APPSTORE_CACHE_FILE):
         try:
-            with open(APPSTORE_CACHE_FILE, 'r', encoding='utf-8') as f:
-                _appstore_cache = json.load(f)
-            print(f"[CACHE] Loaded {len(_appstore_cache)} cached App Store lookups")
+            with open(APPSTORE_CACHE_FILE, 'rb') as f:
+                data = loads_json(f.read())
+            if 'by_bundle' in data:
+                _appstore_cache = {
+                    'by_bundle': data.get('by_bundle', {}),
+                    'by_name': data.get('by_name', {}),
+                    'logo': data.get('logo', {}),
+                }
+            else:
+                # Migrate the old flat format keyed by "bundle_id:app_name"
+                _appstore_cache = {'by_bundle': {}, 'by_name': {}, 'logo': {}}
+                for key, entry in data.items():
+                    bundle_id, _, app_name = key.partition(':')
+                    appstore_cache_put(app_name, bundle_id, entry)
+            print(f"[CACHE] Loaded {len(_appstore_cache['by_bundle'])} cached App Store lookups")
         except Exception as e:
             print(f"[CACHE] Failed to load cache: {e}")
-            _appstore_cache = {}
+            _appstore_cache = {'by_bundle': {}, 'by_name': {}, 'logo': {}}
 
 def save_appstore_cache():
-    """Save App Store lookup cache to disk"""
+    """Save App Store lookup cache to disk, if anything was added this run"""
+    global _appstore_cache_dirty
+    if not _appstore_cache_dirty:
+        print("[CACHE] App Store cache unchanged, not rewriting it")
+        return
     try:
-        with open(APPSTORE_CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(_appstore_cache, f, indent=2)
-        print(f"[CACHE] Saved {len(_appstore_cache)} App Store lookups to cache")
+        write_json_atomic(APPSTORE_CACHE_FILE, _appstore_cache)
+        print(f"[CACHE] Saved {len(_appstore_cache['by_bundle'])} App Store lookups to cache")
+        _appstore_cache_dirty = False
     except Exception as e:
         print(f"[CACHE] Failed to save cache: {e}")
 
+def appstore_cache_get(app_name, bundle_id):
+    """
+    Look up a cached App Store result.
+
+    The bundle ID is checked first, since Telegram titles for the same app
+    vary between posts. The name index is only used for missing or fallback
+    (com.unknown) bundle IDs, where the bundle ID carries no information.
+
+    Negative results older than APPSTORE_NEGATIVE_TTL count as not looked up.
+
+    Returns:
+        Cached entry dict, or None if the app has not been looked up
+    """
+    name_key = app_name.strip().lower() if app_name else ''
+    cached = None
+    if bundle_id:
+        cached = _appstore_cache['by_bundle'].get(bundle_id)
+        if cached is not None:
+            if name_key:
+                _appstore_cache['by_name'].setdefault(name_key, cached)
+        elif not bundle_id.startswith(UNKNOWN_BUNDLE_PREFIX):
+            return None
+    if cached is None and name_key:
+        cached = _appstore_cache['by_name'].get(name_key)
+    if cached is not None and cached.get('name') is None:
+        if time.time() - cached.get('cached_at', 0) > APPSTORE_NEGATIVE_TTL:
+            return None
+    return cached
+
+def appstore_cache_put(app_name, bundle_id, entry):
+    """Store an App Store result under both the bundle ID and the app name."""
+    global _appstore_cache_dirty
+    _appstore_cache_dirty = True
+    if bundle_id:
+        _appstore_cache['by_bundle'][bundle_id] = entry
+    if app_name and app_name.strip():
+        _appstore_cache['by_name'][app_name.strip().lower()] = entry
+
+def load_repo_file():
+    """
+    Load REPO_FILE, reusing the parsed data while the file is unchanged.
+
+    The scrape and the merge phase both read apps.json; it is only parsed
+    again if its mtime or size changed in between.
+
+    Returns:
+        Parsed repo dict (shared - do not mutate), or None if the file doesn't exist
+    """
+    global _repo_file_cache
+    try:
+        st = os.stat(REPO_FILE)
+    except FileNotFoundError:
+        return None
+    stat_key = (st.st_mtime_ns, st.st_size)
+    if _repo_file_cache is None or _repo_file_cache[0] != stat_key:
+        with open(REPO_FILE, 'rb') as f:
+            _repo_file_cache = (stat_key, loads_json(f.read()))
+    return _repo_file_cache[1]
+
+def load_source_tracking():
+    """
+    Load source tracking, including entries logged by an interrupted run.
+
+    Returns:
+        dict: Maps filename to {'source', 'message', 'timestamp'}
+    """
+    source_tracking = {}
+    if os.path.exists(SOURCE_TRACKING_FILE):
+        try:
+            with open(SOURCE_TRACKING_FILE, 'rb') as f:
+                source_tracking = loads_json(f.read())
+        except Exception as e:
+            print(f"[SETUP] Failed to load source tracking: {e}")
+    if os.path.exists(SOURCE_TRACKING_LOG):
+        with open(SOURCE_TRACKING_LOG, 'rb') as f:
+            for line in f:
+                try:
+                    entry = loads_json(line)
+                except ValueError:
+                    continue  # Line cut off by a crash
+                source_tracking[entry.pop('filename')] = entry
+    return source_tracking
+
+def log_source_tracking(filename, file_info):
+    """Append one downloaded file's source to SOURCE_TRACKING_LOG"""
+    with open(SOURCE_TRACKING_LOG, 'ab') as f:
+        f.write(dumps_json({'filename': filename, **file_info}) + b'\n')
+
+def save_source_tracking(source_tracking):
+    """Write source tracking to SOURCE_TRACKING_FILE and clear the log"""
+    write_json_atomic(SOURCE_TRACKING_FILE, source_tracking)
+    try:
+        os.remove(SOURCE_TRACKING_LOG)
+    except FileNotFoundError:
+        pass
+
+def source_entry(source_tracking, filename):
+    """
+    Look up a file's source tracking entry.
+
+    Older entries are just the channel name, and files without an entry are
+    reported as from 'Unknown'.
+
+    Returns:
+        tuple: (source channel, message text, message timestamp)
+    """
+    entry = source_tracking.get(filename, 'Unknown')
+    if isinstance(entry, dict):
+        return entry.get('source', 'Unknown'), entry.get('message', ''), entry.get('timestamp', 0)
+    return entry, '', 0
+
 def load_ai_bundle_cache():
     """Load AI bundle ID cache from disk"""
     global _ai_bundle_cache
     if os.path.exists(AI_BUNDLE_CACHE_FILE):
         try:
-            with open(AI_BUNDLE_CACHE_FILE, 'r', encoding='utf-8') as f:
-                _ai_bundle_cache = json.load(f)
+            with open(AI_BUNDLE_CACHE_FILE, 'rb') as f:
+                _ai_bundle_cache = loads_json(f.read())
             print(f"[AI CACHE] Loaded {len(_ai_bundle_cache)} cached AI bundle ID lookups")
         except Exception as e:
             print(f"[AI CACHE] Failed to load cache: {e}")
             _ai_bundle_cache = {}
 
 def save_ai_bundle_cache():
-    """Save AI bundle ID cache to disk"""
+    """Save AI bundle ID cache to disk, if anything was added this run"""
+    global _ai_bundle_cache_dirty
+    if not _ai_bundle_cache_dirty:
+        print("[AI CACHE] AI bundle ID cache unchanged, not rewriting it")
+        return
     try:
-        with open(AI_BUNDLE_CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(_ai_bundle_cache, f, indent=2)
+        write_json_atomic(AI_BUNDLE_CACHE_FILE, _ai_bundle_cache)
         print(f"[AI CACHE] Saved {len(_ai_bundle_cache)} AI bundle ID lookups to cache")
+        _ai_bundle_cache_dirty = False
     except Exception as e:
         print(f"[AI CACHE] Failed to save cache: {e}")
 
 def load_known_tweaks():
     """Load the list of known tweaks from tweaks_list.json"""
-    global _known_tweaks
+    global _known_tweaks, _metadata_system_prompt, _known_tweak_matcher
+    # The metadata prompt and tweak matcher embed the tweaks list, rebuild them on next use
+    _metadata_system_prompt = None
+    _known_tweak_matcher = None
     if os.path.exists(TWEAKS_LIST_FILE):
         try:
-            with open(TWEAKS_LIST_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(TWEAKS_LIST_FILE, 'rb') as f:
+                data = loads_json(f.read())
                 _known_tweaks = data.get('tweaks', [])
             print(f"[TWEAKS] Loaded {len(_known_tweaks)} known tweaks from {TWEAKS_LIST_FILE}")
         except Exception as e:
@@ -106,43 +368,136 @@ def load_known_tweaks():
         print(f"[TWEAKS] {TWEAKS_LIST_FILE} not found, AI will not have tweak context")
         _known_tweaks = []
 
+def fetch_url(request, timeout, semaphore, parse=None):
+    """
+    Fetch a URL while holding a per-service semaphore, backing off on HTTP 429.
+
+    Args:
+        request: URL string or urllib.request.Request
+        timeout: Timeout in seconds for each attempt
+        semaphore: Semaphore limiting concurrent requests to the service
+        parse: Optional callable that consumes the open response instead of
+               reading the whole body
+
+    Returns:
+        Response body as bytes, or the result of parse
+        (raises urllib.error.HTTPError for other error statuses)
+    """
+    for attempt in range(RATE_LIMIT_MAX_ATTEMPTS):
+        try:
+            with semaphore:
+                with urllib.request.urlopen(request, timeout=timeout) as response:
+                    return parse(response) if parse else response.read()
+        except urllib.error.HTTPError as e:
+            if e.code != 429 or attempt == RATE_LIMIT_MAX_ATTEMPTS - 1:
+                raise
+            retry_after = e.headers.get('Retry-After', '')
+            delay = min(60, int(retry_after)) if retry_after.isdigit() else 2 ** attempt + random.uniform(0, 1)
+            print(f"  [RATE LIMIT] HTTP 429, retrying in {delay:.1f}s")
+            # Sleep outside the semaphore so other requests can proceed
+            time.sleep(delay)
+
+def read_completion(response):
+    """
+    Read an OpenRouter chat completion, streamed (server-sent events) or not.
+
+    For a stream, content deltas are accumulated and reading stops as soon as
+    the content is a complete JSON document, without waiting for the end of
+    the stream. A plain JSON body is returned as-is.
+
+    Returns:
+        dict shaped like a non-streamed completion
+    """
+    if 'text/event-stream' not in response.headers.get('Content-Type', ''):
+        return loads_json(response.read())
+
+    content_parts = []
+    for raw_line in response:
+        line = raw_line.decode('utf-8').strip()
+        # Skip blank separators and SSE comments (": OPENROUTER PROCESSING")
+        if not line.startswith('data:'):
+            continue
+        data = line[len('data:'):].strip()
+        if data == '[DONE]':
+            break
+
+        chunk = loads_json(data)
+        if 'error' in chunk:
+            raise RuntimeError(chunk['error'].get('message', chunk['error']))
+        if not chunk.get('choices'):
+            continue
+
+        choice = chunk['choices'][0]
+        delta = choice.get('delta', {}).get('content')
+        if delta:
+            content_parts.append(delta)
+            # Stop early once the JSON object is complete
+            if delta.rstrip().endswith('}'):
+                try:
+                    loads_json(''.join(content_parts))
+                    break
+                except json.JSONDecodeError:
+                    pass
+        if choice.get('finish_reason'):
+            break
+
+    return {'choices': [{'message': {'content': ''.join(content_parts)}}]}
+
+def itunes_search_url(term):
+    """Build an iTunes Search API URL for software matching term"""
+    return 'https://itunes.apple.com/search?' + urllib.parse.urlencode(
+        {'term': term, 'entity': 'software', 'limit': 5}
+    )
+
 def search_app_store(app_name, bundle_id):
     """
     Search App Store API and return app info (name, icon, bundle ID)
     Returns tuple: (official_name, icon_url, official_bundle_id) or (None, None, None)
-    """
-    # Check cache first
-    cache_key = f"{bundle_id}:{app_name}"
-    if cache_key in _appstore_cache:
-        cached = _appstore_cache[cache_key]
-        print(f"  [CACHE] Using cached result for {app_name or bundle_id}")
-        return cached.get('name'), cached.get('icon'), cached.get('bundle_id')
 
+    Blocking - async code should call it via asyncio.to_thread() so the
+    Telegram client's event loop keeps running during the lookup.
+    """
+    # Check cache first. Found apps cached before APPSTORE_CACHE_TTL (or
+    # before entries were timestamped) are looked up again
+    cached = appstore_cache_get(app_name, bundle_id)
+    if cached is not None:
+        if cached.get('name') is None or time.time() - cached.get('cached_at', 0) <= APPSTORE_CACHE_TTL:
+            print(f"  [CACHE] Using cached result for {app_name or bundle_id}")
+            return cached.get('name'), cached.get('icon'), cached.get('bundle_id')
+        print(f"  [CACHE] Cached result for {app_name or bundle_id} is stale, refreshing")
+
+    lookup_key = (app_name, bundle_id)
+    if lookup_key in _appstore_failed_lookups:
+        print(f"  [APPSTORE] Lookup for {app_name or bundle_id} already failed this run, skipping")
+        if cached is not None:
+            return cached.get('name'), cached.get('icon'), cached.get('bundle_id')
+        return None, None, None
+
+    lookup_failed = False
     try:
         # Strategy 1: Search by bundle ID first (most accurate)
         if bundle_id:
             print(f"  [APPSTORE] Searching by bundle ID: {bundle_id}")
-            search_query = urllib.parse.quote(bundle_id)
-            itunes_url = f"https://itunes.apple.com/search?term={search_query}&entity=software&limit=5"
+            itunes_url = itunes_search_url(bundle_id)
 
             try:
-                with urllib.request.urlopen(itunes_url, timeout=3) as response:
-                    data = json.loads(response.read().decode())
-                    results = data.get('results', [])
-
-                    # Look for exact bundle ID match
-                    for result in results:
-                        result_bundle = result.get('bundleId', '')
-                        if result_bundle == bundle_id:
-                            official_name = result.get('trackName', '')
-                            icon_url = result.get('artworkUrl512') or result.get('artworkUrl100')
-                            official_bundle_id = result.get('bundleId', '')
-                            print(f"  [APPSTORE] Found by bundle ID: {official_name} ({official_bundle_id})")
-                            # Cache the result
-                            _appstore_cache[cache_key] = {'name': official_name, 'icon': icon_url, 'bundle_id': official_bundle_id}
-                            return official_name, icon_url, official_bundle_id
+                data = loads_json(fetch_url(itunes_url, 3, _appstore_semaphore))
+                results = data.get('results', [])
+
+                # Look for exact bundle ID match
+                for result in results:
+                    result_bundle = result.get('bundleId', '')
+                    if result_bundle == bundle_id:
+                        official_name = result.get('trackName', '')
+                        icon_url = result.get('artworkUrl512') or result.get('artworkUrl100')
+                        official_bundle_id = result.get('bundleId', '')
+                        print(f"  [APPSTORE] Found by bundle ID: {official_name} ({official_bundle_id})")
+                        # Cache the result
+                        appstore_cache_put(app_name, bundle_id, {'name': official_name, 'icon': icon_url, 'bundle_id': official_bundle_id, 'cached_at': time.time()})
+                        return official_name, icon_url, official_bundle_id
             except Exception as e:
                 print(f"  [APPSTORE] Bundle ID search failed: {e}")
+                lookup_failed = True
 
         # Strategy 2: Search by app name
         clean_name = app_name.strip() if app_name else ""
@@ -156,46 +511,96 @@ def search_app_store(app_name, bundle_id):
 
         if clean_name:
             print(f"  [APPSTORE] Searching by name: {clean_name}")
-            search_query = urllib.parse.quote(clean_name)
-            itunes_url = f"https://itunes.apple.com/search?term={search_query}&entity=software&limit=5"
+            itunes_url = itunes_search_url(clean_name)
 
             try:
-                with urllib.request.urlopen(itunes_url, timeout=3) as response:
-                    data = json.loads(response.read().decode())
-                    results = data.get('results', [])
-
-                    # Try to find best match by name similarity
-                    for result in results:
-                        result_name = result.get('trackName', '')
-                        # Check if name is very similar
-                        if result_name.lower() == clean_name.lower():
-                            official_name = result.get('trackName', '')
-                            icon_url = result.get('artworkUrl512') or result.get('artworkUrl100')
-                            official_bundle_id = result.get('bundleId', '')
-                            print(f"  [APPSTORE] Found by exact name match: {official_name} ({official_bundle_id})")
-                            # Cache the result
-                            _appstore_cache[cache_key] = {'name': official_name, 'icon': icon_url, 'bundle_id': official_bundle_id}
-                            return official_name, icon_url, official_bundle_id
-
-                    # If no exact match, use first result if available
-                    if results:
-                        official_name = results[0].get('trackName', '')
-                        icon_url = results[0].get('artworkUrl512') or results[0].get('artworkUrl100')
-                        official_bundle_id = results[0].get('bundleId', '')
-                        print(f"  [APPSTORE] Using first result: {official_name} ({official_bundle_id})")
+                data = loads_json(fetch_url(itunes_url, 3, _appstore_semaphore))
+                results = data.get('results', [])
+
+                # Try to find best match by name similarity
+                for result in results:
+                    result_name = result.get('trackName', '')
+                    # Check if name is very similar
+                    if result_name.lower() == clean_name.lower():
+                        official_name = result.get('trackName', '')
+                        icon_url = result.get('artworkUrl512') or result.get('artworkUrl100')
+                        official_bundle_id = result.get('bundleId', '')
+                        print(f"  [APPSTORE] Found by exact name match: {official_name} ({official_bundle_id})")
                         # Cache the result
-                        _appstore_cache[cache_key] = {'name': official_name, 'icon': icon_url, 'bundle_id': official_bundle_id}
+                        appstore_cache_put(app_name, bundle_id, {'name': official_name, 'icon': icon_url, 'bundle_id': official_bundle_id, 'cached_at': time.time()})
                         return official_name, icon_url, official_bundle_id
+
+                # If no exact match, use first result if available
+                if results:
+                    official_name = results[0].get('trackName', '')
+                    icon_url = results[0].get('artworkUrl512') or results[0].get('artworkUrl100')
+                    official_bundle_id = results[0].get('bundleId', '')
+                    print(f"  [APPSTORE] Using first result: {official_name} ({official_bundle_id})")
+                    # Cache the result
+                    appstore_cache_put(app_name, bundle_id, {'name': official_name, 'icon': icon_url, 'bundle_id': official_bundle_id, 'cached_at': time.time()})
+                    return official_name, icon_url, official_bundle_id
             except Exception as e:
                 print(f"  [APPSTORE] Name search failed: {e}")
+                lookup_failed = True
 
     except Exception as e:
         print(f"  [APPSTORE] Search failed: {e}")
+        lookup_failed = True
+
+    if lookup_failed:
+        _appstore_failed_lookups.add(lookup_key)
 
-    # Cache negative results to avoid repeated failures
-    _appstore_cache[cache_key] = {'name': None, 'icon': None, 'bundle_id': None}
+    # A refresh that found nothing keeps the stale result, and is not
+    # repeated until APPSTORE_CACHE_TTL has passed again
+    if cached is not None:
+        print(f"  [CACHE] Refresh found nothing, keeping cached result for {app_name or bundle_id}")
+        if not lookup_failed:
+            appstore_cache_put(app_name, bundle_id, {**cached, 'cached_at': time.time()})
+        return cached.get('name'), cached.get('icon'), cached.get('bundle_id')
+
+    # Cache negative results to avoid repeated failures, but not a failed
+    # request - that says nothing about the app and is retried next run
+    if not lookup_failed:
+        appstore_cache_put(app_name, bundle_id, {'name': None, 'icon': None, 'bundle_id': None, 'cached_at': time.time()})
     return None, None, None
 
+# Logo.dev answers unknown names with a small placeholder image, real logos are larger
+LOGO_DEV_MIN_BYTES = 2048
+
+def probe_logo_dev(logo_name):
+    """
+    Check whether Logo.dev has a real logo for logo_name.
+
+    Outcomes, including misses, are stored in the App Store cache file so
+    each name is only probed once across runs.
+
+    Returns:
+        Logo URL, or None if Logo.dev has no usable logo
+    """
+    global _appstore_cache_dirty
+    logo_cache = _appstore_cache['logo']
+    if logo_name in logo_cache:
+        return logo_cache[logo_name]
+
+    logo_url = f"https://img.logo.dev/{logo_name}.com?token=pk_bkELuwmuQhu5ZVrVl3t-iw"
+    print(f"  [ICON] Trying Logo.dev: {logo_url}")
+    try:
+        req = urllib.request.Request(logo_url, method='HEAD')
+        length = fetch_url(req, 2, _logo_semaphore, parse=lambda response: response.headers.get('Content-Length', ''))
+        result = logo_url if not length.isdigit() or int(length) > LOGO_DEV_MIN_BYTES else None
+    except urllib.error.HTTPError as e:
+        if e.code == 429 or e.code >= 500:
+            return None
+        # Logo.dev answered, but has no logo for this name
+        result = None
+    except Exception:
+        # Network trouble says nothing about the logo - don't cache it
+        return None
+
+    logo_cache[logo_name] = result
+    _appstore_cache_dirty = True
+    return result
+
 def get_icon_url_from_name(app_name, bundle_id):
     """
     Get app icon URL from external services based on app name.
@@ -203,6 +608,8 @@ def get_icon_url_from_name(app_name, bundle_id):
     1. Try to search iTunes/App Store API for the app
     2. Fallback to Logo.dev for well-known apps
     3. Fallback to UI-Avatars for unknown apps
+
+    Blocking - call via asyncio.to_thread() from async code.
     """
     try:
         # Try App Store search first
@@ -223,19 +630,10 @@ def get_icon_url_from_name(app_name, bundle_id):
 
         # Fallback to Logo.dev for well-known apps
         # Logo.dev provides icons for popular brands/apps
-        logo_name = clean_name.lower().replace(' ', '')
-        logo_url = f"https://img.logo.dev/{logo_name}.com?token=pk_bkELuwmuQhu5ZVrVl3t-iw"
-        print(f"  [ICON] Trying Logo.dev: {logo_url}")
-
-        try:
-            # Test if logo.dev has this icon
-            req = urllib.request.Request(logo_url, method='HEAD')
-            with urllib.request.urlopen(req, timeout=5) as response:
-                if response.status == 200:
-                    print(f"  [ICON] Found Logo.dev icon")
-                    return logo_url
-        except:
-            pass
+        logo_url = probe_logo_dev(clean_name.lower().replace(' ', ''))
+        if logo_url:
+            print(f"  [ICON] Found Logo.dev icon")
+            return logo_url
 
         # Final fallback: UI-Avatars (generates text-based avatar)
         print(f"  [ICON] Using UI-Avatars fallback")
@@ -248,7 +646,96 @@ def get_icon_url_from_name(app_name, bundle_id):
         # Ultimate fallback
         return 'https://github.com/khcrysalis/Feather/blob/v1.x/iOS/Resources/Icons/Main/Mac@3x.png?raw=true'
 
-def _extract_with_model(description_text, filename, model_name, known_tweaks_text):
+# System prompt for _extract_with_model(). The known tweaks list goes between
+# the head and the tail - see metadata_system_prompt()
+_METADATA_PROMPT_HEAD = (
+    "You are an iOS app metadata extraction expert. Given a Telegram message description "
+    "(and optionally a filename), extract the following information:\n\n"
+    "1. **app_name**: The official App Store name of the base app (NOT the tweak name)\n"
+    "   - Examples: 'Instagram', 'TikTok', 'X' (not 'Twitter'), 'Snapchat', 'YouTube'\n"
+    "   - Use the CURRENT official name (e.g., 'X' not 'Twitter')\n"
+    "   - Remove suffixes like (Pro), (Plus), (Premium), (Subscription Unlocked), (Patched), Plus, +, etc.\n"
+    "   - ONLY include the base app name, NOT any modification status\n"
+    "   - For bilingual descriptions: prefer the ENGLISH app name if available, otherwise use the primary name\n"
+    "   - CRITICAL: If you cannot confidently determine the app name from the description, return null\n"
+    "2. **version**: The app version number (format: X.X.X or similar)\n"
+    "3. **tweak_name**: The tweak/mod name if present\n"
+    "   - CRITICAL: ONLY use tweak names from the KNOWN LEGITIMATE TWEAKS list below\n"
+    "   - If a tweak-like name appears but is NOT in the approved list, set to null\n"
+    "   - IMPORTANT: Only include actual tweak/mod names, NOT developer/uploader names\n"
+    "   - If the description says 'made by X', 'developed by X', 'uploaded by X', X is a developer, NOT a tweak\n"
+    "   - Examples of what NOT to include: Chocolate Fluffy, Blatants, IAppsBest, or any username/developer name\n"
+    "   - Set to null if no tweak is mentioned or if the tweak is not in the approved list\n"
+)
+_METADATA_PROMPT_TAIL = (
+    "\n"
+    "4. **bundle_id**: The official App Store bundle identifier for the BASE app\n"
+    "   - Examples: 'com.burbn.instagram', 'com.zhiliaoapp.musically', 'com.atebits.Tweetie2'\n"
+    "   - IMPORTANT: Tweaks do NOT change the bundle ID. Always use the official app's bundle ID.\n"
+    "5. **description**: The original description with ONLY markdown formatting removed\n"
+    "   - Remove markdown syntax: **bold**, [links](url), etc.\n"
+    "   - Keep ALL original text, emojis, and content exactly as-is\n"
+    "   - Do NOT rewrite, rephrase, or summarize the content\n"
+    "   - Only strip markdown formatting characters\n\n"
+    "Common bundle IDs:\n"
+    "- Instagram → com.burbn.instagram\n"
+    "- TikTok → com.zhiliaoapp.musically\n"
+    "- X (Twitter) → com.atebits.Tweetie2\n"
+    "- Snapchat → com.toyopagroup.picaboo\n"
+    "- YouTube → com.google.ios.youtube\n"
+    "- WhatsApp → net.whatsapp.WhatsApp\n"
+    "- Spotify → com.spotify.client\n"
+    "- Reddit → com.reddit.Reddit\n"
+    "- Facebook → com.facebook.Facebook\n"
+    "- Telegram → ph.telegra.Telegraph\n"
+    "- Swiftgram → app.swiftgram.ios (This is a SEPARATE app, NOT Telegram!)\n\n"
+    "IMPORTANT DISTINCTIONS:\n"
+    "- Swiftgram (app.swiftgram.ios) is its OWN standalone app in the App Store\n"
+    "- Swiftgram is NOT a Telegram tweak or mod\n"
+    "- If bundle ID is app.swiftgram.ios, the app_name should be 'Swiftgram', NOT 'Telegram'\n"
+    "- If bundle ID is ph.telegra.Telegraph, the app_name should be 'Telegram'\n"
+    "- Swiftgram WITH TGExtra tweak → app_name: 'Swiftgram', tweak_name: 'TGExtra'\n"
+    "- Telegram WITH TGExtra tweak → app_name: 'Telegram', tweak_name: 'TGExtra'\n\n"
+    "Respond with ONLY a JSON object (no markdown, no explanation):\n"
+    "{\n"
+    '  "app_name": "AppName",\n'
+    '  "version": "X.X.X",\n'
+    '  "tweak_name": "TweakName" or null,\n'
+    '  "bundle_id": "com.company.app",\n'
+    '  "description": "Cleaned description"\n'
+    "}"
+)
+_metadata_system_prompt = None
+_known_tweak_matcher = None
+
+# Fields of the metadata JSON object; all but tweak_name must be present
+_METADATA_FIELDS = ('app_name', 'version', 'bundle_id', 'description', 'tweak_name')
+_METADATA_REQUIRED_FIELDS = frozenset(_METADATA_FIELDS[:4])
+
+def metadata_system_prompt():
+    """
+    Return the metadata extraction system prompt, including the known tweaks.
+
+    The prompt is only built once per loaded tweaks list and the same string
+    is reused for every request.
+    """
+    global _metadata_system_prompt
+    if _metadata_system_prompt is None:
+        known_tweaks_text = ""
+        if _known_tweaks:
+            known_tweaks_text = (
+                f"\n\n**KNOWN LEGITIMATE TWEAKS (use these ONLY):**\n"
+                f"The following is the OFFICIAL list of known, legitimate tweak names. "
+                f"ONLY use tweak names from this list. If a tweak name appears in the description "
+                f"but is NOT in this list, set tweak_name to null.\n\n"
+                f"Approved tweaks: {', '.join(_known_tweaks)}\n\n"
+                f"If you see any of these exact names in the description or filename, "
+                f"extract them as the tweak_name. Otherwise, set tweak_name to null."
+            )
+        _metadata_system_prompt = _METADATA_PROMPT_HEAD + known_tweaks_text + _METADATA_PROMPT_TAIL
+    return _metadata_system_prompt
+
+def _extract_with_model(description_text, filename, model_name, system_prompt):
     """
     Internal function to extract metadata using a specific AI model.
 
@@ -256,7 +743,7 @@ def _extract_with_model(description_text, filename, model_name, known_tweaks_tex
         description_text: The full Telegram message text/description
         filename: Optional filename for additional context
         model_name: The OpenRouter model to use
-        known_tweaks_text: Pre-formatted known tweaks text for the prompt
+        system_prompt: System prompt from metadata_system_prompt()
 
     Returns:
         Dictionary with extracted metadata or None on failure
@@ -275,62 +762,7 @@ def _extract_with_model(description_text, filename, model_name, known_tweaks_tex
             "messages": [
                 {
                     "role": "system",
-                    "content": (
-                        "You are an iOS app metadata extraction expert. Given a Telegram message description "
-                        "(and optionally a filename), extract the following information:\n\n"
-                        "1. **app_name**: The official App Store name of the base app (NOT the tweak name)\n"
-                        "   - Examples: 'Instagram', 'TikTok', 'X' (not 'Twitter'), 'Snapchat', 'YouTube'\n"
-                        "   - Use the CURRENT official name (e.g., 'X' not 'Twitter')\n"
-                        "   - Remove suffixes like (Pro), (Plus), (Premium), (Subscription Unlocked), (Patched), Plus, +, etc.\n"
-                        "   - ONLY include the base app name, NOT any modification status\n"
-                        "   - For bilingual descriptions: prefer the ENGLISH app name if available, otherwise use the primary name\n"
-                        "   - CRITICAL: If you cannot confidently determine the app name from the description, return null\n"
-                        "2. **version**: The app version number (format: X.X.X or similar)\n"
-                        "3. **tweak_name**: The tweak/mod name if present\n"
-                        "   - CRITICAL: ONLY use tweak names from the KNOWN LEGITIMATE TWEAKS list below\n"
-                        "   - If a tweak-like name appears but is NOT in the approved list, set to null\n"
-                        "   - IMPORTANT: Only include actual tweak/mod names, NOT developer/uploader names\n"
-                        "   - If the description says 'made by X', 'developed by X', 'uploaded by X', X is a developer, NOT a tweak\n"
-                        "   - Examples of what NOT to include: Chocolate Fluffy, Blatants, IAppsBest, or any username/developer name\n"
-                        "   - Set to null if no tweak is mentioned or if the tweak is not in the approved list\n"
-                        + known_tweaks_text +
-                        "\n"
-                        "4. **bundle_id**: The official App Store bundle identifier for the BASE app\n"
-                        "   - Examples: 'com.burbn.instagram', 'com.zhiliaoapp.musically', 'com.atebits.Tweetie2'\n"
-                        "   - IMPORTANT: Tweaks do NOT change the bundle ID. Always use the official app's bundle ID.\n"
-                        "5. **description**: The original description with ONLY markdown formatting removed\n"
-                        "   - Remove markdown syntax: **bold**, [links](url), etc.\n"
-                        "   - Keep ALL original text, emojis, and content exactly as-is\n"
-                        "   - Do NOT rewrite, rephrase, or summarize the content\n"
-                        "   - Only strip markdown formatting characters\n\n"
-                        "Common bundle IDs:\n"
-                        "- Instagram → com.burbn.instagram\n"
-                        "- TikTok → com.zhiliaoapp.musically\n"
-                        "- X (Twitter) → com.atebits.Tweetie2\n"
-                        "- Snapchat → com.toyopagroup.picaboo\n"
-                        "- YouTube → com.google.ios.youtube\n"
-                        "- WhatsApp → net.whatsapp.WhatsApp\n"
-                        "- Spotify → com.spotify.client\n"
-                        "- Reddit → com.reddit.Reddit\n"
-                        "- Facebook → com.facebook.Facebook\n"
-                        "- Telegram → ph.telegra.Telegraph\n"
-                        "- Swiftgram → app.swiftgram.ios (This is a SEPARATE app, NOT Telegram!)\n\n"
-                        "IMPORTANT DISTINCTIONS:\n"
-                        "- Swiftgram (app.swiftgram.ios) is its OWN standalone app in the App Store\n"
-                        "- Swiftgram is NOT a Telegram tweak or mod\n"
-                        "- If bundle ID is app.swiftgram.ios, the app_name should be 'Swiftgram', NOT 'Telegram'\n"
-                        "- If bundle ID is ph.telegra.Telegraph, the app_name should be 'Telegram'\n"
-                        "- Swiftgram WITH TGExtra tweak → app_name: 'Swiftgram', tweak_name: 'TGExtra'\n"
-                        "- Telegram WITH TGExtra tweak → app_name: 'Telegram', tweak_name: 'TGExtra'\n\n"
-                        "Respond with ONLY a JSON object (no markdown, no explanation):\n"
-                        "{\n"
-                        '  "app_name": "AppName",\n'
-                        '  "version": "X.X.X",\n'
-                        '  "tweak_name": "TweakName" or null,\n'
-                        '  "bundle_id": "com.company.app",\n'
-                        '  "description": "Cleaned description"\n'
-                        "}"
-                    )
+                    "content": system_prompt
                 },
                 {
                     "role": "user",
@@ -339,7 +771,8 @@ def _extract_with_model(description_text, filename, model_name, known_tweaks_tex
             ],
             "temperature": 0,  # Deterministic output
             "max_tokens": 500,  # More tokens for JSON response
-            "response_format": {"type": "json_object"}  # Force JSON output
+            "response_format": {"type": "json_object"},  # Force JSON output
+            "stream": True  # Lets read_completion() stop as soon as the JSON is complete
         }
 
         headers = {
@@ -352,28 +785,26 @@ def _extract_with_model(description_text, filename, model_name, known_tweaks_tex
         # Make the API request
         req = urllib.request.Request(
             api_url,
-            data=json.dumps(payload).encode('utf-8'),
+            data=dumps_json(payload),
             headers=headers,
             method='POST'
         )
 
-        with urllib.request.urlopen(req, timeout=15) as response:
-            result = json.loads(response.read().decode('utf-8'))
+        result = fetch_url(req, 15, _openrouter_semaphore, parse=read_completion)
 
         # Extract the metadata from the response
         if 'choices' in result and len(result['choices']) > 0:
             content = result['choices'][0]['message']['content'].strip()
 
             # Parse JSON response
-            metadata = json.loads(content)
+            metadata = loads_json(content)
 
             # Validate required fields
-            required_fields = ['app_name', 'version', 'bundle_id', 'description']
-            if all(field in metadata for field in required_fields):
+            if isinstance(metadata, dict) and _METADATA_REQUIRED_FIELDS.issubset(metadata.keys()):
                 # Normalize null values (convert string "null" to None)
                 # This handles cases where AI returns "null" as a string instead of JSON null
-                for field in ['app_name', 'version', 'bundle_id', 'description', 'tweak_name']:
-                    if field in metadata and (metadata[field] == 'null' or metadata[field] is None):
+                for field in _METADATA_FIELDS:
+                    if metadata.get(field) == 'null':
                         metadata[field] = None
 
                 return metadata
@@ -389,6 +820,39 @@ def _extract_with_model(description_text, filename, model_name, known_tweaks_tex
         return None
 
 
+def metadata_cache_key(description_text, filename=None):
+    """Return the _ai_bundle_cache key for a description + filename"""
+    # Use a stable digest - built-in hash() is randomized per process, so the
+    # on-disk cache would never hit across runs
+    cache_input = f"{description_text[:100]}|{filename if filename else ''}"
+    return f"metadata:{hashlib.sha1(cache_input.encode('utf-8')).hexdigest()}"
+
+def match_known_tweak(text):
+    """
+    Find a tweak from tweaks_list.json mentioned in text as a whole word.
+
+    Returns:
+        Canonical tweak name, or None if no known tweak is mentioned
+    """
+    global _known_tweak_matcher
+    if not text or not _known_tweaks:
+        return None
+    if _known_tweak_matcher is None:
+        # Longest names first, so "InstaLRD" wins over "LRD"
+        names = sorted(_known_tweaks, key=len, reverse=True)
+        pattern = re.compile(
+            r'(?<![A-Za-z0-9])(' + '|'.join(re.escape(name) for name in names) + r')(?![A-Za-z0-9])',
+            re.IGNORECASE
+        )
+        canonical = {}
+        for name in _known_tweaks:
+            canonical.setdefault(name.lower(), name)
+        _known_tweak_matcher = (pattern, canonical)
+
+    pattern, canonical = _known_tweak_matcher
+    match = pattern.search(text)
+    return canonical[match.group(1).lower()] if match else None
+
 def extract_metadata_with_ai(description_text, filename=None):
     """
     Use OpenRouter AI to extract ALL metadata from Telegram message description and filename.
@@ -414,7 +878,11 @@ def extract_metadata_with_ai(description_text, filename=None):
         }
         Returns None if extraction completely fails
         Raises RuntimeError if no API key is configured
+
+    Blocking - call via asyncio.to_thread() from async code.
     """
+    global _ai_bundle_cache_dirty
+
     if not OPENROUTER_API_KEY:
         raise RuntimeError(
             "OPENROUTER_API_KEY is required for metadata extraction. "
@@ -422,32 +890,54 @@ def extract_metadata_with_ai(description_text, filename=None):
             "Get your API key from https://openrouter.ai/"
         )
 
-    # Create cache key from description + filename
-    cache_input = f"{description_text[:100]}|{filename if filename else ''}"
-    cache_key = f"metadata:{hash(cache_input)}"
-
+    cache_key = metadata_cache_key(description_text, filename)
     if cache_key in _ai_bundle_cache:
         cached_result = _ai_bundle_cache[cache_key]
         print(f"  [AI CACHE] Using cached metadata extraction")
         return cached_result
 
-    # Build the known tweaks list for the AI prompt
-    known_tweaks_text = ""
-    if _known_tweaks:
-        known_tweaks_text = (
-            f"\n\n**KNOWN LEGITIMATE TWEAKS (use these ONLY):**\n"
-            f"The following is the OFFICIAL list of known, legitimate tweak names. "
-            f"ONLY use tweak names from this list. If a tweak name appears in the description "
-            f"but is NOT in this list, set tweak_name to null.\n\n"
-            f"Approved tweaks: {', '.join(_known_tweaks)}\n\n"
-            f"If you see any of these exact names in the description or filename, "
-            f"extract them as the tweak_name. Otherwise, set tweak_name to null."
-        )
+    # Another thread may already be extracting the same message - wait for
+    # its result instead of paying for a duplicate request
+    with _ai_inflight_lock:
+        future = _ai_inflight.get(cache_key)
+        is_owner = future is None
+        if is_owner:
+            future = concurrent.futures.Future()
+            _ai_inflight[cache_key] = future
+    if not is_owner:
+        print(f"  [AI] Waiting for in-flight extraction of the same message")
+        return future.result()
+
+    try:
+        metadata = _extract_metadata_uncached(description_text, filename)
+        if metadata:
+            # Cache the result
+            _ai_bundle_cache[cache_key] = metadata
+            _ai_bundle_cache_dirty = True
+        future.set_result(metadata)
+        return metadata
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _ai_inflight_lock:
+            del _ai_inflight[cache_key]
+
+
+def _extract_metadata_uncached(description_text, filename):
+    """
+    Run the primary model, then the fallback model if needed, for
+    extract_metadata_with_ai().
+
+    Returns:
+        Metadata dict, or None if extraction failed
+    """
+    system_prompt = metadata_system_prompt()
 
     print(f"  [AI] Extracting metadata from description and filename...")
 
     # Try with primary model first
-    metadata = _extract_with_model(description_text, filename, OPENROUTER_MODEL, known_tweaks_text)
+    metadata = _extract_with_model(description_text, filename, OPENROUTER_MODEL, system_prompt)
 
     # Check if we need to retry with a stronger model
     # Retry if: extraction failed completely, or critical fields (app_name, bundle_id) are both null
@@ -462,7 +952,7 @@ def extract_metadata_with_ai(description_text, filename=None):
     # Retry with stronger model if needed and available
     if needs_fallback and OPENROUTER_FALLBACK_MODEL and OPENROUTER_FALLBACK_MODEL != OPENROUTER_MODEL:
         print(f"  [AI FALLBACK] Retrying with stronger model: {OPENROUTER_FALLBACK_MODEL}")
-        fallback_metadata = _extract_with_model(description_text, filename, OPENROUTER_FALLBACK_MODEL, known_tweaks_text)
+        fallback_metadata = _extract_with_model(description_text, filename, OPENROUTER_FALLBACK_MODEL, system_prompt)
 
         if fallback_metadata:
             metadata = fallback_metadata
@@ -478,82 +968,354 @@ def extract_metadata_with_ai(description_text, filename=None):
         print(f"       Tweak: {metadata.get('tweak_name', 'None')}")
         print(f"       Bundle ID: {metadata.get('bundle_id', 'None')}")
 
-        # Cache the result
-        _ai_bundle_cache[cache_key] = metadata
-
     return metadata
 
 
 # Deprecated functions removed - AI extraction is now mandatory
 # All metadata extraction is done through extract_metadata_with_ai()
 
+# Common tweak prefixes and patterns for extract_tweak_name(), compiled once
+_TWEAK_NAME_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'\b(BHX)\b',                       # BHX (X/Twitter tweak)
+    r'\b(BH[A-Z][a-zA-Z]+(?:\+\+)?)',  # BHInstagram, BHTikTok++, etc.
+    r'\b(RX[A-Z][a-zA-Z]+)',           # RXTikTok, RXInstagram, etc.
+    r'\b(IG[A-Z][a-zA-Z]+)',           # IGFormat, etc.
+    r'\b([A-Z][a-zA-Z]+LRD)\b',        # TikTokLRD, SnapchatLRD, etc.
+    r'\b(Rocket)\b',                    # Rocket
+    r'\b(Watusi)\s*\d*',                # Watusi, Watusi2, etc.
+    r'\b(DLEasy)\b',                    # DLEasy
+    r'\b(Theta)\b',                     # Theta (Instagram Theta)
+    r'\b(TwiGalaxy)\b',                 # TwiGalaxy (Twitter/X tweak)
+    r'\b(NeoFreeBird)\b',               # NeoFreeBird (Twitter/X tweak)
+    r'\b(No Ads?)\b',                   # NoAds, No Ad
+    r'\b(Plus\+?)\b',                   # Plus, Plus+
+    r'\b(Pro\+?)\b',                    # Pro, Pro+
+    r'\b([A-Z][a-z]+(?:Tweak|Mod|Hack|Plus|Pro))', # CustomTweak, InstaMod, etc.
+]]
+_TWEAK_NAME_NORMALIZATION = {'plus': 'Plus', 'plus+': 'Plus', 'pro': 'Pro', 'pro+': 'Pro'}
+
+@lru_cache(maxsize=4096)
 def extract_tweak_name(text):
     """
     Extract tweak name from filename or message text.
     Common patterns: BHX, BHInstagram, IGFormat, Rocket, Watusi, TikTokLRD, RXTikTok, Theta, TwiGalaxy, NeoFreeBird, etc.
 
+    Memoized - the same filenames are checked again in later scan phases.
+
     Returns the tweak name or None if no tweak detected.
     """
     if not text:
         return None
 
-    # Common tweak prefixes and patterns
-    tweak_patterns = [
-        r'\b(BHX)\b',                       # BHX (X/Twitter tweak)
-        r'\b(BH[A-Z][a-zA-Z]+(?:\+\+)?)',  # BHInstagram, BHTikTok++, etc.
-        r'\b(RX[A-Z][a-zA-Z]+)',           # RXTikTok, RXInstagram, etc.
-        r'\b(IG[A-Z][a-zA-Z]+)',           # IGFormat, etc.
-        r'\b([A-Z][a-zA-Z]+LRD)\b',        # TikTokLRD, SnapchatLRD, etc.
-        r'\b(Rocket)\b',                    # Rocket
-        r'\b(Watusi)\s*\d*',                # Watusi, Watusi2, etc.
-        r'\b(DLEasy)\b',                    # DLEasy
-        r'\b(Theta)\b',                     # Theta (Instagram Theta)
-        r'\b(TwiGalaxy)\b',                 # TwiGalaxy (Twitter/X tweak)
-        r'\b(NeoFreeBird)\b',               # NeoFreeBird (Twitter/X tweak)
-        r'\b(No Ads?)\b',                   # NoAds, No Ad
-        r'\b(Plus\+?)\b',                   # Plus, Plus+
-        r'\b(Pro\+?)\b',                    # Pro, Pro+
-        r'\b([A-Z][a-z]+(?:Tweak|Mod|Hack|Plus|Pro))', # CustomTweak, InstaMod, etc.
-    ]
-
-    for pattern in tweak_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    # Patterns are tried in priority order; the first one that matches wins
+    for pattern in _TWEAK_NAME_PATTERNS:
+        match = pattern.search(text)
         if match:
             tweak = match.group(1).strip()
             # Normalize common variations
-            if tweak.lower() in ['plus', 'plus+']:
-                return 'Plus'
-            elif tweak.lower() in ['pro', 'pro+']:
-                return 'Pro'
-            return tweak
+            return _TWEAK_NAME_NORMALIZATION.get(tweak.lower(), tweak)
 
     return None
 
 # extract_app_info_from_message() removed - use extract_metadata_with_ai() instead
 
+# Version patterns in IPA filenames, tried in order: " v1.2.3", "_v1_2_3", " 1.2.3"
+_FILENAME_VERSION_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'\sv(\d+[\d\._]+)',
+    r'_v(\d+[\d_]+)',
+    r'\s(\d+\.\d+\.\d+)',
+]]
+# Trailing "(Tweak)" in an app name, e.g. "Instagram (BHInstagram)"
+_TRAILING_PARENS_RE = re.compile(r'\(([^)]+)\)$')
+
+def strip_ipa_extension(filename):
+    """Return filename without a trailing .ipa (only the suffix, not inner matches)"""
+    return filename[:-4] if filename.endswith('.ipa') else filename
+
+@lru_cache(maxsize=4096)
+def _match_filename_version(fname_no_ext):
+    """Return the first _FILENAME_VERSION_PATTERNS match in fname_no_ext, or None"""
+    for pattern in _FILENAME_VERSION_PATTERNS:
+        match = pattern.search(fname_no_ext)
+        if match:
+            return match
+    return None
+
+def tweak_from_app_name(app_name):
+    """
+    Return the tweak from a trailing "(Tweak)" in an app name, or None.
+
+    Most names have no parentheses, so they are ruled out with a plain
+    endswith() before the regex runs.
+    """
+    if not app_name.endswith(')'):
+        return None
+    match = _TRAILING_PARENS_RE.search(app_name)
+    return match.group(1) if match else None
+
+def version_from_filename(filename):
+    """
+    Parse the app version from an IPA filename before downloading it.
+
+    Returns the version with underscores turned into dots, or None.
+    """
+    match = _match_filename_version(strip_ipa_extension(filename))
+    return match.group(1).replace('_', '.') if match else None
+
+def bundle_from_filename(filename):
+    """
+    Guess the bundle ID of an IPA from its filename, without the AI.
+
+    The app name is the part of the filename before the version, e.g.
+    "Instagram" in "Instagram v404.0.0 (BHInstagram).ipa". It is only
+    resolved for apps that are already in apps.json.
+
+    Returns:
+        Bundle ID, or None if the filename has no version or the app is unknown
+    """
+    fname_no_ext = strip_ipa_extension(filename)
+    match = _match_filename_version(fname_no_ext)
+    if not match:
+        return None
+    app_name = _TRAILING_PARENS_RE.sub('', fname_no_ext[:match.start()].strip())
+    app_name = app_name.replace('_', ' ').strip(' -').lower()
+    return _existing_bundle_ids.get(app_name) if app_name else None
+
+# Version patterns for parse_filename(), tried in order: " v1.2.3" / " v1_2_3",
+# "_v1_2_3" and a standalone " 15.0.16". Trailing separators are not captured
+_PARSE_VERSION_PATTERNS = [re.compile(pattern, flags) for pattern, flags in [
+    (r'\sv(\d+(?:[\d\._]+\d)?)', re.IGNORECASE),
+    (r'_v(\d+(?:_\d+)*)', re.IGNORECASE),
+    (r'\s(\d+\.\d+\.\d+)', 0),
+]]
+# Version and release-group suffixes stripped from a filename to get the app
+# name. Applied in order - each one truncates what the previous ones left
+_NAME_SUFFIX_PATTERNS = [re.compile(pattern, flags) for pattern, flags in [
+    (r'_v\d+[\d_\.]+.*$', re.IGNORECASE),
+    (r'\sv\d+[\d\.]+.*$', re.IGNORECASE),
+    (r'\s\d+\.\d+\.\d+.*$', 0),  # Standalone version
+    (r'_(Pro_|Plus_|Premium_)?(Subscription_)?Unlocked.*$', re.IGNORECASE),
+    (r'_blatant.*$', re.IGNORECASE),
+    (r'_Patched.*$', re.IGNORECASE),
+    (r'\[tg@.*\]$', 0),
+    (r'\sLRD.*$', 0),  # "LRD v2.18" type suffixes
+    (r'\s(Pro|Plus|Premium)$', re.IGNORECASE),
+]]
+_WHITESPACE_RE = re.compile(r'\s+')
+# Markdown links: [text](url) -> text
+_MARKDOWN_LINK_RE = re.compile(r'\[([^\]]+)\]\([^\)]+\)')
+_EMOJI_RE = re.compile(r'[\U0001F300-\U0001F9FF\U0001FA00-\U0001FAFF\U00002700-\U000027BF\U0000FE00-\U0000FE0F\u0600-\u06FF]')
+# Modification suffixes like (Pro), (Unlocked) or (Patched) at the end of a name
+_MOD_SUFFIX_RE = re.compile(
+    r'\s*\((Pro|Plus|Premium|Unlocked|Patched|Subscription Unlocked|Mod|Modded|Hacked|Cracked|Full)\)\s*$',
+    re.IGNORECASE
+)
+
+def parse_filename(fname):
+    """
+    Extract app name and version from an IPA filename.
+
+    Returns:
+        tuple: (app name, version or None)
+    """
+    fname_no_ext = strip_ipa_extension(fname)
+
+    version_match = None
+    for pattern in _PARSE_VERSION_PATTERNS:
+        match = pattern.search(fname_no_ext)
+        if match:
+            version_match = match.group(1).replace('_', '.')
+            break
+
+    # Extract app name (everything before version or common suffixes)
+    name_part = fname_no_ext
+    for pattern in _NAME_SUFFIX_PATTERNS:
+        name_part = pattern.sub('', name_part)
+    # Replace underscores with spaces, clean up
+    name_part = name_part.replace('_', ' ').strip()
+    name_part = _WHITESPACE_RE.sub(' ', name_part)
+
+    return name_part, version_match
+
+def strip_markdown_and_emojis(text):
+    """Remove bold markers, markdown links (keeping the link text) and emojis"""
+    text = text.replace('**', '')
+    # Most names are plain ASCII - skip the regexes that cannot match them
+    if '[' in text:
+        text = _MARKDOWN_LINK_RE.sub(r'\1', text)
+    if not text.isascii():
+        text = _EMOJI_RE.sub('', text)
+    return text
+
+def clean_app_name(name):
+    """Clean up app name by removing exact duplicates, markdown, emojis, and modification suffixes"""
+    if not name:
+        return name
+
+    name = strip_markdown_and_emojis(name)
+
+    # Remove modification suffixes like (Pro), (Plus), (Premium), (Unlocked), (Patched), etc.
+    cleaned = _MOD_SUFFIX_RE.sub('', name)
+    if cleaned != name:
+        print(f"  [CLEANUP] Removed suffix: '{name}' -> '{cleaned}'")
+        name = cleaned
+
+    # Handle duplicated names like "AppAuth AppAuth"
+    # Only remove if EXACTLY the same word is repeated
+    parts = name.split()
+    if len(parts) >= 2 and parts[0] == parts[1]:
+        name = parts[0]
+        print(f"  [CLEANUP] Removed exact duplicate: '{parts[0]} {parts[1]}' -> '{name}'")
+
+    return name.strip()
+
+# Display names forced by the final bundle ID, so the App Store icon lookup
+# matches. Twitter was rebranded to X, so its bundle ID should show as "X"
+_BUNDLE_ID_NAME_OVERRIDES = {
+    'com.atebits.Tweetie2': 'X',
+}
+
+# Bundle IDs whose app name is fixed. Swiftgram is a standalone app, NOT
+# Telegram, but the two are often mixed up in channel messages
+_BUNDLE_NAME_FIX = {
+    'app.swiftgram.ios': 'Swiftgram',
+    'ph.telegra.Telegraph': 'Telegram',
+}
+
+def correct_app_name(bundle_id, app_name):
+    """
+    Fix the app name of a bundle ID in _BUNDLE_NAME_FIX.
+
+    Returns:
+        The fixed name, or app_name unchanged for any other bundle ID
+    """
+    forced = _BUNDLE_NAME_FIX.get(bundle_id)
+    if forced and app_name != forced:
+        print(f"  [CORRECTION] Bundle ID is {bundle_id} - correcting app name from '{app_name}' to '{forced}'")
+        return forced
+    return app_name
+
+# Main app Info.plist: Payload/AppName.app/Info.plist. Nested bundles
+# (Frameworks, PlugIns, Watch apps) are rejected by the single path segment
+_INFO_PLIST_RE = re.compile(r'^Payload/[^/]+\.app/Info\.plist$')
+
+# The Info.plist keys _extract_ipa_info_sync() uses
+_INFO_PLIST_KEYS = (
+    'CFBundleDisplayName', 'CFBundleName', 'CFBundleShortVersionString',
+    'CFBundleVersion', 'MinimumOSVersion', 'CFBundleIdentifier',
+)
+
+def read_plist_fields(data, keys):
+    """
+    Read the given top-level string fields from a plist.
+
+    Binary plists (the usual format inside IPAs) are read lazily: only the
+    top-level keys and the requested values are decoded, not the icon,
+    URL scheme and document type arrays around them. XML plists and any
+    binary layout this reader does not handle are parsed with plistlib.
+
+    Args:
+        data: Raw plist bytes
+        keys: Keys to read
+
+    Returns:
+        Dictionary with the requested keys that are present
+    """
+    try:
+        if data[:8] == b'bplist00':
+            return _read_binary_plist_fields(data, keys)
+    except (ValueError, IndexError, struct.error, UnicodeDecodeError):
+        pass
+    plist_data = plistlib.loads(data)
+    return {key: plist_data[key] for key in keys if key in plist_data}
+
+def _read_binary_plist_fields(data, keys):
+    # Trailer: offset int size, object ref size, object count, top object, offset table offset
+    offset_size, ref_size, num_objects, top_object, table_offset = struct.unpack('>6xBBQQQ', data[-32:])
+
+    def object_offset(ref):
+        if ref >= num_objects:
+            raise ValueError('object reference out of range')
+        start = table_offset + ref * offset_size
+        return int.from_bytes(data[start:start + offset_size], 'big')
+
+    def read_length(pos, info):
+        # Counts of 15 and up are stored as a following int object
+        if info != 0xF:
+            return info, pos + 1
+        int_marker = data[pos + 1]
+        if int_marker >> 4 != 0x1:
+            raise ValueError('bad length marker')
+        size = 1 << (int_marker & 0xF)
+        return int.from_bytes(data[pos + 2:pos + 2 + size], 'big'), pos + 2 + size
+
+    def read_string(ref):
+        pos = object_offset(ref)
+        kind, info = data[pos] >> 4, data[pos] & 0xF
+        if kind == 0x5:  # ASCII
+            length, start = read_length(pos, info)
+            return data[start:start + length].decode('ascii')
+        if kind == 0x6:  # UTF-16BE, length in code units
+            length, start = read_length(pos, info)
+            return data[start:start + 2 * length].decode('utf-16-be')
+        if kind == 0x7:  # UTF-8 (rare)
+            length, start = read_length(pos, info)
+            return data[start:start + length].decode('utf-8')
+        raise ValueError('not a string')
+
+    pos = object_offset(top_object)
+    if data[pos] >> 4 != 0xD:
+        raise ValueError('top object is not a dict')
+    count, start = read_length(pos, data[pos] & 0xF)
+
+    def ref_at(index):
+        ref_pos = start + index * ref_size
+        return int.from_bytes(data[ref_pos:ref_pos + ref_size], 'big')
+
+    wanted = set(keys)
+    fields = {}
+    for index in range(count):
+        try:
+            key = read_string(ref_at(index))
+        except ValueError:
+            continue
+        if key in wanted:
+            fields[key] = read_string(ref_at(count + index))
+    return fields
+
+# Caps how many IPAs are opened (file descriptors + zip parsing) at once
+_ipa_extract_semaphore = asyncio.BoundedSemaphore(os.cpu_count() or 4)
+
 async def extract_ipa_info(ipa_path):
+    """
+    Extract app metadata from an IPA's Info.plist.
+
+    The zip/plist work is blocking, so it runs in a worker thread to keep the
+    event loop free for network I/O.
+    """
+    async with _ipa_extract_semaphore:
+        return await asyncio.to_thread(_extract_ipa_info_sync, ipa_path)
+
+def _extract_ipa_info_sync(ipa_path):
     try:
         print(f"  [INFO] Extracting metadata from: {os.path.basename(ipa_path)}")
         filename = os.path.basename(ipa_path)
 
         with zipfile.ZipFile(ipa_path, 'r') as zip_ref:
             info_plist_path = None
-            for name in zip_ref.namelist():
-                # Look for main app Info.plist: Payload/AppName.app/Info.plist
-                # Exclude framework/plugin Info.plist files
-                if (name.startswith('Payload/') and
-                    name.endswith('.app/Info.plist') and
-                    '/Frameworks/' not in name and
-                    '/PlugIns/' not in name):
-                    info_plist_path = name
+            # infolist() is the archive's own entry list, not a new copy
+            for zip_info in zip_ref.infolist():
+                if _INFO_PLIST_RE.match(zip_info.filename):
+                    info_plist_path = zip_info.filename
                     break
 
             if not info_plist_path:
                 print(f"  [WARNING] No Info.plist found in {os.path.basename(ipa_path)}")
                 return None
 
-            with zip_ref.open(info_plist_path) as plist_file:
-                plist_data = plistlib.load(plist_file)
+            # Info.plist is small - decompress it in one call and read only
+            # the fields used below
+            plist_data = read_plist_fields(zip_ref.read(info_plist_path), _INFO_PLIST_KEYS)
 
             # Extract basic info from plist
             name = plist_data.get('CFBundleDisplayName') or plist_data.get('CFBundleName', '')
@@ -584,8 +1346,9 @@ async def extract_ipa_info(ipa_path):
         print(f"  [ERROR] Failed to extract info from {ipa_path}: {e}")
         return None
 
+@lru_cache(maxsize=1)
 def get_repo_info():
-    """Get repository owner and name from git remote"""
+    """Get repository owner and name from git remote (cached - the remote does not change mid-run)"""
     try:
         result = subprocess.run(
             ['git', 'config', '--get', 'remote.origin.url'],
@@ -624,13 +1387,190 @@ def get_repo_info():
         print(f"[WARNING] Could not parse git remote: {e}")
         return None, None, None, None
 
-def get_release_assets():
-    """Get list of assets in the latest release using GitHub API"""
+def _pace_github_requests(status, response_headers):
+    """
+    Record when GitHub API requests should pause, from a response's headers.
+
+    Uses X-RateLimit-Remaining / X-RateLimit-Reset to stop before the limit
+    is exhausted, and Retry-After on 403/429 responses.
+    """
+    global _github_pause_until
+    now = time.time()
+    pause_until = 0.0
+
+    remaining = response_headers.get('X-RateLimit-Remaining', '')
+    reset = response_headers.get('X-RateLimit-Reset', '')
+    if remaining.isdigit() and reset.isdigit() and int(remaining) < GITHUB_RATE_LIMIT_MIN_REMAINING:
+        pause_until = int(reset)
+    retry_after = response_headers.get('Retry-After', '')
+    if status in (403, 429) and retry_after.isdigit():
+        pause_until = max(pause_until, now + int(retry_after))
+
+    if pause_until > now:
+        pause_until = min(pause_until, now + GITHUB_RATE_LIMIT_MAX_WAIT)
+        with _github_rate_lock:
+            _github_pause_until = max(_github_pause_until, pause_until)
+
+def _wait_for_github_rate_limit():
+    """Sleep until the pause recorded by _pace_github_requests() is over"""
+    delay = _github_pause_until - time.time()
+    if delay > 0:
+        print(f"[RATE LIMIT] GitHub API rate limit nearly exhausted, waiting {delay:.0f}s")
+        time.sleep(delay)
+
+def _github_send(method, url, headers, body=None, timeout=10):
+    """
+    Send a GitHub API request, retrying transient failures.
+
+    Connection errors, timeouts, 5xx responses, 429s and rate-limit 403s are
+    retried up to GITHUB_MAX_ATTEMPTS times with exponential backoff plus
+    jitter (Retry-After and rate limit resets are waited out by
+    _wait_for_github_rate_limit()).
+
+    Returns:
+        tuple: (status code, response headers, response body bytes)
+    """
+    for attempt in range(GITHUB_MAX_ATTEMPTS):
+        last_attempt = attempt == GITHUB_MAX_ATTEMPTS - 1
+        try:
+            status, response_headers, response_body = _github_send_once(method, url, headers, body, timeout)
+        except (http.client.HTTPException, OSError) as e:
+            if last_attempt:
+                raise
+            reason = str(e) or type(e).__name__
+        else:
+            rate_limited = status == 403 and response_headers.get('X-RateLimit-Remaining') == '0'
+            if last_attempt or not (status in GITHUB_RETRY_STATUSES or rate_limited):
+                return status, response_headers, response_body
+            reason = f"HTTP {status}"
+
+        delay = min(60, 2 ** attempt + random.uniform(0, 1))
+        print(f"  [RETRY] GitHub API {method} failed ({reason}), retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+def _github_send_once(method, url, headers, body=None, timeout=10):
+    """
+    Send a request over this thread's keep-alive connection to url's host.
+
+    Release lookups, asset deletes and uploads all reuse one connection per
+    host, so only the first call pays for the TCP and TLS handshake.
+
+    Returns:
+        tuple: (status code, response headers, response body bytes)
+    """
+    parsed = urllib.parse.urlsplit(url)
+    conn_key = (parsed.scheme, parsed.netloc)
+    path = parsed.path + (f"?{parsed.query}" if parsed.query else '')
+
+    if not hasattr(_github_local, 'connections'):
+        _github_local.connections = {}
+    connections = _github_local.connections
+
+    _wait_for_github_rate_limit()
+
+    # Retry once on a fresh connection if the server dropped the idle one
+    for attempt in range(2):
+        conn = connections.get(conn_key)
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if parsed.scheme == 'https' else http.client.HTTPConnection
+            conn = conn_class(parsed.netloc, timeout=GITHUB_CONNECT_TIMEOUT, blocksize=GITHUB_UPLOAD_BLOCKSIZE)
+            connections[conn_key] = conn
+        try:
+            # Fail fast on an unreachable host, then allow the full timeout
+            if conn.sock is None:
+                conn.connect()
+            conn.sock.settimeout(timeout)
+            if hasattr(body, 'seek'):
+                body.seek(0)
+            conn.request(method, path, body=body, headers=headers)
+            with conn.getresponse() as response:
+                _pace_github_requests(response.status, response.headers)
+                return response.status, response.headers, response.read()
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            connections.pop(conn_key, None)
+            # A timeout means the server is slow, not that the connection went stale
+            if attempt or isinstance(e, TimeoutError):
+                raise
+
+def _github_headers():
+    """Return the headers sent with every GitHub API request"""
+    headers = {'Accept': 'application/vnd.github+json', 'User-Agent': 'FTRepo-Scraper'}
+    # Only send Authorization when there is a token - an empty header is rejected
+    if GITHUB_TOKEN:
+        headers['Authorization'] = f'token {GITHUB_TOKEN}'
+    return headers
+
+def load_release_cache():
+    """Load the cached release response (URL, ETag and asset map) from disk"""
+    if os.path.exists(RELEASE_CACHE_FILE):
+        try:
+            with open(RELEASE_CACHE_FILE, 'rb') as f:
+                return loads_json(f.read())
+        except Exception as e:
+            print(f"[RELEASE] Failed to load release cache: {e}")
+    return {}
+
+def github_api_request(url, method='GET', payload=None, timeout=10, body=None, content_type=None):
+    """
+    Call the GitHub REST API in-process over a pooled keep-alive connection.
+
+    Like curl -s, error responses are not raised: GitHub answers them with a
+    JSON body carrying a 'message', which is returned for the caller to check.
+
+    Args:
+        url: Full API URL
+        method: HTTP method
+        payload: Optional object sent as the JSON request body
+        timeout: Socket timeout in seconds
+        body: Optional raw request body (bytes or a binary file opened for reading)
+        content_type: Content-Type of body
+
+    Returns:
+        Parsed JSON response, {} for an empty body
+        (raises ValueError if the body is not JSON)
+    """
+    headers = _github_headers()
+    if payload is not None:
+        body = dumps_json(payload)
+        content_type = 'application/json'
+    if body is not None:
+        headers['Content-Type'] = content_type or 'application/octet-stream'
+        # GitHub rejects chunked uploads, so always send the length
+        headers['Content-Length'] = str(len(body) if isinstance(body, bytes) else os.fstat(body.fileno()).st_size)
+
+    _, _, response_body = _github_send(method, url, headers, body, timeout)
+    return loads_json(response_body) if response_body.strip() else {}
+
+def get_release(refresh=False):
+    """
+    Get the latest release, fetching it from the GitHub API once per run.
+
+    The release ID and asset IDs don't change during a run apart from the
+    assets we replace, which upload_to_release() updates in place. A missing
+    release is not kept, so it is fetched again once it has been created.
+
+    Args:
+        refresh: Fetch the release again even if it was already fetched
+
+    Returns:
+        tuple: (release_id, {asset name: asset id}), or (None, {}) if the
+        release doesn't exist or can't be fetched
+    """
+    global _release
+    if _release is None or refresh:
+        release = _fetch_release()
+        if release[0] is None:
+            return release
+        _release = release
+    return _release
+
+def _fetch_release():
     try:
         owner, repo, api_url, _ = get_repo_info()
         if not owner or not repo or not api_url:
             print(f"[ERROR] Could not determine repository info")
-            return set()
+            return None, {}
 
         print(f"[RELEASE] Fetching assets from '{RELEASE_TAG}' release...")
         print(f"[INFO] Repository: {owner}/{repo}")
@@ -638,39 +1578,58 @@ def get_release_assets():
 
         # GitHub API: GET /repos/{owner}/{repo}/releases/tags/{tag}
         url = f"{api_url}/repos/{owner}/{repo}/releases/tags/{RELEASE_TAG}"
-        headers = {}
-        if GITHUB_TOKEN:
-            headers['Authorization'] = f'token {GITHUB_TOKEN}'
-
-        result = subprocess.run(
-            ['curl', '-s', '-H', f'Authorization: token {GITHUB_TOKEN}' if GITHUB_TOKEN else '', url],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-
-        if result.returncode != 0 or not result.stdout:
-            print(f"[RELEASE] Release '{RELEASE_TAG}' not found, will create it")
-            return set()
 
         try:
-            data = json.loads(result.stdout)
-            if 'message' in data:  # Error response
+            # Conditional GET: if the release is unchanged since the cached
+            # response, GitHub answers 304 with no body and no rate limit cost
+            headers = _github_headers()
+            cached = load_release_cache()
+            if cached.get('url') == url and cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+
+            status, response_headers, body = _github_send('GET', url, headers)
+            if status == 304:
+                print(f"[RELEASE] Release unchanged since last run, using cached asset list")
+                return cached['release_id'], cached['assets']
+
+            data = loads_json(body) if body.strip() else {}
+            if 'message' in data or not data.get('id'):  # Error response
                 print(f"[RELEASE] Release '{RELEASE_TAG}' not found, will create it")
-                return set()
-
-            assets = {asset['name'] for asset in data.get('assets', [])}
-            ipa_assets = {name for name in assets if name.endswith('.ipa')}
-            print(f"[RELEASE] Found {len(ipa_assets)} IPA files in release")
-            if ipa_assets:
-                print(f"[RELEASE] Existing IPAs: {', '.join(sorted(ipa_assets)[:5])}{'...' if len(ipa_assets) > 5 else ''}")
-            return ipa_assets
-        except json.JSONDecodeError:
+                return None, {}
+            asset_ids = {asset['name']: asset['id'] for asset in data.get('assets', [])}
+
+            etag = response_headers.get('ETag')
+            if etag:
+                try:
+                    write_json_atomic(RELEASE_CACHE_FILE, {
+                        'url': url, 'etag': etag, 'release_id': data['id'], 'assets': asset_ids
+                    })
+                except Exception as e:
+                    print(f"[RELEASE] Failed to save release cache: {e}")
+            return data['id'], asset_ids
+        except (OSError, http.client.HTTPException, ValueError):
             print(f"[RELEASE] Release '{RELEASE_TAG}' not found, will create it")
-            return set()
+            return None, {}
     except Exception as e:
         print(f"[ERROR] Failed to fetch release assets: {e}")
-        return set()
+        return None, {}
+
+def get_release_assets(release=None):
+    """
+    Get the names of the IPA assets in the latest release.
+
+    Args:
+        release: Optional result of get_release() to reuse instead of fetching
+
+    Returns:
+        frozenset: IPA asset names, for membership checks
+    """
+    _, asset_ids = release if release is not None else get_release()
+    ipa_assets = frozenset(name for name in asset_ids if name.endswith('.ipa'))
+    print(f"[RELEASE] Found {len(ipa_assets)} IPA files in release")
+    if ipa_assets:
+        print(f"[RELEASE] Existing IPAs: {', '.join(sorted(ipa_assets)[:5])}{'...' if len(ipa_assets) > 5 else ''}")
+    return ipa_assets
 
 def ensure_release_exists():
     """Ensure the 'latest' release exists using GitHub API"""
@@ -684,19 +1643,12 @@ def ensure_release_exists():
 
         # Check if release exists
         url = f"{api_url}/repos/{owner}/{repo}/releases/tags/{RELEASE_TAG}"
-        result = subprocess.run(
-            ['curl', '-s', '-H', f'Authorization: token {GITHUB_TOKEN}' if GITHUB_TOKEN else '', url],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-
         try:
-            data = json.loads(result.stdout)
+            data = github_api_request(url)
             if 'id' in data:  # Release exists
                 print(f"[RELEASE] Release '{RELEASE_TAG}' already exists")
                 return True
-        except json.JSONDecodeError:
+        except ValueError:
             pass
 
         # Create release
@@ -710,36 +1662,34 @@ def ensure_release_exists():
             "prerelease": False
         }
 
-        result = subprocess.run(
-            ['curl', '-s', '-X', 'POST',
-             '-H', 'Content-Type: application/json',
-             '-H', f'Authorization: token {GITHUB_TOKEN}' if GITHUB_TOKEN else '',
-             '-d', json.dumps(payload),
-             create_url],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-
-        if result.returncode == 0:
+        data = github_api_request(create_url, 'POST', payload=payload)
+        if 'id' in data:
             print(f"[RELEASE] Release '{RELEASE_TAG}' created successfully")
             return True
         else:
-            print(f"[ERROR] Failed to create release: {result.stderr}")
+            print(f"[ERROR] Failed to create release: {data.get('message', data)}")
             return False
     except Exception as e:
         print(f"[ERROR] Failed to ensure release exists: {e}")
         return False
 
-def upload_to_release(file_path, bundle_id=None, tweak_name=None, old_filename=None):
+def upload_to_release(file_path, bundle_id=None, tweak_name=None, old_filename=None, release=None):
     """Upload a file to the latest release using GitHub API
 
+    At most MAX_CONCURRENT_UPLOADS uploads run at once; blocking - call via
+    asyncio.to_thread() from async code.
+
     Args:
         file_path: Path to the file to upload
         bundle_id: Bundle ID of the app (used to identify old versions)
         tweak_name: Name of the tweak (used to differentiate tweaked versions)
         old_filename: Filename of the old version to delete (if known)
+        release: Optional result of get_release() to reuse instead of fetching
     """
+    with _upload_semaphore:
+        return _upload_to_release(file_path, old_filename, release)
+
+def _upload_to_release(file_path, old_filename, release):
     try:
         owner, repo, api_url, _ = get_repo_info()
         if not owner or not repo or not api_url:
@@ -749,17 +1699,10 @@ def upload_to_release(file_path, bundle_id=None, tweak_name=None, old_filename=N
         filename = os.path.basename(file_path)
         print(f"[UPLOAD] Uploading {filename} to release '{RELEASE_TAG}'...")
 
-        # First, get the release ID
-        url = f"{api_url}/repos/{owner}/{repo}/releases/tags/{RELEASE_TAG}"
-        result = subprocess.run(
-            ['curl', '-s', '-H', f'Authorization: token {GITHUB_TOKEN}' if GITHUB_TOKEN else '', url],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-
-        data = json.loads(result.stdout)
-        release_id = data.get('id')
+        # First, get the release ID (fetch it again if the shared lookup failed)
+        if release is None or release[0] is None:
+            release = get_release()
+        release_id, asset_ids = release
         if not release_id:
             print(f"[ERROR] Could not get release ID")
             return False
@@ -768,261 +1711,404 @@ def upload_to_release(file_path, bundle_id=None, tweak_name=None, old_filename=N
         # This handles two cases:
         # 1. Exact filename match (same version being re-uploaded)
         # 2. Old filename provided (different version being replaced)
-        for asset in data.get('assets', []):
-            if asset['name'] == filename:
-                print(f"[INFO] Deleting existing asset with same filename: {filename}")
-                delete_url = f"{api_url}/repos/{owner}/{repo}/releases/{release_id}/assets/{asset['id']}"
-                subprocess.run(
-                    ['curl', '-s', '-X', 'DELETE',
-                     '-H', f'Authorization: token {GITHUB_TOKEN}' if GITHUB_TOKEN else '',
-                     delete_url],
-                    capture_output=True,
-                    check=False
-                )
-            elif old_filename and asset['name'] == old_filename:
-                print(f"[INFO] Deleting old version from release: {old_filename}")
-                delete_url = f"{api_url}/repos/{owner}/{repo}/releases/{release_id}/assets/{asset['id']}"
-                subprocess.run(
-                    ['curl', '-s', '-X', 'DELETE',
-                     '-H', f'Authorization: token {GITHUB_TOKEN}' if GITHUB_TOKEN else '',
-                     delete_url],
-                    capture_output=True,
-                    check=False
-                )
+        delete_urls = []
+        if filename in asset_ids:
+            print(f"[INFO] Deleting existing asset with same filename: {filename}")
+            delete_urls.append(f"{api_url}/repos/{owner}/{repo}/releases/{release_id}/assets/{asset_ids[filename]}")
+        if old_filename and old_filename != filename and old_filename in asset_ids:
+            print(f"[INFO] Deleting old version from release: {old_filename}")
+            delete_urls.append(f"{api_url}/repos/{owner}/{repo}/releases/{release_id}/assets/{asset_ids[old_filename]}")
+
+        # The deletes are independent - send them side by side
+        if len(delete_urls) > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(delete_urls)) as executor:
+                list(executor.map(lambda delete_url: github_api_request(delete_url, 'DELETE'), delete_urls))
+        elif delete_urls:
+            github_api_request(delete_urls[0], 'DELETE')
 
         # Upload the file (GitHub requires uploads.github.com and Content-Type header)
-        # URL-encode filename - only encode & since []@ are valid in GitHub release filenames
+        # URL-encode filename - keep []@ and other printable ASCII as-is, since they
+        # are valid in GitHub release filenames; encode &, %, #, ?, +, spaces and non-ASCII
         upload_url = f"https://uploads.github.com/repos/{owner}/{repo}/releases/{release_id}/assets"
-        safe_filename = filename.replace('&', '%26')
-        result = subprocess.run(
-            ['curl', '-s', '-X', 'POST',
-             '-H', f'Authorization: token {GITHUB_TOKEN}' if GITHUB_TOKEN else '',
-             '-H', 'Content-Type: application/octet-stream',
-             '--data-binary', f'@{file_path}',
-             f'{upload_url}?name={safe_filename}'],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-
-        if result.returncode == 0:
-            # Check if the response contains an error message
+        safe_filename = quote(filename, safe=_UPLOAD_NAME_SAFE_CHARS)
+        with open(file_path, 'rb') as f:
             try:
-                response_data = json.loads(result.stdout)
-                if 'message' in response_data and response_data.get('message'):
-                    print(f"[ERROR] Failed to upload {filename}: {response_data.get('message')}")
-                    return False
-            except json.JSONDecodeError:
-                pass  # Not JSON, likely success
-
-            print(f"[UPLOAD] Successfully uploaded {filename}")
-            return True
-        else:
-            print(f"[ERROR] Failed to upload {filename}: {result.stderr if result.stderr else result.stdout}")
+                response_data = github_api_request(
+                    f'{upload_url}?name={safe_filename}', 'POST',
+                    body=f, content_type='application/octet-stream', timeout=120
+                )
+            except ValueError:
+                response_data = {}  # Not JSON, likely success
+
+        # Check if the response contains an error message
+        if response_data.get('message'):
+            print(f"[ERROR] Failed to upload {filename}: {response_data.get('message')}")
             return False
+
+        # Keep the shared asset list in step with the release
+        if old_filename and old_filename != filename:
+            asset_ids.pop(old_filename, None)
+        if 'id' in response_data:
+            asset_ids[filename] = response_data['id']
+        else:
+            asset_ids.pop(filename, None)
+
+        print(f"[UPLOAD] Successfully uploaded {filename}")
+        return True
     except Exception as e:
         print(f"[ERROR] Failed to upload {filename}: {e}")
         return False
 
+def list_downloaded_ipas():
+    """
+    List the IPA files in DOWNLOAD_DIR with a single directory scan.
+
+    Returns:
+        list: IPA filenames (regular files only), or [] if the directory doesn't exist
+    """
+    try:
+        with os.scandir(DOWNLOAD_DIR) as entries:
+            return [entry.name for entry in entries if entry.name.endswith('.ipa') and entry.is_file()]
+    except FileNotFoundError:
+        return []
+
 async def download_progress_callback(current, total, filename):
     """Callback to show download progress - disabled to reduce log spam"""
     # Don't print progress updates during download
     pass
 
 async def download_single_file(client, message, download_path, filename):
-    """Download a single file with error handling"""
+    """
+    Download a single file with error handling.
+
+    The file is written to download_path + '.part' and renamed into place only
+    once it is complete, so an interrupted download never leaves a partial
+    .ipa behind for list_downloaded_ipas() to pick up.
+    """
+    part_path = download_path + '.part'
     try:
+        # Telethon picks a new name instead of overwriting an existing file,
+        # so drop any leftover from an interrupted run first
+        try:
+            os.remove(part_path)
+        except FileNotFoundError:
+            pass
         await client.download_media(
             message,
-            download_path,
+            part_path,
             progress_callback=lambda c, t: download_progress_callback(c, t, filename)
         )
-        file_size_mb = os.path.getsize(download_path) / (1024 * 1024)
+        os.replace(part_path, download_path)
+        file_size_mb = message.document.size / (1024 * 1024)
         print(f"  [SUCCESS] Download complete: {filename} ({file_size_mb:.2f}MB)")
         return True
     except Exception as e:
         print(f"  [ERROR] Download failed for {filename}: {e}")
         # Clean up partial download
-        if os.path.exists(download_path):
-            os.remove(download_path)
+        try:
+            os.remove(part_path)
+        except FileNotFoundError:
+            pass
         return False
 
-async def scrape_channel_or_topic(client, entity, downloaded_files, name, release_assets, source_metadata=None, existing_apps_dict=None):
-    print(f"\n[CHANNEL] Starting scrape: {name}")
-    print(f"[INFO] Searching for last {MAX_DOWNLOADS_PER_CHANNEL} IPAs total (limit: 200 messages)")
+def _record_download(downloaded_files, filename, source, message_text, message_timestamp):
+    """Add a downloaded file to downloaded_files and the source tracking log"""
+    file_info = {
+        'source': source,
+        'message': message_text,
+        'timestamp': message_timestamp
+    }
+    downloaded_files[filename] = {'filename': filename, **file_info}
+    log_source_tracking(filename, file_info)
+
+async def _scan_and_queue(client, iter_kwargs, downloaded_files, release_assets, existing_apps_dict, source, progress_every=50):
+    """
+    Scan messages for IPA files and queue the ones that should be downloaded.
+
+    IPAs that are already in the release, already collected this run, or not
+    newer than the version in apps.json are skipped. IPAs already in
+    DOWNLOAD_DIR are added straight to downloaded_files.
+
+    Args:
+        client: Connected TelegramClient
+        iter_kwargs: Keyword arguments for client.iter_messages (entity, limit, reply_to)
+        downloaded_files: Dict of collected files by filename; files already in DOWNLOAD_DIR are added to it
+        release_assets: Set of IPA filenames already in the release
+        existing_apps_dict: Maps "bundle_id" or "bundle_id:tweak" to version
+        source: Channel name recorded as the source of each file
+        progress_every: Print a progress line every this many messages
+
+    Returns:
+        tuple: (download_queue, ipa_count, messages_scanned, new_downloads)
+    """
+    ipa_count = 0
+    new_downloads = 0
+    messages_scanned = 0
+    download_queue = []  # Queue of (message, filename, message_text, timestamp) tuples to download
+    queued_filenames = set()
+    # One directory scan instead of a stat per IPA; files downloaded during
+    # this run are caught by the downloaded_files check
+    already_downloaded = set(list_downloaded_ipas())
+
+    # Only documents can be IPAs, so let Telegram drop every other message
+    async for message in client.iter_messages(filter=InputMessagesFilterDocument, **iter_kwargs):
+        messages_scanned += 1
+        if messages_scanned % progress_every == 0:
+            print(f"[PROGRESS] Scanned {messages_scanned} messages, found {ipa_count} IPAs...")
+
+        if not message.document:
+            continue
+
+        # Only DocumentAttributeFilename has a file_name
+        filename = next(
+            (name for attr in message.document.attributes if (name := getattr(attr, 'file_name', None))),
+            None
+        )
+        if not filename or not filename.endswith('.ipa'):
+            continue
+
+        ipa_count += 1
+
+        # Check if we've processed enough IPAs
+        if ipa_count > MAX_DOWNLOADS_PER_CHANNEL:
+            print(f"[INFO] Reached maximum of {MAX_DOWNLOADS_PER_CHANNEL} IPAs total, stopping scan")
+            break
+
+        # Check if file is already in the release - the common case, so it
+        # gets a single log line and no further work
+        if filename in release_assets:
+            print(f"[SKIP] IPA #{ipa_count}: {filename} already exists in '{RELEASE_TAG}' release")
+            continue
+
+        # Messages are newest first, so the first post of a filename wins
+        if filename in downloaded_files or filename in queued_filenames:
+            print(f"[SKIP] IPA #{ipa_count}: {filename} already collected from a newer message")
+            continue
+
+        file_size_mb = message.document.size / (1024 * 1024)
+
+        # Forum messages carry the topic they were posted in
+        topic_info = ""
+        reply_to = getattr(message, 'reply_to', None)
+        if reply_to and getattr(reply_to, 'reply_to_top_id', None):
+            topic_info = f" (topic #{reply_to.reply_to_top_id})"
+
+        print(f"\n[FOUND] IPA #{ipa_count}: {filename} ({file_size_mb:.2f}MB){topic_info}")
+
+        # Capture message text/caption
+        message_text = message.text or message.message or ""
+        if message_text:
+            message_text = message_text.strip()
+
+        # Check version against existing apps.json before downloading
+        if existing_apps_dict:
+            # The filename alone identifies most known apps; only ask the AI
+            # when it does not
+            version_from_file = version_from_filename(filename)
+            bundle_from_file = bundle_from_filename(filename) if version_from_file else None
+
+            ai_meta = None
+            if message_text and not bundle_from_file:
+                ai_meta = await asyncio.to_thread(extract_metadata_with_ai, message_text, filename)
+            ai_meta = ai_meta or {}
+            version_msg = ai_meta.get('version')
+            tweak_msg = ai_meta.get('tweak_name')
+            if not ai_meta and bundle_from_file:
+                # Without the AI, a tweak named only in the caption would be
+                # missed and the file checked against the stock app's key
+                tweak_msg = match_known_tweak(message_text) or match_known_tweak(filename)
+            bundle_id_from_file = ai_meta.get('bundle_id') or bundle_from_file
+
+            # Extract tweak from filename if AI didn't find one
+            tweak = tweak_msg or extract_tweak_name(filename)
+
+            # Parse filename for version if not in message
+            version_to_check = version_msg or version_from_file
+
+            if bundle_id_from_file and version_to_check:
+                # Create unique key (with tweak if present)
+                check_key = f"{bundle_id_from_file}:{tweak}" if tweak else bundle_id_from_file
+
+                if check_key in existing_apps_dict:
+                    existing_version = existing_apps_dict[check_key]
+                    print(f"  [VERSION CHECK] Found in apps.json: {check_key} v{existing_version}")
+                    print(f"  [VERSION CHECK] Telegram version: v{version_to_check}")
+
+                    if not compare_versions(version_to_check, existing_version):
+                        # Telegram version is NOT newer (either older or equal)
+                        print(f"  [SKIP] Telegram version v{version_to_check} is not newer than existing v{existing_version}")
+                        continue
+                    print(f"  [NEWER] Telegram version v{version_to_check} is newer than existing v{existing_version}, downloading...")
+                else:
+                    print(f"  [NEW] App not found in apps.json ({check_key}), will download")
+            else:
+                if not bundle_id_from_file:
+                    print(f"  [WARNING] Could not extract bundle ID from filename, skipping version check")
+                if not version_to_check:
+                    print(f"  [WARNING] Could not extract version from message/filename, skipping version check")
+
+        message_timestamp = message.date.timestamp() if message.date else 0
+
+        if filename not in already_downloaded:
+            download_queue.append((message, filename, message_text, message_timestamp))
+            queued_filenames.add(filename)
+            print(f"  [QUEUED] Added to download queue")
+        else:
+            print(f"  [INFO] Already in downloads folder, will be processed")
+            _record_download(downloaded_files, filename, source, message_text, message_timestamp)
+            new_downloads += 1
+
+    return download_queue, ipa_count, messages_scanned, new_downloads
+
+async def _download_queued(client, download_queue, downloaded_files, source):
+    """
+    Download the files queued by _scan_and_queue in parallel.
+
+    At most MAX_CONCURRENT_DOWNLOADS files are downloaded at once, and the next
+    download starts as soon as any slot frees up.
+
+    Args:
+        client: Connected TelegramClient
+        download_queue: List of (message, filename, message_text, timestamp) tuples
+        downloaded_files: Dict that successfully downloaded files are added to, by filename
+        source: Channel name recorded as the source of each file
+
+    Returns:
+        int: Number of files downloaded successfully
+    """
+    if not download_queue:
+        return 0
+
+    print(f"\n[DOWNLOAD] Starting parallel download of {len(download_queue)} files...")
+    print(f"[PERF] Up to {MAX_CONCURRENT_DOWNLOADS} downloads at once")
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    completed = []
+
+    async def bounded_download(message, filename, message_text, message_timestamp):
+        # Each download records its own result as soon as it finishes, so
+        # files that completed are tracked even if the run is cut short
+        async with semaphore:
+            print(f"  [START] {filename}")
+            download_path = os.path.join(DOWNLOAD_DIR, filename)
+            try:
+                success = await download_single_file(client, message, download_path, filename)
+            except Exception as e:
+                print(f"  [ERROR] Exception downloading {filename}: {e}")
+                return
+        if success:
+            _record_download(downloaded_files, filename, source, message_text, message_timestamp)
+            completed.append(filename)
+            print(f"  [PROGRESS] {len(completed)}/{len(download_queue)} downloads complete")
+
+    await asyncio.gather(*[bounded_download(*queued) for queued in download_queue])
+
+    new_downloads = len(completed)
+    print(f"[DOWNLOAD] Completed - {new_downloads}/{len(download_queue)} successful")
+    return new_downloads
+
+async def scrape_channel_or_topic(client, entity, downloaded_files, name, release_assets, source_metadata=None, existing_apps_dict=None, reply_to=None):
+    """
+    Scrape the latest IPAs from a channel, or from one forum topic when reply_to is set.
+
+    Args:
+        client: Connected TelegramClient
+        entity: Channel entity (or username) to scrape
+        downloaded_files: Dict that downloaded files are added to, by filename
+        name: Channel or topic name used in log output
+        release_assets: Set of IPA filenames already in the release
+        source_metadata: Dict with the 'channel' recorded as each file's source
+        existing_apps_dict: Maps "bundle_id" or "bundle_id:tweak" to version
+        reply_to: Forum topic ID to restrict the scan to
+    """
+    label = "TOPIC" if reply_to is not None else "CHANNEL"
+    print(f"\n[{label}] Starting scrape: {name}")
+    print(f"[INFO] Searching for last {MAX_DOWNLOADS_PER_CHANNEL} IPAs total (limit: 200 documents)")
     print(f"[PERF] Parallel downloads: {MAX_CONCURRENT_DOWNLOADS} concurrent")
     if source_metadata is None:
         source_metadata = {}
     if existing_apps_dict is None:
         existing_apps_dict = {}
+    source = source_metadata.get('channel', name)
+    iter_kwargs = {'entity': entity, 'limit': 200}
+    if reply_to is not None:
+        iter_kwargs['reply_to'] = reply_to
     try:
-        ipa_count = 0
-        new_downloads = 0
-        messages_scanned = 0
-        download_queue = []  # Queue of (message, filename, message_text) tuples to download
-
         # First pass: scan messages and collect files to download
-        async for message in client.iter_messages(entity, limit=200):
-            messages_scanned += 1
-            if messages_scanned % 50 == 0:
-                print(f"[PROGRESS] Scanned {messages_scanned} messages, found {ipa_count} IPAs...")
-
-            if message.document:
-                filename = None
-                for attr in message.document.attributes:
-                    if isinstance(attr, DocumentAttributeFilename):
-                        filename = attr.file_name
-                        break
-
-                if filename and filename.endswith('.ipa'):
-                    ipa_count += 1
-                    file_size_mb = message.document.size / (1024 * 1024)
-                    print(f"\n[FOUND] IPA #{ipa_count}: {filename} ({file_size_mb:.2f}MB)")
-
-                    # Check if we've processed enough IPAs
-                    if ipa_count > MAX_DOWNLOADS_PER_CHANNEL:
-                        print(f"[INFO] Reached maximum of {MAX_DOWNLOADS_PER_CHANNEL} IPAs total, stopping scan")
-                        break
-
-                    # Capture message text/caption
-                    message_text = message.text or message.message or ""
-                    if message_text:
-                        message_text = message_text.strip()
-
-                    # Check if file is already in the release
-                    if filename in release_assets:
-                        print(f"  [SKIP] Already exists in '{RELEASE_TAG}' release")
-                        continue
+        download_queue, ipa_count, messages_scanned, new_downloads = await _scan_and_queue(
+            client, iter_kwargs, downloaded_files, release_assets, existing_apps_dict, source
+        )
 
-                    # *** NEW: Check version against existing apps.json ***
-                    # Extract version and bundle ID from message/filename before downloading
-                    if existing_apps_dict:
-                        # Use AI extraction (mandatory)
-                        if message_text:
-                            ai_meta = extract_metadata_with_ai(message_text, filename)
-                            app_name_msg = ai_meta['app_name']
-                            version_msg = ai_meta['version']
-                            tweak_msg = ai_meta['tweak_name']
-                            bundle_id_from_file = ai_meta['bundle_id']
-                        else:
-                            # No message text, skip version check
-                            app_name_msg = None
-                            version_msg = None
-                            tweak_msg = None
-                            bundle_id_from_file = None
-
-                        # Extract tweak from filename if AI didn't find one
-                        tweak_from_file = extract_tweak_name(filename) if not tweak_msg else None
-                        tweak = tweak_msg or tweak_from_file
-
-                        # Try to determine version
-                        # Parse filename for version if not in message
-                        version_from_file = None
-                        fname_no_ext = filename.replace('.ipa', '')
-                        # Try various version patterns
-                        version_patterns = [
-                            r'\sv(\d+[\d\._]+)',  # " v1.2.3"
-                            r'_v(\d+[\d_]+)',      # "_v1_2_3"
-                            r'\s(\d+\.\d+\.\d+)'   # " 1.2.3"
-                        ]
-                        for pattern in version_patterns:
-                            match = re.search(pattern, fname_no_ext, re.IGNORECASE)
-                            if match:
-                                version_from_file = match.group(1).replace('_', '.')
-                                break
-
-                        # Determine version to check
-                        version_to_check = version_msg or version_from_file
-
-                        if bundle_id_from_file and version_to_check:
-                            # Create unique key (with tweak if present)
-                            if tweak:
-                                check_key = f"{bundle_id_from_file}:{tweak}"
-                            else:
-                                check_key = bundle_id_from_file
-
-                            # Check if this app exists in apps.json
-                            if check_key in existing_apps_dict:
-                                existing_version = existing_apps_dict[check_key]
-                                print(f"  [VERSION CHECK] Found in apps.json: {check_key} v{existing_version}")
-                                print(f"  [VERSION CHECK] Telegram version: v{version_to_check}")
-
-                                # Compare versions
-                                if not compare_versions(version_to_check, existing_version):
-                                    # Telegram version is NOT newer (either older or equal)
-                                    print(f"  [SKIP] Telegram version v{version_to_check} is not newer than existing v{existing_version}")
-                                    continue
-                                else:
-                                    print(f"  [NEWER] Telegram version v{version_to_check} is newer than existing v{existing_version}, downloading...")
-                            else:
-                                print(f"  [NEW] App not found in apps.json ({check_key}), will download")
-                        else:
-                            if not bundle_id_from_file:
-                                print(f"  [WARNING] Could not extract bundle ID from filename, skipping version check")
-                            if not version_to_check:
-                                print(f"  [WARNING] Could not extract version from message/filename, skipping version check")
-
-                    download_path = os.path.join(DOWNLOAD_DIR, filename)
-
-                    if not os.path.exists(download_path):
-                        # Add to download queue with message timestamp
-                        message_timestamp = message.date.timestamp() if message.date else 0
-                        download_queue.append((message, filename, message_text, message_timestamp))
-                        print(f"  [QUEUED] Added to download queue")
-                    else:
-                        print(f"  [INFO] Already in downloads folder, will be processed")
-                        message_timestamp = message.date.timestamp() if message.date else 0
-                        downloaded_files.append({
-                            'filename': filename,
-                            'source': source_metadata.get('channel', name),
-                            'message': message_text,
-                            'timestamp': message_timestamp
-                        })
-                        new_downloads += 1
-
-        # Second pass: download files in parallel batches
-        if download_queue:
-            print(f"\n[DOWNLOAD] Starting parallel download of {len(download_queue)} files...")
-            print(f"[PERF] Processing in batches of {MAX_CONCURRENT_DOWNLOADS}")
-
-            for i in range(0, len(download_queue), MAX_CONCURRENT_DOWNLOADS):
-                batch = download_queue[i:i + MAX_CONCURRENT_DOWNLOADS]
-                batch_num = i // MAX_CONCURRENT_DOWNLOADS + 1
-                total_batches = (len(download_queue) - 1) // MAX_CONCURRENT_DOWNLOADS + 1
-
-                print(f"\n[BATCH {batch_num}/{total_batches}] Downloading {len(batch)} files in parallel...")
-
-                # Create download tasks for this batch
-                tasks = []
-                for message, filename, message_text, message_timestamp in batch:
-                    download_path = os.path.join(DOWNLOAD_DIR, filename)
-                    print(f"  [START] {filename}")
-                    task = download_single_file(client, message, download_path, filename)
-                    tasks.append((task, filename, message_text, message_timestamp))
-
-                # Wait for all downloads in this batch to complete
-                results = await asyncio.gather(*[task for task, _, _, _ in tasks], return_exceptions=True)
-
-                # Process results
-                for (_, filename, message_text, message_timestamp), result in zip(tasks, results):
-                    if result is True:
-                        downloaded_files.append({
-                            'filename': filename,
-                            'source': source_metadata.get('channel', name),
-                            'message': message_text,
-                            'timestamp': message_timestamp
-                        })
-                        new_downloads += 1
-                    elif isinstance(result, Exception):
-                        print(f"  [ERROR] Exception downloading {filename}: {result}")
-
-                print(f"[BATCH {batch_num}/{total_batches}] Completed - {new_downloads}/{len(download_queue)} successful")
-
-        print(f"\n[CHANNEL] Completed: {name}")
+        # Second pass: download files in parallel
+        new_downloads += await _download_queued(client, download_queue, downloaded_files, source)
+
+        print(f"\n[{label}] Completed: {name}")
         print(f"[SUMMARY] Scanned {messages_scanned} messages, found {ipa_count} IPAs, downloaded {new_downloads} new files")
     except Exception as e:
         print(f"[ERROR] Failed to scrape {name}: {e}")
 
+class DiscoveredTopic:
+    """A simple topic-like object for topics not returned by GetForumTopicsRequest"""
+    def __init__(self, id, title="Unknown Topic"):
+        self.id = id
+        self.title = title
+
+def is_ipa_topic(title):
+    """Whether a forum topic title looks like an IPA topic ('ipa', 'missing', 📁 or 👀)"""
+    title_lower = title.lower()
+    return 'ipa' in title_lower or 'missing' in title_lower or '📁' in title or '👀' in title
+
+def load_topics_cache():
+    """Load the cached forum IPA topics from disk"""
+    if os.path.exists(TOPICS_CACHE_FILE):
+        try:
+            with open(TOPICS_CACHE_FILE, 'rb') as f:
+                return loads_json(f.read())
+        except Exception as e:
+            print(f"[FORUM] Failed to load topics cache: {e}")
+    return {}
+
+async def get_ipa_topics(client, entity):
+    """
+    Get the IPA topics of a forum channel.
+
+    Topics are filtered with is_ipa_topic() as soon as they are fetched, and
+    the (id, title) pairs are cached in TOPICS_CACHE_FILE for TOPICS_CACHE_TTL
+    seconds, so a rerun within the TTL skips the topic request entirely.
+
+    Returns:
+        - List of IPA topics (objects with id and title) if successful
+        - None if forum topics API is not available (signals to try fallback)
+    """
+    cache = load_topics_cache()
+    cache_key = str(entity.id)
+    cached = cache.get(cache_key)
+    if cached and time.time() - cached.get('fetched_at', 0) < TOPICS_CACHE_TTL:
+        print(f"[FORUM] Using {len(cached['topics'])} cached IPA topics")
+        return [DiscoveredTopic(topic['id'], topic['title']) for topic in cached['topics']]
+
+    topics = await get_forum_topics_safe(client, entity)
+    if topics is None:
+        return None
+    print(f"[FORUM] Found {len(topics)} topics total")
+
+    ipa_topics = []
+    for topic in topics:
+        title = getattr(topic, 'title', '') or ''
+        if is_ipa_topic(title):
+            ipa_topics.append(DiscoveredTopic(topic.id, title))
+            print(f"[TOPIC] Found IPA topic: {title}")
+
+    cache[cache_key] = {
+        'fetched_at': time.time(),
+        'topics': [{'id': topic.id, 'title': topic.title} for topic in ipa_topics]
+    }
+    try:
+        write_json_atomic(TOPICS_CACHE_FILE, cache)
+    except Exception as e:
+        print(f"[FORUM] Failed to save topics cache: {e}")
+    return ipa_topics
+
 async def get_forum_topics_safe(client, entity):
     """
     Safely get forum topics from a Telegram forum channel.
@@ -1064,11 +2150,6 @@ async def get_forum_topics_safe(client, entity):
                 if hasattr(reply_to, 'forum_topic') and reply_to.forum_topic:
                     topic_id = reply_to.reply_to_top_id or reply_to.reply_to_msg_id
                     if topic_id and topic_id not in discovered_topics:
-                        # Create a simple topic-like object
-                        class DiscoveredTopic:
-                            def __init__(self, id, title="Unknown Topic"):
-                                self.id = id
-                                self.title = title
                         discovered_topics[topic_id] = DiscoveredTopic(topic_id, f"Topic {topic_id}")
         
         if discovered_topics:
@@ -1102,150 +2183,20 @@ async def scrape_forum_messages_fallback(client, entity, downloaded_files, chann
     This iterates through all messages in the forum and looks for IPA files across all topics.
     """
     print(f"\n[FORUM FALLBACK] Starting fallback scrape for forum: {channel_name}")
-    print(f"[INFO] Searching for last {MAX_DOWNLOADS_PER_CHANNEL} IPAs total (limit: 500 messages)")
+    print(f"[INFO] Searching for last {MAX_DOWNLOADS_PER_CHANNEL} IPAs total (limit: 500 documents)")
     print(f"[PERF] Parallel downloads: {MAX_CONCURRENT_DOWNLOADS} concurrent")
-    
-    ipa_count = 0
-    new_downloads = 0
-    messages_scanned = 0
-    download_queue = []
-    
+
     try:
-        # Iterate through all messages in the forum
         # In forums, messages are spread across topics but iter_messages can still access them
-        async for message in client.iter_messages(entity, limit=500):
-            messages_scanned += 1
-            if messages_scanned % 100 == 0:
-                print(f"[PROGRESS] Scanned {messages_scanned} messages, found {ipa_count} IPAs...")
-            
-            if message.document:
-                filename = None
-                for attr in message.document.attributes:
-                    if isinstance(attr, DocumentAttributeFilename):
-                        filename = attr.file_name
-                        break
-                
-                if filename and filename.endswith('.ipa'):
-                    ipa_count += 1
-                    file_size_mb = message.document.size / (1024 * 1024)
-                    
-                    # Try to get topic info from message
-                    topic_info = ""
-                    if hasattr(message, 'reply_to') and message.reply_to:
-                        reply_to = message.reply_to
-                        if hasattr(reply_to, 'reply_to_top_id') and reply_to.reply_to_top_id:
-                            topic_info = f" (topic #{reply_to.reply_to_top_id})"
-                    
-                    print(f"\n[FOUND] IPA #{ipa_count}: {filename} ({file_size_mb:.2f}MB){topic_info}")
-                    
-                    if ipa_count > MAX_DOWNLOADS_PER_CHANNEL:
-                        print(f"[INFO] Reached maximum of {MAX_DOWNLOADS_PER_CHANNEL} IPAs total")
-                        break
-                    
-                    message_text = message.text or message.message or ""
-                    if message_text:
-                        message_text = message_text.strip()
-                    
-                    if filename in release_assets:
-                        print(f"  [SKIP] Already exists in '{RELEASE_TAG}' release")
-                        continue
-                    
-                    # Version check against existing apps.json
-                    if existing_apps_dict and message_text:
-                        ai_meta = extract_metadata_with_ai(message_text, filename)
-                        if ai_meta:
-                            version_msg = ai_meta.get('version')
-                            tweak_msg = ai_meta.get('tweak_name')
-                            bundle_id_from_file = ai_meta.get('bundle_id')
-                            
-                            tweak_from_file = extract_tweak_name(filename) if not tweak_msg else None
-                            tweak = tweak_msg or tweak_from_file
-                            
-                            version_from_file = None
-                            fname_no_ext = filename.replace('.ipa', '')
-                            version_patterns = [
-                                r'\sv(\d+[\d\._]+)',
-                                r'_v(\d+[\d_]+)',
-                                r'\s(\d+\.\d+\.\d+)'
-                            ]
-                            for pattern in version_patterns:
-                                match = re.search(pattern, fname_no_ext, re.IGNORECASE)
-                                if match:
-                                    version_from_file = match.group(1).replace('_', '.')
-                                    break
-                            
-                            version_to_check = version_msg or version_from_file
-                            
-                            if bundle_id_from_file and version_to_check:
-                                check_key = f"{bundle_id_from_file}:{tweak}" if tweak else bundle_id_from_file
-                                
-                                if check_key in existing_apps_dict:
-                                    existing_version = existing_apps_dict[check_key]
-                                    print(f"  [VERSION CHECK] Found in apps.json: {check_key} v{existing_version}")
-                                    print(f"  [VERSION CHECK] Telegram version: v{version_to_check}")
-                                    
-                                    if not compare_versions(version_to_check, existing_version):
-                                        print(f"  [SKIP] Telegram version v{version_to_check} is not newer than existing v{existing_version}")
-                                        continue
-                                    else:
-                                        print(f"  [NEWER] Telegram version v{version_to_check} is newer than existing v{existing_version}, downloading...")
-                                else:
-                                    print(f"  [NEW] App not found in apps.json ({check_key}), will download")
-                    
-                    download_path = os.path.join(DOWNLOAD_DIR, filename)
-                    
-                    if not os.path.exists(download_path):
-                        message_timestamp = message.date.timestamp() if message.date else 0
-                        download_queue.append((message, filename, message_text, message_timestamp))
-                        print(f"  [QUEUED] Added to download queue")
-                    else:
-                        print(f"  [INFO] Already in downloads folder, will be processed")
-                        message_timestamp = message.date.timestamp() if message.date else 0
-                        downloaded_files.append({
-                            'filename': filename,
-                            'source': channel_name,
-                            'message': message_text,
-                            'timestamp': message_timestamp
-                        })
-                        new_downloads += 1
-        
-        # Download in parallel batches
-        if download_queue:
-            print(f"\n[DOWNLOAD] Starting parallel download of {len(download_queue)} files...")
-            
-            for i in range(0, len(download_queue), MAX_CONCURRENT_DOWNLOADS):
-                batch = download_queue[i:i + MAX_CONCURRENT_DOWNLOADS]
-                batch_num = i // MAX_CONCURRENT_DOWNLOADS + 1
-                total_batches = (len(download_queue) - 1) // MAX_CONCURRENT_DOWNLOADS + 1
-                
-                print(f"\n[BATCH {batch_num}/{total_batches}] Downloading {len(batch)} files in parallel...")
-                
-                tasks = []
-                for message, filename, message_text, message_timestamp in batch:
-                    download_path = os.path.join(DOWNLOAD_DIR, filename)
-                    print(f"  [START] {filename}")
-                    task = download_single_file(client, message, download_path, filename)
-                    tasks.append((task, filename, message_text, message_timestamp))
-                
-                results = await asyncio.gather(*[task for task, _, _, _ in tasks], return_exceptions=True)
-                
-                for (_, filename, message_text, message_timestamp), result in zip(tasks, results):
-                    if result is True:
-                        downloaded_files.append({
-                            'filename': filename,
-                            'source': channel_name,
-                            'message': message_text,
-                            'timestamp': message_timestamp
-                        })
-                        new_downloads += 1
-                    elif isinstance(result, Exception):
-                        print(f"  [ERROR] Exception downloading {filename}: {result}")
-                
-                print(f"[BATCH {batch_num}/{total_batches}] Completed - {new_downloads}/{len(download_queue)} successful")
-        
+        download_queue, ipa_count, messages_scanned, new_downloads = await _scan_and_queue(
+            client, {'entity': entity, 'limit': 500}, downloaded_files, release_assets,
+            existing_apps_dict, channel_name, progress_every=100
+        )
+        new_downloads += await _download_queued(client, download_queue, downloaded_files, channel_name)
+
         print(f"\n[FORUM FALLBACK] Completed: {channel_name}")
         print(f"[SUMMARY] Scanned {messages_scanned} messages, found {ipa_count} IPAs, downloaded {new_downloads} new files")
-    
+
     except Exception as e:
         print(f"[ERROR] Forum fallback scrape failed for {channel_name}: {e}")
 
@@ -1259,32 +2210,31 @@ async def download_ipas():
     print(f"\n[SETUP] Loading existing {REPO_FILE} to check versions...")
     if os.path.exists(REPO_FILE):
         try:
-            with open(REPO_FILE, 'r', encoding='utf-8') as f:
-                repo_data = json.load(f)
-                existing_apps = repo_data.get('apps', [])
-                print(f"[SETUP] Found {len(existing_apps)} existing apps in {REPO_FILE}")
-
-                for app in existing_apps:
-                    bundle_id = app.get('bundleIdentifier', '')
-                    version = app.get('version', '')
-                    app_name = app.get('name', '')
-
-                    # Detect tweak from app name (e.g., "Instagram (BHInstagram)")
-                    tweak = None
-                    tweak_match = re.search(r'\(([^)]+)\)$', app_name)
-                    if tweak_match:
-                        tweak = tweak_match.group(1)
-
-                    # Create unique key
-                    if tweak:
-                        key = f"{bundle_id}:{tweak}"
-                    else:
-                        key = bundle_id
+            repo_data = load_repo_file()
+            existing_apps = repo_data.get('apps', [])
+            print(f"[SETUP] Found {len(existing_apps)} existing apps in {REPO_FILE}")
 
-                    existing_apps_dict[key] = version
-                    print(f"  [LOADED] {app_name} v{version} ({key})")
+            for app in existing_apps:
+                bundle_id = app.get('bundleIdentifier', '')
+                version = app.get('version', '')
+                app_name = app.get('name', '')
 
-                print(f"[SETUP] Loaded {len(existing_apps_dict)} app versions from {REPO_FILE}")
+                # Detect tweak from app name (e.g., "Instagram (BHInstagram)")
+                tweak = tweak_from_app_name(app_name)
+
+                # Create unique key
+                if tweak:
+                    key = f"{bundle_id}:{tweak}"
+                else:
+                    key = bundle_id
+
+                existing_apps_dict[key] = version
+                base_name = (_TRAILING_PARENS_RE.sub('', app_name) if tweak else app_name).strip().lower()
+                if base_name and bundle_id:
+                    _existing_bundle_ids.setdefault(base_name, bundle_id)
+                print(f"  [LOADED] {app_name} v{version} ({key})")
+
+            print(f"[SETUP] Loaded {len(existing_apps_dict)} app versions from {REPO_FILE}")
         except Exception as e:
             print(f"[WARNING] Failed to load {REPO_FILE}: {e}")
     else:
@@ -1323,18 +2273,12 @@ async def download_ipas():
     print(f"\n[SETUP] Checking existing IPAs in '{RELEASE_TAG}' release...")
     release_assets = get_release_assets()
     print(f"[SETUP] Found {len(release_assets)} existing IPAs in release")
-    downloaded_files = []
+    downloaded_files = {}  # Maps filename to its source info
 
     # Load existing source tracking
-    source_tracking_file = 'source_tracking.json'
-    source_tracking = {}
-    if os.path.exists(source_tracking_file):
-        try:
-            with open(source_tracking_file, 'r', encoding='utf-8') as f:
-                source_tracking = json.load(f)
-            print(f"[SETUP] Loaded source tracking for {len(source_tracking)} files")
-        except:
-            pass
+    source_tracking = load_source_tracking()
+    if source_tracking:
+        print(f"[SETUP] Loaded source tracking for {len(source_tracking)} files")
 
     print(f"\n[SETUP] Channels to process: {', '.join(CHANNELS)}")
     print("=" * 60)
@@ -1352,195 +2296,22 @@ async def download_ipas():
 
             if hasattr(entity, 'forum') and entity.forum:
                 print(f"[FORUM] Channel is a forum, searching for IPA topics...")
-                topics = await get_forum_topics_safe(client, entity)
+                ipa_topics = await get_ipa_topics(client, entity)
 
                 # If topics couldn't be fetched, fall back to scanning all forum messages
-                if topics is None:
+                if ipa_topics is None:
                     print(f"[FORUM] Forum topics API not available, using fallback method...")
                     print(f"[FORUM] Scanning all forum messages directly (will search across all topics)...")
                     await scrape_forum_messages_fallback(client, entity, downloaded_files, channel, release_assets, existing_apps_dict)
                     # Skip the topic processing below since we used the fallback
-                elif len(topics) == 0:
-                    print(f"[FORUM] Found 0 topics, no IPA topics to process")
+                elif len(ipa_topics) == 0:
+                    print(f"[FORUM] Found 0 IPA topics, nothing to process")
                 else:
-                    print(f"[FORUM] Found {len(topics)} topics total")
-                    # Process each IPA topic
-                    ipa_topics = []
-                    for topic in topics:
-                        topic_title = topic.title.lower() if hasattr(topic, 'title') else ''
-                        topic_title_original = topic.title if hasattr(topic, 'title') else ''
-                        # Match topics containing 'ipa', 'missing', folder icon (📁), or eyes emoji (👀)
-                        if 'ipa' in topic_title or 'missing' in topic_title or '📁' in topic_title_original or '👀' in topic_title_original:
-                            ipa_topics.append(topic)
-                            print(f"[TOPIC] Found IPA topic: {topic.title}")
-
                     print(f"[FORUM] Processing {len(ipa_topics)} IPA topics...")
 
                     for topic_idx, topic in enumerate(ipa_topics, 1):
                         print(f"\n[TOPIC {topic_idx}/{len(ipa_topics)}] {topic.title}")
-                        # Use the parallel download function for topics too
-                        topic_entity = await client.get_entity(entity.id)
-                        # Create a custom iterator for topic messages
-                        async def topic_scraper():
-                            ipa_count = 0
-                            new_downloads = 0
-                            messages_scanned = 0
-                            download_queue = []
-
-                            print(f"[INFO] Searching for last {MAX_DOWNLOADS_PER_CHANNEL} IPAs total in topic...")
-                            print(f"[PERF] Parallel downloads: {MAX_CONCURRENT_DOWNLOADS} concurrent")
-
-                            async for message in client.iter_messages(entity, reply_to=topic.id, limit=200):
-                                messages_scanned += 1
-                                if messages_scanned % 50 == 0:
-                                    print(f"[PROGRESS] Scanned {messages_scanned} messages in topic, found {ipa_count} IPAs...")
-
-                                if message.document:
-                                    filename = None
-                                    for attr in message.document.attributes:
-                                        if isinstance(attr, DocumentAttributeFilename):
-                                            filename = attr.file_name
-                                            break
-
-                                    if filename and filename.endswith('.ipa'):
-                                        ipa_count += 1
-                                        file_size_mb = message.document.size / (1024 * 1024)
-                                        print(f"\n[FOUND] IPA #{ipa_count}: {filename} ({file_size_mb:.2f}MB)")
-
-                                        if ipa_count > MAX_DOWNLOADS_PER_CHANNEL:
-                                            print(f"[INFO] Reached maximum of {MAX_DOWNLOADS_PER_CHANNEL} IPAs total for this topic")
-                                            break
-
-                                        message_text = message.text or message.message or ""
-                                        if message_text:
-                                            message_text = message_text.strip()
-
-                                        if filename in release_assets:
-                                            print(f"  [SKIP] Already exists in '{RELEASE_TAG}' release")
-                                            continue
-
-                                        # *** NEW: Check version against existing apps.json ***
-                                        # Extract version and bundle ID from message/filename before downloading
-                                        if existing_apps_dict:
-                                            # Use AI extraction (mandatory)
-                                            if message_text:
-                                                ai_meta = extract_metadata_with_ai(message_text, filename)
-                                                app_name_msg = ai_meta['app_name']
-                                                version_msg = ai_meta['version']
-                                                tweak_msg = ai_meta['tweak_name']
-                                                bundle_id_from_file = ai_meta['bundle_id']
-                                            else:
-                                                # No message text, skip version check
-                                                app_name_msg = None
-                                                version_msg = None
-                                                tweak_msg = None
-                                                bundle_id_from_file = None
-
-                                            # Extract tweak from filename if AI didn't find one
-                                            tweak_from_file = extract_tweak_name(filename) if not tweak_msg else None
-                                            tweak = tweak_msg or tweak_from_file
-
-                                            # Try to determine version
-                                            # Parse filename for version if not in message
-                                            version_from_file = None
-                                            fname_no_ext = filename.replace('.ipa', '')
-                                            # Try various version patterns
-                                            version_patterns = [
-                                                r'\sv(\d+[\d\._]+)',  # " v1.2.3"
-                                                r'_v(\d+[\d_]+)',      # "_v1_2_3"
-                                                r'\s(\d+\.\d+\.\d+)'   # " 1.2.3"
-                                            ]
-                                            for pattern in version_patterns:
-                                                match = re.search(pattern, fname_no_ext, re.IGNORECASE)
-                                                if match:
-                                                    version_from_file = match.group(1).replace('_', '.')
-                                                    break
-
-                                            # Determine version to check
-                                            version_to_check = version_msg or version_from_file
-
-                                            if bundle_id_from_file and version_to_check:
-                                                # Create unique key (with tweak if present)
-                                                if tweak:
-                                                    check_key = f"{bundle_id_from_file}:{tweak}"
-                                                else:
-                                                    check_key = bundle_id_from_file
-
-                                                # Check if this app exists in apps.json
-                                                if check_key in existing_apps_dict:
-                                                    existing_version = existing_apps_dict[check_key]
-                                                    print(f"  [VERSION CHECK] Found in apps.json: {check_key} v{existing_version}")
-                                                    print(f"  [VERSION CHECK] Telegram version: v{version_to_check}")
-
-                                                    # Compare versions
-                                                    if not compare_versions(version_to_check, existing_version):
-                                                        # Telegram version is NOT newer (either older or equal)
-                                                        print(f"  [SKIP] Telegram version v{version_to_check} is not newer than existing v{existing_version}")
-                                                        continue
-                                                    else:
-                                                        print(f"  [NEWER] Telegram version v{version_to_check} is newer than existing v{existing_version}, downloading...")
-                                                else:
-                                                    print(f"  [NEW] App not found in apps.json ({check_key}), will download")
-                                            else:
-                                                if not bundle_id_from_file:
-                                                    print(f"  [WARNING] Could not extract bundle ID from filename, skipping version check")
-                                                if not version_to_check:
-                                                    print(f"  [WARNING] Could not extract version from message/filename, skipping version check")
-
-                                        download_path = os.path.join(DOWNLOAD_DIR, filename)
-
-                                        if not os.path.exists(download_path):
-                                            message_timestamp = message.date.timestamp() if message.date else 0
-                                            download_queue.append((message, filename, message_text, message_timestamp))
-                                            print(f"  [QUEUED] Added to download queue")
-                                        else:
-                                            print(f"  [INFO] Already in downloads folder, will be processed")
-                                            message_timestamp = message.date.timestamp() if message.date else 0
-                                            downloaded_files.append({
-                                                'filename': filename,
-                                                'source': channel,
-                                                'message': message_text,
-                                                'timestamp': message_timestamp
-                                            })
-                                            new_downloads += 1
-
-                            # Download in parallel batches
-                            if download_queue:
-                                print(f"\n[DOWNLOAD] Starting parallel download of {len(download_queue)} files...")
-
-                                for i in range(0, len(download_queue), MAX_CONCURRENT_DOWNLOADS):
-                                    batch = download_queue[i:i + MAX_CONCURRENT_DOWNLOADS]
-                                    batch_num = i // MAX_CONCURRENT_DOWNLOADS + 1
-                                    total_batches = (len(download_queue) - 1) // MAX_CONCURRENT_DOWNLOADS + 1
-
-                                    print(f"\n[BATCH {batch_num}/{total_batches}] Downloading {len(batch)} files in parallel...")
-
-                                    tasks = []
-                                    for message, filename, message_text, message_timestamp in batch:
-                                        download_path = os.path.join(DOWNLOAD_DIR, filename)
-                                        print(f"  [START] {filename}")
-                                        task = download_single_file(client, message, download_path, filename)
-                                        tasks.append((task, filename, message_text, message_timestamp))
-
-                                    results = await asyncio.gather(*[task for task, _, _, _ in tasks], return_exceptions=True)
-
-                                    for (_, filename, message_text, message_timestamp), result in zip(tasks, results):
-                                        if result is True:
-                                            downloaded_files.append({
-                                                'filename': filename,
-                                                'source': channel,
-                                                'message': message_text,
-                                                'timestamp': message_timestamp
-                                            })
-                                            new_downloads += 1
-                                        elif isinstance(result, Exception):
-                                            print(f"  [ERROR] Exception downloading {filename}: {result}")
-
-                                    print(f"[BATCH {batch_num}/{total_batches}] Completed - {new_downloads}/{len(download_queue)} successful")
-
-                            print(f"[TOPIC] Completed: {topic.title} - Scanned {messages_scanned} messages, found {ipa_count} IPAs, downloaded {new_downloads} new files")
-
-                        await topic_scraper()
+                        await scrape_channel_or_topic(client, entity, downloaded_files, topic.title, release_assets, {'channel': channel}, existing_apps_dict, reply_to=topic.id)
             else:
                 print(f"[INFO] Channel is a regular channel (not a forum)")
                 await scrape_channel_or_topic(client, entity, downloaded_files, channel, release_assets, {'channel': channel}, existing_apps_dict)
@@ -1558,21 +2329,17 @@ async def download_ipas():
     print(f"[SUMMARY] Total new files downloaded: {len(downloaded_files)}")
     if downloaded_files:
         print(f"[SUMMARY] Downloaded files:")
-        for idx, file_info in enumerate(downloaded_files, 1):
-            if isinstance(file_info, dict):
-                print(f"  {idx}. {file_info['filename']} (from @{file_info['source']})")
-                # Update source tracking with source, message, and timestamp
-                source_tracking[file_info['filename']] = {
-                    'source': file_info['source'],
-                    'message': file_info.get('message', ''),
-                    'timestamp': file_info.get('timestamp', 0)
-                }
-            else:
-                print(f"  {idx}. {file_info}")
+        for idx, file_info in enumerate(downloaded_files.values(), 1):
+            print(f"  {idx}. {file_info['filename']} (from @{file_info['source']})")
+            # Update source tracking with source, message, and timestamp
+            source_tracking[file_info['filename']] = {
+                'source': file_info['source'],
+                'message': file_info.get('message', ''),
+                'timestamp': file_info.get('timestamp', 0)
+            }
 
     # Save source tracking
-    with open(source_tracking_file, 'w', encoding='utf-8') as f:
-        json.dump(source_tracking, f, indent=2, ensure_ascii=False)
+    save_source_tracking(source_tracking)
     print(f"[SETUP] Saved source tracking for {len(source_tracking)} files")
 
     print(f"\n[DISCONNECT] Disconnecting from Telegram...")
@@ -1581,6 +2348,28 @@ async def download_ipas():
 
     return downloaded_files, source_tracking
 
+_VERSION_SEPARATOR_RE = re.compile(r'[.-]')
+
+@lru_cache(maxsize=None)
+def parse_version(version):
+    """
+    Parse a version string into a tuple of ints for comparison (cached).
+
+    Only the first whitespace-separated word is used, and trailing zero
+    components are dropped so "2.0" and "2.0.0" compare equal.
+
+    Raises:
+        IndexError/AttributeError for empty or non-string versions
+    """
+    parts = [int(x) for x in _VERSION_SEPARATOR_RE.split(version.split()[0]) if x.isdigit()]
+    while parts and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+def format_timestamp(timestamp):
+    """Format a message timestamp for the log, in local time"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+
 def compare_versions(v1, v2, timestamp1=None, timestamp2=None):
     """
     Compare two versions and return True if v1 is newer than v2.
@@ -1595,12 +2384,9 @@ def compare_versions(v1, v2, timestamp1=None, timestamp2=None):
         True if v1 is newer than v2, False otherwise
     """
     try:
-        v1_parts = [int(x) for x in re.split(r'[.-]', v1.split()[0]) if x.isdigit()]
-        v2_parts = [int(x) for x in re.split(r'[.-]', v2.split()[0]) if x.isdigit()]
-
-        max_len = max(len(v1_parts), len(v2_parts))
-        v1_parts.extend([0] * (max_len - len(v1_parts)))
-        v2_parts.extend([0] * (max_len - len(v2_parts)))
+        # Each version is parsed once per run, no matter how often it is compared
+        v1_parts = parse_version(v1)
+        v2_parts = parse_version(v2)
 
         # If versions are equal and we have timestamps, use the more recent one
         if v1_parts == v2_parts:
@@ -1624,20 +2410,14 @@ async def update_repo_json(source_tracking=None):
     print("=" * 60)
 
     if source_tracking is None:
-        source_tracking = {}
-        # Try to load from file
-        if os.path.exists('source_tracking.json'):
-            try:
-                with open('source_tracking.json', 'r', encoding='utf-8') as f:
-                    source_tracking = json.load(f)
-            except:
-                pass
+        source_tracking = load_source_tracking()
 
     # Load App Store cache for performance
     load_appstore_cache()
 
-    # Load AI bundle ID cache
-    load_ai_bundle_cache()
+    # Load AI bundle ID cache (if not already loaded)
+    if not _ai_bundle_cache:
+        load_ai_bundle_cache()
 
     # Load known tweaks list for AI context (if not already loaded)
     if not _known_tweaks:
@@ -1651,27 +2431,53 @@ async def update_repo_json(source_tracking=None):
     apps_by_bundle = {}
 
     print(f"\n[SCAN] Scanning downloaded IPAs...")
-    ipa_files = [f for f in os.listdir(DOWNLOAD_DIR) if f.endswith('.ipa')]
+    ipa_files = list_downloaded_ipas()
     print(f"[SCAN] Found {len(ipa_files)} IPA files to process")
 
-    for idx, filename in enumerate(ipa_files, 1):
+    # (source channel, message text, timestamp) of each file, looked up once
+    sources = {filename: source_entry(source_tracking, filename) for filename in ipa_files}
+
+    def needs_ai(filename, info):
+        """
+        Whether to extract metadata with AI. Skipped when the IPA already gave
+        the name and bundle ID and the message has no cached extraction
+        """
+        message_text = sources[filename][1]
+        if not message_text:
+            return False
+        plist_complete = bool(info and info.get('name') and info.get('bundleIdentifier'))
+        return not plist_complete or metadata_cache_key(message_text, filename) in _ai_bundle_cache
+
+    async def prefetch_metadata(filename):
+        """Read the IPA's Info.plist, then run the AI extraction if needed"""
+        info = await extract_ipa_info(os.path.join(DOWNLOAD_DIR, filename))
+        use_ai = needs_ai(filename, info)
+        ai_metadata = None
+        if use_ai:
+            ai_metadata = await asyncio.to_thread(extract_metadata_with_ai, sources[filename][1], filename)
+        return info, use_ai, ai_metadata
+
+    # The IPAs are independent, so their plist reads and AI calls run side by
+    # side (bounded by _ipa_extract_semaphore and _openrouter_semaphore); the
+    # merge below then walks the results in order
+    print(f"[SCAN] Reading IPA metadata and running AI extraction for all files...")
+    prefetched = await asyncio.gather(*[prefetch_metadata(filename) for filename in ipa_files])
+
+    for idx, (filename, (info, use_ai, ai_metadata)) in enumerate(zip(ipa_files, prefetched), 1):
         print(f"\n[PROCESSING {idx}/{len(ipa_files)}] {filename}")
         ipa_path = os.path.join(DOWNLOAD_DIR, filename)
 
-        info = await extract_ipa_info(ipa_path)
+        source_channel, message_text, message_timestamp = sources[filename]
 
-        # Try to get message text and timestamp from source tracking
-        source_data = source_tracking.get(filename, {})
-        if isinstance(source_data, dict):
-            message_text = source_data.get('message', '')
-            message_timestamp = source_data.get('timestamp', 0)
-        else:
-            message_text = ''
-            message_timestamp = 0
-
-        # Extract metadata using AI (mandatory)
-        if message_text:
-            ai_metadata = extract_metadata_with_ai(message_text, filename)
+        # AI metadata was extracted by prefetch_metadata() above, if needed
+        if message_text and not use_ai:
+            print(f"  [AI] Skipping AI extraction, using IPA metadata and known tweaks list")
+            app_name_from_message = None
+            version_from_message = None
+            tweak_from_message = match_known_tweak(message_text) or match_known_tweak(filename)
+            ai_bundle_id = None
+            ai_description = None
+        elif message_text:
             if ai_metadata:
                 # Extract values and normalize "null" strings to None
                 app_name_from_message = ai_metadata.get('app_name')
@@ -1701,13 +2507,7 @@ async def update_repo_json(source_tracking=None):
                 ai_description = None
 
             # IMPORTANT: Post-process to fix common AI misidentifications
-            # Swiftgram is a standalone app, NOT Telegram
-            if ai_bundle_id == 'app.swiftgram.ios' and app_name_from_message != 'Swiftgram':
-                print(f"  [CORRECTION] Bundle ID is app.swiftgram.ios - correcting app name from '{app_name_from_message}' to 'Swiftgram'")
-                app_name_from_message = 'Swiftgram'
-            elif ai_bundle_id == 'ph.telegra.Telegraph' and app_name_from_message != 'Telegram':
-                print(f"  [CORRECTION] Bundle ID is ph.telegra.Telegraph - correcting app name from '{app_name_from_message}' to 'Telegram'")
-                app_name_from_message = 'Telegram'
+            app_name_from_message = correct_app_name(ai_bundle_id, app_name_from_message)
         else:
             # No message text available, will rely on IPA metadata
             print(f"  [WARNING] No message text available for AI extraction")
@@ -1721,93 +2521,10 @@ async def update_repo_json(source_tracking=None):
         # The extract_tweak_name function is too aggressive and matches things like "Pro" which aren't tweaks
         tweak_from_filename = None
 
-        # Parse filename for app name and version
-        def parse_filename(fname):
-            """Extract app name and version from filename"""
-            fname_no_ext = fname.replace('.ipa', '')
-
-            # Try to extract version
-            # Patterns: "v1.2.3", "v1_2_3", "15.0.16" (without v)
-            version_match = None
-
-            # Pattern 1: "v1.2.3" or "v1_2_3" with spaces (e.g., "Instagram v402.0.0")
-            # Match digits and separators but don't capture trailing separators
-            match = re.search(r'\sv(\d+(?:[\d\._]+\d)?)', fname_no_ext, re.IGNORECASE)
-            if match:
-                version_match = match.group(1).replace('_', '.')
-
-            # Pattern 2: "_v1_2_3" with underscores (e.g., "App_v9_1_10_Pro")
-            # Match digits and underscores but don't capture trailing underscores
-            if not version_match:
-                match = re.search(r'_v(\d+(?:_\d+)*)', fname_no_ext, re.IGNORECASE)
-                if match:
-                    version_match = match.group(1).replace('_', '.')
-
-            # Pattern 3: Standalone version like "15.0.16" (e.g., "Notability Plus 15.0.16")
-            if not version_match:
-                match = re.search(r'\s(\d+\.\d+\.\d+)', fname_no_ext)
-                if match:
-                    version_match = match.group(1)
-
-            # Extract app name (everything before version or common suffixes)
-            name_part = fname_no_ext
-            # Remove version patterns
-            name_part = re.sub(r'_v\d+[\d_\.]+.*$', '', name_part, flags=re.IGNORECASE)
-            name_part = re.sub(r'\sv\d+[\d\.]+.*$', '', name_part, flags=re.IGNORECASE)
-            name_part = re.sub(r'\s\d+\.\d+\.\d+.*$', '', name_part)  # Remove standalone version
-            # Remove common suffixes
-            name_part = re.sub(r'_(Pro_|Plus_|Premium_)?(Subscription_)?Unlocked.*$', '', name_part, flags=re.IGNORECASE)
-            name_part = re.sub(r'_blatant.*$', '', name_part, flags=re.IGNORECASE)
-            name_part = re.sub(r'_Patched.*$', '', name_part, flags=re.IGNORECASE)
-            name_part = re.sub(r'\[tg@.*\]$', '', name_part)
-            name_part = re.sub(r'\sLRD.*$', '', name_part)  # Remove "LRD v2.18" type suffixes
-            name_part = re.sub(r'\s(Pro|Plus|Premium)$', '', name_part, flags=re.IGNORECASE)
-            # Replace underscores and ampersands with spaces, clean up
-            name_part = name_part.replace('_', ' ').replace('&', '&').strip()
-            # Remove multiple spaces
-            name_part = re.sub(r'\s+', ' ', name_part)
-
-            return name_part, version_match
-
-        def clean_app_name(name):
-            """Clean up app name by removing exact duplicates, markdown, emojis, and modification suffixes"""
-            if not name:
-                return name
-
-            # Remove markdown formatting and emojis
-            name = name.replace('**', '')  # Remove bold markdown
-            name = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', name)  # Remove markdown links
-            name = re.sub(r'[\U0001F300-\U0001F9FF\U0001FA00-\U0001FAFF\U00002700-\U000027BF\U0000FE00-\U0000FE0F\u0600-\u06FF]', '', name)  # Remove emojis
-
-            # Remove modification suffixes like (Pro), (Plus), (Premium), (Unlocked), (Patched), etc.
-            # Match parentheses at the end with common modification terms
-            suffix_pattern = r'\s*\((Pro|Plus|Premium|Unlocked|Patched|Subscription Unlocked|Mod|Modded|Hacked|Cracked|Full)\)\s*$'
-            cleaned = re.sub(suffix_pattern, '', name, flags=re.IGNORECASE)
-            if cleaned != name:
-                print(f"  [CLEANUP] Removed suffix: '{name}' -> '{cleaned}'")
-                name = cleaned
-
-            # Handle duplicated names like "AppAuth AppAuth"
-            # Only remove if EXACTLY the same word is repeated
-            parts = name.split()
-
-            # Check if first part is exactly repeated (e.g., "AppAuth AppAuth")
-            if len(parts) >= 2 and parts[0] == parts[1]:
-                name = parts[0]
-                print(f"  [CLEANUP] Removed exact duplicate: '{parts[0]} {parts[1]}' -> '{name}'")
-
-            return name.strip()
-
         app_name_from_file, version_from_file = parse_filename(filename)
         print(f"  [FILENAME] Parsed: name='{app_name_from_file}', version='{version_from_file}'")
 
         # Priority for app name, version, and tweak depends on source channel
-        # Get source channel for this file (already loaded above)
-        if isinstance(source_data, dict):
-            source_channel = source_data.get('source', '')
-        else:
-            source_channel = ''
-
         # For @binnichtaktivsipas: prioritize filename version over message version
         # because their filenames contain accurate version numbers
         if 'binnichtaktiv' in source_channel.lower():
@@ -1847,7 +2564,7 @@ async def update_repo_json(source_tracking=None):
             else:
                 # 2. Try App Store search as fallback
                 print(f"  [APPSTORE] Attempting early App Store lookup for bundle ID...")
-                _, _, official_bundle_id = search_app_store(cleaned_name, None)
+                _, _, official_bundle_id = await asyncio.to_thread(search_app_store, cleaned_name, None)
                 if official_bundle_id:
                     temp_bundle_id = official_bundle_id
                     print(f"  [APPSTORE] Found bundle ID from App Store: {official_bundle_id}")
@@ -1856,7 +2573,7 @@ async def update_repo_json(source_tracking=None):
 
             if not info:
                 info = {
-                    'bundleIdentifier': temp_bundle_id if temp_bundle_id else f'com.unknown.{cleaned_name.lower().replace(" ", "")}',
+                    'bundleIdentifier': temp_bundle_id if temp_bundle_id else f'{UNKNOWN_BUNDLE_PREFIX}{cleaned_name.lower().replace(" ", "")}',
                     'name': cleaned_name,
                     'version': best_version or '1.0',
                     'build': '1',
@@ -1870,7 +2587,7 @@ async def update_repo_json(source_tracking=None):
                     info['name'] = cleaned_name
                     print(f"  [FALLBACK] Updated name from filename: {cleaned_name}")
                 if not info.get('bundleIdentifier'):
-                    info['bundleIdentifier'] = temp_bundle_id if temp_bundle_id else f'com.unknown.{cleaned_name.lower().replace(" ", "")}'
+                    info['bundleIdentifier'] = temp_bundle_id if temp_bundle_id else f'{UNKNOWN_BUNDLE_PREFIX}{cleaned_name.lower().replace(" ", "")}'
                     print(f"  [FALLBACK] Generated/found bundle ID: {info['bundleIdentifier']}")
                 if best_version and (not info.get('version') or info.get('version') in ['1.0', '0.1.0', '1']):
                     info['version'] = best_version
@@ -1904,12 +2621,7 @@ async def update_repo_json(source_tracking=None):
 
             # IMPORTANT: Final correction for Swiftgram/Telegram based on bundle ID
             # This ensures consistency even if AI extraction failed
-            if bundle_id == 'app.swiftgram.ios' and info.get('name') != 'Swiftgram':
-                print(f"  [CORRECTION] Bundle ID is app.swiftgram.ios - correcting app name from '{info.get('name')}' to 'Swiftgram'")
-                info['name'] = 'Swiftgram'
-            elif bundle_id == 'ph.telegra.Telegraph' and info.get('name') != 'Telegram':
-                print(f"  [CORRECTION] Bundle ID is ph.telegra.Telegraph - correcting app name from '{info.get('name')}' to 'Telegram'")
-                info['name'] = 'Telegram'
+            info['name'] = correct_app_name(bundle_id, info.get('name'))
 
             # Create a unique key that includes tweak name
             # This allows different tweaks of the same app to be tracked separately
@@ -1928,30 +2640,23 @@ async def update_repo_json(source_tracking=None):
                 if compare_versions(app_version, existing_version, message_timestamp, existing_timestamp):
                     print(f"  [VERSION] New version is newer (or more recent), replacing...")
                     if app_version == existing_version and message_timestamp > existing_timestamp:
-                        new_date = datetime.fromtimestamp(message_timestamp).strftime('%Y-%m-%d %H:%M:%S')
-                        old_date = datetime.fromtimestamp(existing_timestamp).strftime('%Y-%m-%d %H:%M:%S')
+                        new_date = format_timestamp(message_timestamp)
+                        old_date = format_timestamp(existing_timestamp)
                         print(f"  [TIMESTAMP] Using more recent message: {new_date} vs {old_date}")
                     old_filename = apps_by_bundle[unique_app_key]['filename']
                     old_path = os.path.join(DOWNLOAD_DIR, old_filename)
-                    if os.path.exists(old_path):
+                    try:
                         os.remove(old_path)
                         print(f"  [REMOVED] Deleted older version: {old_filename}")
-
-                    # Get source data for the new version
-                    source_data = source_tracking.get(filename, 'Unknown')
-                    if isinstance(source_data, dict):
-                        source_channel = source_data.get('source', 'Unknown')
-                        source_message = source_data.get('message', '')
-                    else:
-                        source_channel = source_data
-                        source_message = ''
+                    except FileNotFoundError:
+                        pass
 
                     apps_by_bundle[unique_app_key] = {
                         'info': info,
                         'filename': filename,
                         'version': app_version,
                         'source': source_channel,
-                        'message': source_message,
+                        'message': message_text,
                         'tweak': best_tweak,
                         'timestamp': message_timestamp,
                         'ai_description': ai_description,
@@ -1960,28 +2665,18 @@ async def update_repo_json(source_tracking=None):
                 else:
                     print(f"  [SKIP] Existing version {existing_version} is newer than {app_version}")
                     if app_version == existing_version:
-                        new_date = datetime.fromtimestamp(message_timestamp).strftime('%Y-%m-%d %H:%M:%S')
-                        old_date = datetime.fromtimestamp(existing_timestamp).strftime('%Y-%m-%d %H:%M:%S')
+                        new_date = format_timestamp(message_timestamp)
+                        old_date = format_timestamp(existing_timestamp)
                         print(f"  [SKIP] Same version, but existing message is more recent: {old_date} vs {new_date}")
                     continue
             else:
                 print(f"  [NEW] First occurrence of app key: {unique_app_key}")
-                # Handle both old (string) and new (dict) source_tracking formats
-                source_data = source_tracking.get(filename, 'Unknown')
-                if isinstance(source_data, dict):
-                    source_channel = source_data.get('source', 'Unknown')
-                    source_message = source_data.get('message', '')
-                else:
-                    # Old format (just a string)
-                    source_channel = source_data
-                    source_message = ''
-
                 apps_by_bundle[unique_app_key] = {
                     'info': info,
                     'filename': filename,
                     'version': app_version,
                     'source': source_channel,
-                    'message': source_message,
+                    'message': message_text,
                     'tweak': best_tweak,
                     'timestamp': message_timestamp,
                     'ai_description': ai_description
@@ -1990,52 +2685,46 @@ async def update_repo_json(source_tracking=None):
     print(f"\n[MERGE] Checking existing {REPO_FILE} for apps...")
     if os.path.exists(REPO_FILE):
         print(f"[MERGE] Found existing {REPO_FILE}, merging with new data...")
-        with open(REPO_FILE, 'r', encoding='utf-8') as f:
-            repo_data = json.load(f)
-            existing_apps = repo_data.get('apps', [])
-            print(f"[MERGE] Existing repo contains {len(existing_apps)} apps")
+        repo_data = load_repo_file()
+        existing_apps = repo_data.get('apps', [])
+        print(f"[MERGE] Existing repo contains {len(existing_apps)} apps")
 
-            for app in existing_apps:
-                bundle_id = app['bundleIdentifier']
-                app_version = app['version']
-                app_name = app.get('name', '')
+        # Only conflicts are logged per app; apps carried over unchanged are
+        # counted and summarized once, since apps.json can hold thousands
+        kept_count = 0
+        for app in existing_apps:
+            bundle_id = app['bundleIdentifier']
+            app_version = app['version']
 
-                # Try to detect tweak from existing app name
-                # e.g., "Instagram (BHInstagram)" -> tweak is "BHInstagram"
-                existing_tweak = None
-                tweak_in_name_match = re.search(r'\(([^)]+)\)$', app_name)
-                if tweak_in_name_match:
-                    existing_tweak = tweak_in_name_match.group(1)
-
-                # Create unique key for existing app
-                if existing_tweak:
-                    unique_app_key = f"{bundle_id}:{existing_tweak}"
-                    print(f"[MERGE] Existing app key: {unique_app_key} ('{app_name}' v{app_version})")
-                else:
-                    unique_app_key = bundle_id
-                    print(f"[MERGE] Existing app key: {unique_app_key} ('{app_name}' v{app_version})")
-
-                if unique_app_key in apps_by_bundle:
-                    new_version = apps_by_bundle[unique_app_key]['version']
-                    print(f"[MERGE] Conflict for {unique_app_key}: existing v{app_version} vs new v{new_version}")
-                    if compare_versions(app_version, new_version):
-                        print(f"  [MERGE] Keeping existing version (newer)")
-                        apps_by_bundle[unique_app_key] = {
-                            'info': None,
-                            'existing': app,
-                            'version': app_version,
-                            'tweak': existing_tweak
-                        }
-                    else:
-                        print(f"  [MERGE] Replacing with new version")
-                else:
-                    print(f"[MERGE] Keeping existing app: {app.get('name', 'Unknown')} ({unique_app_key})")
+            # Try to detect tweak from existing app name
+            # e.g., "Instagram (BHInstagram)" -> tweak is "BHInstagram"
+            existing_tweak = tweak_from_app_name(app.get('name', ''))
+
+            # Create unique key for existing app
+            unique_app_key = f"{bundle_id}:{existing_tweak}" if existing_tweak else bundle_id
+
+            if unique_app_key in apps_by_bundle:
+                new_version = apps_by_bundle[unique_app_key]['version']
+                print(f"[MERGE] Conflict for {unique_app_key}: existing v{app_version} vs new v{new_version}")
+                if compare_versions(app_version, new_version):
+                    print(f"  [MERGE] Keeping existing version (newer)")
                     apps_by_bundle[unique_app_key] = {
                         'info': None,
                         'existing': app,
                         'version': app_version,
                         'tweak': existing_tweak
                     }
+                else:
+                    print(f"  [MERGE] Replacing with new version")
+            else:
+                kept_count += 1
+                apps_by_bundle[unique_app_key] = {
+                    'info': None,
+                    'existing': app,
+                    'version': app_version,
+                    'tweak': existing_tweak
+                }
+        print(f"[MERGE] Kept {kept_count} existing apps with no new version")
     else:
         print(f"[MERGE] No existing {REPO_FILE} found, creating new one")
 
@@ -2052,12 +2741,91 @@ async def update_repo_json(source_tracking=None):
     else:
         print(f"[WARNING] Could not get repo URL from git remote")
         repo_url = os.getenv('REPO_BASE_URL', 'https://example.com')
+    # Release download URLs are this prefix plus the asset filename
+    download_base_url = f"{repo_url}/releases/download/{RELEASE_TAG}/"
 
     # Get current release assets to verify existing apps still have their IPAs
     print(f"[VERIFY] Fetching current release assets to verify existing apps...")
-    current_release_assets = get_release_assets()
+    release = get_release()
+    current_release_assets = get_release_assets(release)
     print(f"[VERIFY] Found {len(current_release_assets)} assets in release")
 
+    # Resolve the App Store lookups the loop below will need up front, all at
+    # once (bounded by _appstore_semaphore); the loop then reads them from cache.
+    # Only fallback bundle IDs are looked up - see the lookup rules in the loop
+    pending_lookups = {
+        (data['info']['name'], data['info']['bundleIdentifier'])
+        for data in apps_by_bundle.values()
+        if 'existing' not in data and data['info']
+        and data['info']['bundleIdentifier'].startswith(UNKNOWN_BUNDLE_PREFIX)
+        and appstore_cache_get(data['info']['name'], data['info']['bundleIdentifier']) is None
+    }
+    if pending_lookups:
+        print(f"[APPSTORE] Resolving {len(pending_lookups)} App Store lookup(s) concurrently...")
+        await asyncio.gather(
+            *(asyncio.to_thread(search_app_store, name, bundle) for name, bundle in pending_lookups),
+            return_exceptions=True
+        )
+
+    # Upload the new IPAs up front, several at once (bounded by
+    # _upload_semaphore); the loop below only reads the results
+    new_app_bundles = [bundle_id for bundle_id, data in apps_by_bundle.items() if 'existing' not in data and data['info']]
+    if new_app_bundles:
+        print(f"[UPLOAD] Uploading {len(new_app_bundles)} IPA(s) concurrently...")
+    upload_results = await asyncio.gather(
+        *(asyncio.to_thread(
+            upload_to_release,
+            os.path.join(DOWNLOAD_DIR, apps_by_bundle[bundle_id]['filename']),
+            bundle_id=apps_by_bundle[bundle_id]['info']['bundleIdentifier'],
+            tweak_name=apps_by_bundle[bundle_id].get('tweak'),
+            old_filename=apps_by_bundle[bundle_id].get('old_filename'),  # None if this is a new app
+            release=release
+        ) for bundle_id in new_app_bundles),
+        return_exceptions=True
+    )
+    uploaded = {bundle_id for bundle_id, result in zip(new_app_bundles, upload_results) if result is True}
+
+    async def resolve_appstore(info):
+        """
+        Official App Store name, icon and bundle ID of a new app, falling back
+        to the other icon sources when the App Store has no icon
+        """
+        # Search App Store for official name, icon, and bundle ID
+        # Only search if we have com.unknown or if cache check suggests we need to
+        current_bundle_id = info['bundleIdentifier']
+
+        # Skip App Store lookup if we have valid bundle ID and it's not in cache
+        # This avoids lookups for apps we've never seen before with valid IDs
+        if current_bundle_id.startswith(UNKNOWN_BUNDLE_PREFIX):
+            print(f"[APPSTORE] Found fallback bundle ID, searching App Store for correct one...")
+            official_name, icon_url, official_bundle_id = await asyncio.to_thread(search_app_store, info['name'], current_bundle_id)
+        elif appstore_cache_get(info['name'], current_bundle_id) is not None:
+            # Use cached result if available
+            print(f"[APPSTORE] Looking up app: {info['name']} ({current_bundle_id})")
+            official_name, icon_url, official_bundle_id = await asyncio.to_thread(search_app_store, info['name'], current_bundle_id)
+        else:
+            # Skip lookup for known-good bundle IDs on first run
+            print(f"[SKIP] Skipping App Store lookup for {info['name']} (valid bundle ID)")
+            official_name, icon_url, official_bundle_id = None, None, None
+
+        # If no icon from App Store, try other methods
+        if not icon_url:
+            print(f"[ICON] App Store lookup failed, trying fallback methods for {info['name']}")
+            icon_url = await asyncio.to_thread(get_icon_url_from_name, info['name'], current_bundle_id)
+
+        return official_name, icon_url, official_bundle_id
+
+    # Resolve names and icons of all uploaded apps at once - the icon
+    # fallbacks are network requests too; the loop below only reads the results
+    uploaded_bundles = [bundle_id for bundle_id in new_app_bundles if bundle_id in uploaded]
+    appstore_results = dict(zip(uploaded_bundles, await asyncio.gather(
+        *(resolve_appstore(apps_by_bundle[bundle_id]['info']) for bundle_id in uploaded_bundles)
+    )))
+
+    # Date of the new versions: the build time, as ISO 8601 in UTC with the
+    # Z suffix (Feather/AltStore format)
+    current_date = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
     for bundle_id, data in apps_by_bundle.items():
         if 'existing' in data:
             # Verify that the IPA file for this existing app still exists in the release
@@ -2067,12 +2835,12 @@ async def update_repo_json(source_tracking=None):
             # Extract filename from download URL (e.g., ".../<filename>.ipa")
             if download_url:
                 # URL format: https://example.com/owner/repo/releases/download/latest/filename.ipa
-                filename_from_url = download_url.split('/')[-1]
                 # URL decode the filename
-                filename_from_url = urllib.parse.unquote(filename_from_url)
+                filename_from_url = urllib.parse.unquote(download_url.rpartition('/')[2])
 
+                # Only missing IPAs are logged per app; the kept apps are
+                # counted in the summary below
                 if filename_from_url in current_release_assets:
-                    print(f"[VERIFY] Existing app IPA found in release: {existing_app.get('name', 'Unknown')} ({filename_from_url})")
                     final_apps.append(existing_app)
                     existing_apps_count += 1
                 else:
@@ -2084,61 +2852,35 @@ async def update_repo_json(source_tracking=None):
             info = data['info']
             filename = data['filename']
 
-            src_path = os.path.join(DOWNLOAD_DIR, filename)
+            # Uploaded to the release above
+            if bundle_id in uploaded:
+                # Construct download URL from release (use URL-encoded filename to match what GitHub stores)
+                download_url = download_base_url + filename.replace('&', '%26')
 
-            # Get metadata for upload (bundle_id, tweak, old_filename if replacing)
-            bundle_id_value = info['bundleIdentifier']
-            tweak_value = data.get('tweak')
-            old_filename_value = data.get('old_filename')  # Will be None if this is a new app
+                # Resolved by resolve_appstore() above
+                official_name, icon_url, official_bundle_id = appstore_results[bundle_id]
+                extracted_name = info['name']
+                extracted_bundle_id = info['bundleIdentifier']
 
-            # Upload to release
-            if upload_to_release(src_path, bundle_id=bundle_id_value, tweak_name=tweak_value, old_filename=old_filename_value):
-                # Construct download URL from release (use URL-encoded filename to match what GitHub stores)
-                download_url = f"{repo_url}/releases/download/{RELEASE_TAG}/{filename.replace('&', '%26')}"
-
-                # Search App Store for official name, icon, and bundle ID
-                # Only search if we have com.unknown or if cache check suggests we need to
-                current_bundle_id = info['bundleIdentifier']
-                cache_key = f"{current_bundle_id}:{info['name']}"
-
-                # Skip App Store lookup if we have valid bundle ID and it's not in cache
-                # This avoids lookups for apps we've never seen before with valid IDs
-                if 'com.unknown' in current_bundle_id:
-                    print(f"[APPSTORE] Found fallback bundle ID, searching App Store for correct one...")
-                    official_name, icon_url, official_bundle_id = search_app_store(info['name'], current_bundle_id)
-                elif cache_key in _appstore_cache:
-                    # Use cached result if available
-                    print(f"[APPSTORE] Looking up app: {info['name']} ({current_bundle_id})")
-                    official_name, icon_url, official_bundle_id = search_app_store(info['name'], current_bundle_id)
-                else:
-                    # Skip lookup for known-good bundle IDs on first run
-                    print(f"[SKIP] Skipping App Store lookup for {info['name']} (valid bundle ID)")
-                    official_name, icon_url, official_bundle_id = None, None, None
+                # ALWAYS use official App Store bundle ID if found, especially for com.unknown cases
+                final_bundle_id = official_bundle_id if official_bundle_id else extracted_bundle_id
 
                 # Use official App Store name if found, otherwise use extracted name
-                base_name = official_name if official_name else info['name']
+                base_name = official_name if official_name else extracted_name
 
                 # Final cleanup: ensure no markdown or emojis slip through
                 if not official_name and base_name:
                     # Clean the extracted name as a fallback
-                    base_name = base_name.replace('**', '')  # Remove bold markdown
-                    base_name = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', base_name)  # Remove markdown links
-                    base_name = re.sub(r'[\U0001F300-\U0001F9FF\U0001FA00-\U0001FAFF\U00002700-\U000027BF\U0000FE00-\U0000FE0F\u0600-\u06FF]', '', base_name)  # Remove emojis
-                    base_name = base_name.strip()
+                    base_name = strip_markdown_and_emojis(base_name).strip()
 
                 # Special name mappings to ensure correct App Store icon lookup
-                # Twitter was rebranded to X, so ensure we use "X" for proper icon matching
-                bundle_id_name_overrides = {
-                    'com.atebits.Tweetie2': 'X',  # Twitter bundle ID should show as "X"
-                }
+                name_override = _BUNDLE_ID_NAME_OVERRIDES.get(final_bundle_id)
+                if name_override:
+                    base_name = name_override
+                    print(f"[MAPPING] Using name override for {final_bundle_id}: '{base_name}'")
 
-                final_bundle_id_for_check = official_bundle_id if official_bundle_id else info['bundleIdentifier']
-                if final_bundle_id_for_check in bundle_id_name_overrides:
-                    base_name = bundle_id_name_overrides[final_bundle_id_for_check]
-                    print(f"[MAPPING] Using name override for {final_bundle_id_for_check}: '{base_name}'")
-
-                if official_name and official_name != info['name']:
-                    print(f"[APPSTORE] Using official name: '{info['name']}' -> '{official_name}'")
+                if official_name and official_name != extracted_name:
+                    print(f"[APPSTORE] Using official name: '{extracted_name}' -> '{official_name}'")
 
                 # If this is a tweaked app, append tweak name to distinguish it
                 tweak_name = data.get('tweak')
@@ -2148,20 +2890,10 @@ async def update_repo_json(source_tracking=None):
                 else:
                     final_name = base_name
 
-                # ALWAYS use official App Store bundle ID if found, especially for com.unknown cases
-                final_bundle_id = official_bundle_id if official_bundle_id else info['bundleIdentifier']
-                if official_bundle_id and official_bundle_id != info['bundleIdentifier']:
-                    print(f"[APPSTORE] Using official bundle ID: '{info['bundleIdentifier']}' -> '{official_bundle_id}'")
-                elif 'com.unknown' in final_bundle_id and not official_bundle_id:
-                    print(f"[WARNING] Could not find official bundle ID for {info['name']}, using fallback: {final_bundle_id}")
-
-                # If no icon from App Store, try other methods
-                if not icon_url:
-                    print(f"[ICON] App Store lookup failed, trying fallback methods")
-                    icon_url = get_icon_url_from_name(info['name'], info['bundleIdentifier'])
-
-                # Format date as ISO 8601 with Z suffix (Feather/AltStore format)
-                current_date = datetime.now().strftime('%Y-%m-%dT%H:%M:%SZ')
+                if official_bundle_id and official_bundle_id != extracted_bundle_id:
+                    print(f"[APPSTORE] Using official bundle ID: '{extracted_bundle_id}' -> '{official_bundle_id}'")
+                elif not official_bundle_id and final_bundle_id.startswith(UNKNOWN_BUNDLE_PREFIX):
+                    print(f"[WARNING] Could not find official bundle ID for {extracted_name}, using fallback: {final_bundle_id}")
 
                 # Get source channel and message for description and developer
                 source_channel = data.get('source', 'Unknown')
@@ -2174,28 +2906,28 @@ async def update_repo_json(source_tracking=None):
                     # Use AI-cleaned description with source header
                     if source_channel != 'Unknown':
                         header = f"from @{source_channel} |"
-                        separator = "-" * len(header)
-                        description = f"{header}\n{separator}\n{ai_desc}"
+                        description = '\n'.join((header, '-' * len(header), ai_desc))
                         print(f"  [AI] Using AI-cleaned description")
                     else:
                         description = ai_desc
                 elif source_channel != 'Unknown':
                     # Fallback: manual cleaning
                     header = f"from @{source_channel} |"
-                    separator = "-" * len(header)
-                    description = f"{header}\n{separator}"
+                    description_parts = [header, '-' * len(header)]
 
                     if source_message:
                         # Clean up message (remove markdown formatting and links but keep link text)
                         clean_message = source_message.replace('**', '')
                         # Remove markdown links: [text](url) -> text
-                        clean_message = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', clean_message)
-                        description += f"\n{clean_message}"
+                        description_parts.append(_MARKDOWN_LINK_RE.sub(r'\1', clean_message))
+                    description = '\n'.join(description_parts)
                 else:
                     description = final_name
 
                 developer_name = f"@{source_channel}" if source_channel != 'Unknown' else 'Unknown'
 
+                app_version = info['version']
+                app_size = info['size']
                 app_entry = {
                     'name': final_name,
                     'bundleIdentifier': final_bundle_id,
@@ -2204,21 +2936,21 @@ async def update_repo_json(source_tracking=None):
                     'localizedDescription': description,
                     'versions': [
                         {
-                            'version': info['version'],
+                            'version': app_version,
                             'date': current_date,
-                            'size': info['size'],
+                            'size': app_size,
                             'downloadURL': download_url
                         }
                     ],
                     'appPermissions': {},
-                    'version': info['version'],
+                    'version': app_version,
                     'versionDate': current_date,
-                    'size': info['size'],
+                    'size': app_size,
                     'downloadURL': download_url
                 }
 
                 final_apps.append(app_entry)
-                print(f"[BUILD] Added new app: {final_name} v{info['version']}")
+                print(f"[BUILD] Added new app: {final_name} v{app_version}")
             else:
                 print(f"[ERROR] Failed to upload {filename}, skipping from {REPO_FILE}")
 
@@ -2234,14 +2966,15 @@ async def update_repo_json(source_tracking=None):
     }
 
     print(f"[JSON] Writing to {REPO_FILE}...")
-    with open(REPO_FILE, 'w', encoding='utf-8') as f:
-        json.dump(repo_data, f, indent=2, ensure_ascii=False)
-
-    # Save App Store cache for future runs
-    save_appstore_cache()
+    write_json_atomic(REPO_FILE, repo_data, indent=True)
 
-    # Save AI bundle ID cache
-    save_ai_bundle_cache()
+    # Save the App Store and AI bundle ID caches for future runs. They are
+    # separate files, so serialize and write them side by side in worker
+    # threads instead of on the event loop
+    await asyncio.gather(
+        asyncio.to_thread(save_appstore_cache),
+        asyncio.to_thread(save_ai_bundle_cache)
+    )
 
     print(f"[SUCCESS] Updated {REPO_FILE} with {len(repo_data['apps'])} apps")
     print("=" * 60)
@@ -2275,8 +3008,13 @@ async def main():
     else:
         print(f"[TWEAKS] No tweaks list found - AI will use default behavior")
 
+    # Load AI metadata cache, so the pre-download version checks reuse
+    # extractions from earlier runs
+    load_ai_bundle_cache()
+
     print("\n[PHASE 1] Downloading IPAs from Telegram channels...")
     downloaded_files, source_tracking = await download_ipas()
+    save_ai_bundle_cache()
 
     print("\n[PHASE 2] Updating repository JSON...")
     await update_repo_json(source_tracking)
@@ -2289,4 +3027,10 @@ async def main():
     print("=" * 60)
 
 if __name__ == '__main__':
+    # CI runs with -u so the log streams live, but unbuffered stdout writes
+    # the text and the newline of every print separately. Line buffering
+    # keeps the log live with one write per line. stdout can be missing or
+    # replaced (pythonw, test harnesses), so only reconfigure a real text stream
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=True, write_through=False)
     asyncio.run(main())